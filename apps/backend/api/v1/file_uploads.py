@@ -1,10 +1,10 @@
 """File upload endpoints for handling user file uploads and processing."""
 
 import uuid
+import json
 import asyncio
-from datetime import date, datetime as dt
-from decimal import Decimal
-from io import BytesIO
+import hashlib
+from datetime import date
 from pathlib import Path
 from typing import List, Optional
 
@@ -12,81 +12,161 @@ from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.exc import SQLAlchemyError
 
+from backend.config import settings
 from backend.core.auth import get_current_user
 from backend.models.user import User
 from backend.models.user_upload import UserUpload
-from backend.models.banking_transaction import BankingTransaction
 from backend.services.db.postgres_connector import database_service
 from backend.services.object_store.minio_connector import get_minio_connector
-from backend.services.document_parser.financial_text_extractor import extract_banking_transactions
 from backend.services.ai_agent.transaction_analyzer import transaction_analyzer
-from backend.services.demo.demo_loader import load_demo_transactions
+from backend.services.demo.demo_loader import load_demo_transactions, seed_demo_transactions
+from backend.services.document_parser.chunk_cache import chunk_cache
+from backend.services.jobs.progress import progress_broker, report_stage
+from backend.services.jobs.statement_jobs import enqueue_banking_statement
 
 router = APIRouter()
 minio_connector = get_minio_connector()
 
+# Client-facing status for each persisted processing state (queued/extracting/analyzing -> processing)
+UPLOAD_STATUS_LABELS = {"done": "processed", "failed": "failed"}
 
-async def _process_banking_statement(
-    *,
+# Uploads are read in chunks from Starlette's spooled temporary file, so hashing and
+# size checks never hold more than one chunk in memory
+UPLOAD_READ_CHUNK_BYTES = 1024 * 1024
+
+
+MAX_FILE_SIZE_BYTES = 10 * 1024 * 1024  # 10MB per file
+
+# PDF statements plus CSV/XLSX bank exports (browsers report CSV under several types)
+ALLOWED_UPLOAD_MIME_TYPES = {
+    "application/pdf",
+    "text/csv",
+    "application/csv",
+    "text/comma-separated-values",
+    "application/vnd.ms-excel",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def _duplicate_upload_result(existing_upload: UserUpload) -> dict:
+    """Result entry for a file the user already uploaded as the same statement type."""
+    return {
+        "file_id": existing_upload.file_id,
+        "file_name": existing_upload.file_name,
+        "file_size": existing_upload.file_size,
+        "file_url": existing_upload.file_url,
+        "statement_type": existing_upload.statement_type,
+        "processing": existing_upload.processing_status not in UPLOAD_STATUS_LABELS,
+        "duplicate": True,
+        "transaction_count": existing_upload.transaction_count,
+    }
+
+
+async def _store_upload(
+    file: UploadFile,
     user_id: int,
-    file_id: str,
-    file_content: bytes,
-    file_mime_type: str,
-    file_name: str | None,
-) -> None:
-    """Background processing for banking statement extraction and analysis."""
-    try:
-        transactions_data = await extract_banking_transactions(
-            file_path=None,
-            file_content=file_content,
-            file_mime_type=file_mime_type,
-            user_upload_id=file_id,
-        )
+    statement_type: str,
+    expense_month: int,
+    expense_year: int,
+) -> dict:
+    """Validate, store and queue a single uploaded file.
 
-        banking_transactions = []
-        for idx, tx_data in enumerate(transactions_data):
-            tx_id = f"{file_id}_{idx}"
-            tx_date = dt.strptime(tx_data["transaction_date"], "%Y-%m-%d").date()
+    Blocking object-store and database calls run in worker threads so several files can
+    be stored at once.
 
-            banking_tx = BankingTransaction(
-                id=tx_id,
-                user_id=user_id,
-                file_id=file_id,
-                transaction_date=tx_date,
-                transaction_year=tx_data["transaction_year"],
-                transaction_month=tx_data["transaction_month"],
-                transaction_day=tx_data["transaction_day"],
-                description=tx_data["description"],
-                merchant_name=tx_data.get("merchant_name"),
-                amount=Decimal(str(tx_data["amount"])),
-                is_subscription=tx_data.get("is_subscription", False),
-                transaction_type=tx_data["transaction_type"],
-                balance=Decimal(str(tx_data["balance"])) if tx_data.get("balance") else None,
-                reference_number=tx_data.get("reference_number"),
-                transaction_code=tx_data.get("transaction_code"),
-                category=tx_data.get("category"),
-                currency=tx_data.get("currency", "MYR"),
-            )
-            banking_transactions.append(banking_tx)
+    Returns:
+        dict: Result entry for the upload response
 
-        if banking_transactions:
-            database_service.create_banking_transactions_bulk(banking_transactions)
+    Raises:
+        HTTPException: If the file is rejected (400)
+    """
+    if file.content_type not in ALLOWED_UPLOAD_MIME_TYPES:
+        raise HTTPException(status_code=400, detail=f"Only PDF, CSV and Excel files are allowed. Got: {file.content_type} for {file.filename}")
+
+    # Hash and size-check the spooled upload chunk by chunk
+    hasher = hashlib.sha256()
+    file_size = 0
+    while chunk := await file.read(UPLOAD_READ_CHUNK_BYTES):
+        file_size += len(chunk)
+        if file_size > MAX_FILE_SIZE_BYTES:
+            raise HTTPException(status_code=400, detail=f"File size must be less than 10MB. File '{file.filename}' is over {MAX_FILE_SIZE_BYTES} bytes")
+        hasher.update(chunk)
+    content_hash = hasher.hexdigest()
+
+    # Re-uploads of the same file resolve to the existing upload and its transactions
+    existing_upload = await asyncio.to_thread(
+        database_service.find_user_upload_by_hash, user_id, statement_type, content_hash
+    )
+    if existing_upload:
+        return _duplicate_upload_result(existing_upload)
 
-            try:
-                await asyncio.to_thread(
-                    transaction_analyzer.analyze,
-                    user_id=user_id,
-                    file_id=file_id,
-                    transactions=banking_transactions,
-                )
-            except Exception as analysis_error:
-                print(f"Error running AI analysis: {str(analysis_error)}")
+    # Generate unique file ID
+    file_id = str(uuid.uuid4())
 
-    except Exception as e:
-        print(
-            f"Error extracting transactions for {file_name or file_id}: {str(e)}"
+    # Determine file extension and MIME type
+    file_extension = Path(file.filename).suffix.lstrip('.') if file.filename else ''
+    file_mime_type = file.content_type or "application/octet-stream"
+
+    # Stream the spooled file to MinIO (multipart) without loading it into memory
+    await file.seek(0)
+    upload_result = await asyncio.to_thread(
+        minio_connector.upload_file,
+        user_id=user_id,
+        document_id=file_id,
+        file_data=file.file,
+        file_name=file.filename or "unknown",
+        content_type=file_mime_type,
+        file_size=file_size,
+    )
+
+    # Create user upload record in database
+    user_upload = UserUpload(
+        file_id=file_id,
+        user_id=user_id,
+        file_name=file.filename or "unknown",
+        file_type=file_extension or "unknown",
+        file_size=file_size,
+        file_url=upload_result.get("file_url", ""),
+        file_mime_type=file_mime_type,
+        file_extension=file_extension,
+        statement_type=statement_type,
+        expense_month=expense_month,
+        expense_year=expense_year,
+        processing_status="queued" if statement_type == "banking_transaction" else "done",
+        content_hash=content_hash,
+    )
+    stored_upload, created = await asyncio.to_thread(
+        database_service.create_user_upload_unless_duplicate, user_upload
+    )
+    if not created:
+        # A concurrent upload of the same file won the insert; drop this copy's object
+        try:
+            await asyncio.to_thread(minio_connector.delete_file, user_id=user_id, document_id=file_id)
+        except Exception as e:
+            print(f"Error deleting duplicate upload {file_id}: {str(e)}")
+        return _duplicate_upload_result(stored_upload)
+
+    # Queue banking statements for extraction by the job worker pool
+    if statement_type == "banking_transaction":
+        await asyncio.to_thread(
+            enqueue_banking_statement,
+            user_id=user_id,
+            file_id=file_id,
+            file_mime_type=file_mime_type,
+            file_name=file.filename,
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
         )
 
+    return {
+        "file_id": file_id,
+        "file_name": file.filename,
+        "file_size": file_size,
+        "file_url": upload_result.get("file_url", ""),
+        "statement_type": statement_type,
+        "processing": statement_type == "banking_transaction",
+        "duplicate": False,
+    }
+
 
 @router.post("/upload", tags=["File Uploads"])
 async def upload_file(
@@ -105,101 +185,67 @@ async def upload_file(
         expense_month: Month of the expense (1-12), defaults to current month
         expense_year: Year of the expense, defaults to current year
         
+    Files are stored concurrently (at most ``UPLOAD_CONCURRENCY`` at a time) and each
+    succeeds or fails on its own: rejected or failed files are listed under ``failed``
+    while the rest are still stored. The request only fails if every file fails.
+
+    Files the user has already uploaded (same SHA-256) are not stored or processed
+    again; their entry points at the existing upload and is flagged ``duplicate``.
+
     Returns:
     - Dictionary with upload details and extracted transaction count
     """
-    MAX_FILE_SIZE_BYTES = 10 * 1024 * 1024  # 10MB per file
-
     user_id = current_user.id
-    try:
-        # Set default expense month/year if not provided
-        if expense_month is None:
-            expense_month = date.today().month
-        if expense_year is None:
-            expense_year = date.today().year
-
-        if not files:
-            raise HTTPException(status_code=400, detail="No files provided")
-
-        results = []
-
-        for file in files:
-            if file.content_type != "application/pdf":
-                raise HTTPException(status_code=400, detail=f"Only PDF files are allowed. Got: {file.content_type} for {file.filename}")
-
-            # Read file content and validate size
-            file_content = await file.read()
-            file_size = len(file_content)
-            if file_size > MAX_FILE_SIZE_BYTES:
-                raise HTTPException(status_code=400, detail=f"File size must be less than 10MB. File '{file.filename}' is {file_size} bytes")
 
-            # Generate unique file ID
-            file_id = str(uuid.uuid4())
+    # Set default expense month/year if not provided
+    if expense_month is None:
+        expense_month = date.today().month
+    if expense_year is None:
+        expense_year = date.today().year
+
+    if not files:
+        raise HTTPException(status_code=400, detail="No files provided")
+
+    semaphore = asyncio.Semaphore(settings.UPLOAD_CONCURRENCY)
+
+    async def _store_bounded(file: UploadFile) -> dict:
+        async with semaphore:
+            return await _store_upload(file, user_id, statement_type, expense_month, expense_year)
+
+    outcomes = await asyncio.gather(*(_store_bounded(file) for file in files), return_exceptions=True)
+
+    results = []
+    failed = []
+    for file, outcome in zip(files, outcomes):
+        if not isinstance(outcome, Exception):
+            results.append(outcome)
+            continue
+        if isinstance(outcome, HTTPException):
+            status_code, error = outcome.status_code, outcome.detail
+        elif isinstance(outcome, SQLAlchemyError):
+            status_code, error = 500, f"Database error: {str(outcome)}"
+        else:
+            status_code, error = 500, f"Upload failed: {str(outcome)}"
+        failed.append({"file_name": file.filename, "status_code": status_code, "error": error})
+
+    if not results:
+        # Nothing was stored: surface the first failure as the request error
+        raise HTTPException(status_code=failed[0]["status_code"], detail=failed[0]["error"])
 
-            # Determine file extension and MIME type
-            file_extension = Path(file.filename).suffix.lstrip('.') if file.filename else ''
-            file_mime_type = file.content_type or "application/octet-stream"
-
-            # Upload file to MinIO
-            file_data_io = BytesIO(file_content)
-            upload_result = minio_connector.upload_file(
-                user_id=user_id,
-                document_id=file_id,
-                file_data=file_data_io,
-                file_name=file.filename or "unknown",
-                content_type=file_mime_type,
-                file_size=file_size
-            )
-
-            # Create user upload record in database
-            user_upload = UserUpload(
-                file_id=file_id,
-                user_id=user_id,
-                file_name=file.filename or "unknown",
-                file_type=file_extension or "unknown",
-                file_size=file_size,
-                file_url=upload_result.get("file_url", ""),
-                file_mime_type=file_mime_type,
-                file_extension=file_extension,
-                statement_type=statement_type,
-                expense_month=expense_month,
-                expense_year=expense_year,
-            )
-            database_service.create_user_upload(user_upload)
-
-            # Extract transactions in the background for banking statements
-            if statement_type == "banking_transaction":
-                asyncio.create_task(
-                    _process_banking_statement(
-                        user_id=user_id,
-                        file_id=file_id,
-                        file_content=file_content,
-                        file_mime_type=file_mime_type,
-                        file_name=file.filename,
-                    )
-                )
-
-            results.append({
-                "file_id": file_id,
-                "file_name": file.filename,
-                "file_size": file_size,
-                "file_url": upload_result.get("file_url", ""),
-                "statement_type": statement_type,
-                "processing": statement_type == "banking_transaction",
-            })
-
-        return {
-            "files": results,
-            "count": len(results),
-            "transactions_extracted_total": 0,
-            "insights_generated": False,
-            "message": "Files uploaded successfully. Processing will continue in the background.",
-        }
-        
-    except SQLAlchemyError as e:
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    return {
+        "files": results,
+        "count": len(results),
+        "failed": failed,
+        "failed_count": len(failed),
+        "duplicates": sum(1 for result in results if result["duplicate"]),
+        "transactions_extracted_total": 0,
+        "insights_generated": False,
+        "message": (
+            "Files uploaded successfully. Processing will continue in the background."
+            if not failed
+            else f"{len(results)} of {len(files)} files uploaded. Processing will continue in the background."
+        ),
+    }
 
 
 @router.post("/demo", tags=["File Uploads"])
@@ -227,6 +273,7 @@ async def upload_demo_data(
                 user_id=user_id,
                 file_id=existing_demo.file_id,
                 limit=1,
+                columns=["id"],
             )
             existing_insights = database_service.get_user_insights(
                 user_id=user_id,
@@ -235,15 +282,17 @@ async def upload_demo_data(
             )
             demo_transactions = []
             if not existing_transactions:
-                demo_transactions, _ = load_demo_transactions(
+                demo_transactions, _ = seed_demo_transactions(
                     user_id, existing_demo.file_id
                 )
-                if demo_transactions:
-                    database_service.create_banking_transactions_bulk(
-                        demo_transactions
-                    )
 
             if demo_transactions or not existing_insights:
+                await report_stage(
+                    existing_demo.file_id,
+                    "analyzing",
+                    transaction_count=len(demo_transactions) if demo_transactions else None,
+                )
+
                 async def _run_demo_analysis() -> None:
                     try:
                         await asyncio.to_thread(
@@ -254,6 +303,7 @@ async def upload_demo_data(
                         )
                     except Exception as analysis_error:
                         print(f"Error running demo analysis: {str(analysis_error)}")
+                    await report_stage(existing_demo.file_id, "done")
                 asyncio.create_task(_run_demo_analysis())
 
             return {
@@ -289,11 +339,13 @@ async def upload_demo_data(
             statement_type="banking_transaction",
             expense_month=latest_date.month,
             expense_year=latest_date.year,
+            processing_status="analyzing" if demo_transactions else "done",
+            transaction_count=len(demo_transactions),
         )
         database_service.create_user_upload(user_upload)
 
         if demo_transactions:
-            database_service.create_banking_transactions_bulk(demo_transactions)
+            database_service.ingest_banking_transactions(demo_transactions)
 
             async def _run_demo_analysis() -> None:
                 try:
@@ -305,6 +357,7 @@ async def upload_demo_data(
                     )
                 except Exception as analysis_error:
                     print(f"Error running demo analysis: {str(analysis_error)}")
+                await report_stage(file_id, "done")
 
             asyncio.create_task(_run_demo_analysis())
 
@@ -348,6 +401,9 @@ async def list_user_uploads(
         order_by: Field to order by
         order_desc: Order descending if True, ascending if False
         
+    Processing state is read from the upload rows themselves, so the whole page is a
+    single query.
+
     Returns:
     - Dictionary with uploads list and pagination info
     """
@@ -371,18 +427,16 @@ async def list_user_uploads(
                 "statement_type": upload.statement_type,
                 "expense_month": upload.expense_month,
                 "expense_year": upload.expense_year,
-                "status": (
-                    "processed"
-                    if upload.statement_type != "banking_transaction"
-                    else (
-                        "processed"
-                        if database_service.filter_banking_transactions(
-                            user_id=user_id,
-                            file_id=upload.file_id,
-                            limit=1,
-                        )
-                        else "processing"
-                    )
+                "status": UPLOAD_STATUS_LABELS.get(upload.processing_status, "processing"),
+                "processing_status": upload.processing_status,
+                "transaction_count": upload.transaction_count,
+                "processing_error": upload.processing_error,
+                "processing_progress": upload.processing_progress or {},
+                "processing_started_at": (
+                    upload.processing_started_at.isoformat() if upload.processing_started_at else None
+                ),
+                "processing_completed_at": (
+                    upload.processing_completed_at.isoformat() if upload.processing_completed_at else None
                 ),
                 "created_at": upload.created_at.isoformat() if upload.created_at else None,
             }
@@ -394,6 +448,110 @@ async def list_user_uploads(
     }
 
 
+@router.get("/queue", tags=["File Uploads"])
+async def get_processing_queue(
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    """Report statement-processing queue depth.
+
+    Args:
+        current_user: Authenticated user (from Clerk JWT)
+
+    Returns:
+    - Dictionary with the user's job counts by status, the overall queue depth and
+      this process's extraction chunk cache counters
+    """
+    try:
+        user_stats = await asyncio.to_thread(
+            database_service.get_processing_queue_stats, current_user.id
+        )
+        overall_stats = await asyncio.to_thread(database_service.get_processing_queue_stats)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    return {
+        "user": user_stats,
+        "queue_depth": overall_stats["queued"],
+        "running": overall_stats["running"],
+        "oldest_queued_seconds": overall_stats["oldest_queued_seconds"],
+        "worker_concurrency": settings.JOB_WORKER_CONCURRENCY,
+        "extraction_cache": chunk_cache.stats(),
+    }
+
+
+def _progress_event(state: dict) -> str:
+    """Format an upload progress snapshot as a Server-Sent Event."""
+    payload = {**state, "status": UPLOAD_STATUS_LABELS.get(state["processing_status"], "processing")}
+    return f"event: progress\ndata: {json.dumps(payload)}\n\n"
+
+
+def _apply_progress_event(state: dict, event: dict) -> dict:
+    """Fold a published progress event into the current snapshot."""
+    updated = {**state, **{key: value for key, value in event.items() if key != "progress"}}
+    if event.get("processing_status") == "extracting":
+        # A new run starts with fresh counters
+        updated["progress"] = dict(event.get("progress") or {})
+    else:
+        updated["progress"] = {**state["progress"], **(event.get("progress") or {})}
+    return updated
+
+
+@router.get("/{file_id}/progress", tags=["File Uploads"])
+async def stream_upload_progress(
+    file_id: str,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream an upload's processing progress as Server-Sent Events.
+
+    Each ``progress`` event carries the full snapshot: processing_status, the
+    client-facing status, transaction_count, processing_error and the progress
+    counters (chunks_done/chunks_total, rows_extracted, rows_inserted,
+    rows_deduplicated, analysis_started, insights_written). Row counters grow as
+    each extracted batch is inserted. The stream ends after the upload reaches 'done' or 'failed'.
+
+    Args:
+        file_id: Upload to follow
+        current_user: Authenticated user (from Clerk JWT)
+
+    Returns:
+    - StreamingResponse of text/event-stream
+    """
+    user_id = current_user.id
+    if await asyncio.to_thread(database_service.get_upload_progress, user_id, file_id) is None:
+        raise HTTPException(status_code=404, detail="File not found or access denied")
+
+    async def events():
+        # Subscribe before reading the snapshot so no event falls in between
+        queue = progress_broker.subscribe(file_id)
+        try:
+            state = await asyncio.to_thread(database_service.get_upload_progress, user_id, file_id)
+            if state is None:
+                return
+            yield _progress_event(state)
+            while state["processing_status"] not in UPLOAD_STATUS_LABELS:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.UPLOAD_PROGRESS_POLL_SECONDS)
+                    state = _apply_progress_event(state, event)
+                except asyncio.TimeoutError:
+                    # No in-process event: the worker may run elsewhere, so re-read the row
+                    latest = await asyncio.to_thread(database_service.get_upload_progress, user_id, file_id)
+                    if latest is None:
+                        return
+                    if latest == state:
+                        yield ": keepalive\n\n"
+                        continue
+                    state = latest
+                yield _progress_event(state)
+        finally:
+            progress_broker.unsubscribe(file_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{file_id}/download", tags=["File Uploads"])
 async def download_user_upload(
     file_id: str,
@@ -417,21 +575,17 @@ async def download_user_upload(
         raise HTTPException(status_code=404, detail="File not found or access denied")
     
     try:
-        # Download file from MinIO
-        file_data_io = minio_connector.download_file(
+        # Stream the file out of MinIO chunk by chunk
+        file_chunks = minio_connector.stream_file(
             user_id=user_id,
             document_id=file_id
         )
         
-        # Read bytes from BytesIO
-        file_data_io.seek(0)
-        file_bytes = file_data_io.read()
-        
         # Determine content type
         content_type = upload.file_mime_type or "application/octet-stream"
         
         return StreamingResponse(
-            BytesIO(file_bytes),
+            file_chunks,
             media_type=content_type,
             headers={
                 "Content-Disposition": f'attachment; filename="{upload.file_name}"'
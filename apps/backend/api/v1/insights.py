@@ -1,7 +1,7 @@
 """Financial insights API endpoints."""
 
 from datetime import date
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
 from pydantic import BaseModel, ConfigDict, Field
@@ -166,6 +166,10 @@ async def analyze_transactions(
     file_id: Optional[str] = Query(default=None, description="Analyze specific file only"),
     start_date: Optional[date] = Query(default=None, description="Analyze transactions from this date onwards (inclusive)"),
     end_date: Optional[date] = Query(default=None, description="Analyze transactions up to this date (inclusive)"),
+    mode: Literal["full", "incremental"] = Query(
+        default="incremental",
+        description="'incremental' reads persisted aggregates and keeps unchanged insights; 'full' recomputes and rewords",
+    ),
     background_tasks: BackgroundTasks = None,
 ) -> AnalyzeResponse:
     """Trigger AI analysis of user's transactions.
@@ -176,6 +180,7 @@ async def analyze_transactions(
     Args:
         current_user: Authenticated user (from Clerk JWT)
         file_id: Optional file ID to analyze specific upload only
+        mode: 'incremental' (default) or 'full' re-analysis
         
     Returns:
         AnalyzeResponse: Summary of generated insights
@@ -202,6 +207,7 @@ async def analyze_transactions(
             file_id=file_id,
             start_date=start_date,
             end_date=end_date,
+            mode=mode,
         )
         
         # Count by type
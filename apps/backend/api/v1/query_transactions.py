@@ -2,28 +2,64 @@
 import asyncio
 from datetime import date
 from decimal import Decimal
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
-import pandas as pd
-
 from backend.core.auth import get_current_user
 from backend.models.user import User
-from backend.utils.sankey import to_sankey
-from backend.services.db.postgres_connector import database_service
+from backend.utils.sankey import SANKEY_COLUMNS, to_sankey
+from backend.services.db.postgres_connector import CURSOR_ORDER_FIELDS, database_service, encode_transaction_cursor
 from backend.services.ai_agent.subscription_classifier import subscription_classifier
 from backend.schemas.transaction_response import (
+    BankingTransactionPageResponse,
     BankingTransactionResponse,
     ClassificationSummaryResponse,
+    MonthlySummaryResponse,
     SubscriptionAggregatedResponse,
     SubscriptionReviewRequest,
 )
 
 router = APIRouter()
 
+# Page size used in cursor pagination mode when the client does not send a limit
+DEFAULT_CURSOR_PAGE_SIZE = 100
+
+
+def _check_cursor_order(order_by: str) -> None:
+    """Reject an ordering that cursor pagination cannot resume, before querying.
 
-@router.get("/transactions", response_model=List[BankingTransactionResponse])
+    Raises:
+        HTTPException: 400 if ``order_by`` is not in ``CURSOR_ORDER_FIELDS``
+    """
+    if order_by == "relevance":
+        # The similarity score is computed per query, not stored, so a cursor cannot seek past it
+        raise HTTPException(
+            status_code=400,
+            detail="order_by='relevance' only supports pagination='offset'",
+        )
+    if order_by not in CURSOR_ORDER_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cursor pagination is not supported for order_by '{order_by}'; "
+            f"use one of {', '.join(sorted(CURSOR_ORDER_FIELDS))} or pagination='offset'",
+        )
+
+
+def _to_page(
+    transactions: list,
+    items: List[BankingTransactionResponse],
+    limit: int,
+    order_by: str,
+) -> BankingTransactionPageResponse:
+    """Wrap a cursor-mode result in a page, emitting next_cursor only when the page is full."""
+    next_cursor = None
+    if transactions and len(transactions) == limit:
+        next_cursor = encode_transaction_cursor(transactions[-1], order_by)
+    return BankingTransactionPageResponse(transactions=items, next_cursor=next_cursor)
+
+
+@router.get("/transactions", response_model=Union[List[BankingTransactionResponse], BankingTransactionPageResponse])
 async def query_transactions_all(
     current_user: User = Depends(get_current_user),
     file_id: Optional[str] = Query(default=None, description="Filter by file ID (user upload file ID)"),
@@ -39,11 +75,14 @@ async def query_transactions_all(
     transaction_month: Optional[int] = Query(default=None, ge=1, le=12, description="Filter by transaction month (1-12)"),
     currency: Optional[str] = Query(default=None, description="Filter by currency code (e.g., 'MYR')"),
     description: Optional[str] = Query(default=None, description="Filter by description (partial match, case-insensitive)"),
+    search: Optional[str] = Query(default=None, min_length=1, description="Fuzzy search across merchant name and description"),
     limit: Optional[int] = Query(default=None, ge=1, le=1000, description="Maximum number of results to return"),
     offset: int = Query(default=0, ge=0, description="Number of results to skip (for pagination)"),
-    order_by: str = Query(default="transaction_date", description="Field to order by (default: 'transaction_date')"),
+    cursor: Optional[str] = Query(default=None, description="Cursor from a previous page's next_cursor (implies pagination='cursor')"),
+    pagination: str = Query(default="offset", pattern="^(offset|cursor)$", description="'offset' returns a list; 'cursor' returns a page with next_cursor"),
+    order_by: str = Query(default="transaction_date", description="Field to order by (default: 'transaction_date'); 'relevance' ranks search matches (offset pagination only)"),
     order_desc: bool = Query(default=True, description="If True, order descending; if False, order ascending"),
-) -> List[BankingTransactionResponse]:
+) -> Union[List[BankingTransactionResponse], BankingTransactionPageResponse]:
     """Query banking transactions with various filters.
     
     This endpoint allows filtering banking transactions by multiple criteria including:
@@ -68,18 +107,28 @@ async def query_transactions_all(
         transaction_month: Filter by transaction month (1-12)
         currency: Filter by currency code (e.g., 'MYR')
         description: Filter by description (partial match, case-insensitive)
+        search: Fuzzy search across merchant name and description
         limit: Maximum number of results to return
         offset: Number of results to skip (for pagination)
-        order_by: Field to order by (default: 'transaction_date')
+        cursor: Opaque cursor from a previous page's next_cursor
+        pagination: 'offset' (plain list) or 'cursor' (keyset page with next_cursor)
+        order_by: Field to order by (default: 'transaction_date'), or 'relevance' to rank
+            search matches (offset pagination only)
         order_desc: If True, order descending; if False, order ascending
         
     Returns:
-    - `List[BankingTransactionResponse]`: List of matching banking transactions
+    - `List[BankingTransactionResponse]`: List of matching banking transactions (offset mode)
+    - `BankingTransactionPageResponse`: Page of transactions plus next_cursor (cursor mode)
         
     Raises:
     - `HTTPException`: If query fails
     """
     user_id = current_user.id
+    use_cursor = pagination == "cursor" or cursor is not None
+    if use_cursor:
+        _check_cursor_order(order_by)
+        if limit is None:
+            limit = DEFAULT_CURSOR_PAGE_SIZE
     try:
         transactions = database_service.filter_banking_transactions(
             user_id=user_id,
@@ -96,14 +145,16 @@ async def query_transactions_all(
             transaction_month=transaction_month,
             currency=currency,
             description=description,
+            search=search,
             limit=limit,
             offset=offset,
+            cursor=cursor,
             order_by=order_by,
             order_desc=order_desc,
         )
         
         # Convert to response models
-        return [
+        items = [
             BankingTransactionResponse(
                 id=tx.id,
                 user_id=tx.user_id,
@@ -126,6 +177,11 @@ async def query_transactions_all(
             )
             for tx in transactions
         ]
+        if use_cursor:
+            return _to_page(transactions, items, limit, order_by)
+        return items
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -181,6 +237,9 @@ async def query_transactions_sankey_diagram(
         order_by: Field to order by (default: 'transaction_date')
         order_desc: If True, order descending; if False, order ascending
         
+    When only year/month, transaction type and category filters are given (and no
+    limit/offset), the totals are read from the monthly rollup rather than raw transactions.
+
     Returns:
     - `List[Dict[str, Any]]`: List of matching banking transactions converted to a dictionary format for sankey diagram
         
@@ -188,7 +247,28 @@ async def query_transactions_sankey_diagram(
     - `HTTPException`: If query fails
     """
     user_id = current_user.id
+
+    # Whole-month views (the dashboard) are answered from the monthly rollup
+    rollup_compatible = offset == 0 and limit is None and not any(
+        value is not None
+        for value in (
+            file_id, start_date, end_date, merchant_name, min_amount, max_amount,
+            is_subscription, currency, description,
+        )
+    )
     try:
+        if rollup_compatible:
+            rollup_rows = await asyncio.to_thread(
+                database_service.get_sankey_rollup_rows,
+                user_id=user_id,
+                transaction_year=transaction_year,
+                transaction_month=transaction_month,
+                transaction_type=transaction_type,
+                category=category,
+            )
+            if rollup_rows is not None:
+                return await asyncio.to_thread(to_sankey, rollup_rows)
+
         transactions = database_service.filter_banking_transactions(
             user_id=user_id,
             file_id=file_id,
@@ -208,9 +288,10 @@ async def query_transactions_sankey_diagram(
             offset=offset,
             order_by=order_by,
             order_desc=order_desc,
+            columns=SANKEY_COLUMNS,
         )
 
-        # Convert SQLModel objects to dictionaries for sankey diagram
+        # Convert projected rows to dictionaries for sankey diagram
         transactions_dict = [
             {
                 'amount': float(tx.amount) if tx.amount else 0.0,
@@ -229,6 +310,70 @@ async def query_transactions_sankey_diagram(
             detail=f"Failed to query transactions: {str(e)}"
         )
 
+def _parse_year_month(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parse a 'YYYY-MM' query value into a (year, month) tuple."""
+    if value is None:
+        return None
+    year, month = value.split("-")
+    return int(year), int(month)
+
+
+@router.get("/transactions/monthly_summary", response_model=List[MonthlySummaryResponse])
+async def query_monthly_summary(
+    current_user: User = Depends(get_current_user),
+    start_month: Optional[str] = Query(default=None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="First month (inclusive), 'YYYY-MM'"),
+    end_month: Optional[str] = Query(default=None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="Last month (inclusive), 'YYYY-MM'"),
+    transaction_type: Optional[str] = Query(default=None, pattern="^(debit|credit)$", description="Filter by transaction type ('debit' or 'credit')"),
+    category: Optional[str] = Query(default=None, description="Filter by transaction category ('other' for uncategorised)"),
+    group_by: List[str] = Query(
+        default=["year", "month", "transaction_type"],
+        description="Dimensions to group by: year, month, transaction_type, category, merchant_key",
+    ),
+) -> List[MonthlySummaryResponse]:
+    """Query month- and range-level transaction totals from the monthly rollup.
+
+    Reads pre-aggregated rows, so the cost depends on the number of months in range
+    rather than the number of transactions.
+
+    Args:
+    - `current_user`: Authenticated user (from Clerk JWT)
+    - `start_month`: First month (inclusive), 'YYYY-MM'
+    - `end_month`: Last month (inclusive), 'YYYY-MM'
+    - `transaction_type`: Filter by transaction type ('debit' or 'credit')
+    - `category`: Filter by transaction category
+    - `group_by`: Dimensions to group by (default: year, month, transaction_type)
+
+    Returns:
+    - `List[MonthlySummaryResponse]`: One row per group
+
+    Raises:
+    - `HTTPException`: If the range or group_by is invalid, or the query fails
+    """
+    start = _parse_year_month(start_month)
+    end = _parse_year_month(end_month)
+    if start and end and end < start:
+        raise HTTPException(status_code=400, detail="end_month must be >= start_month")
+
+    try:
+        rows = await asyncio.to_thread(
+            database_service.get_monthly_rollup,
+            user_id=current_user.id,
+            start_month=start,
+            end_month=end,
+            transaction_type=transaction_type,
+            category=category,
+            group_by=group_by,
+        )
+        return [MonthlySummaryResponse(**row) for row in rows]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to query monthly summary: {str(e)}",
+        )
+
+
 @router.post("/transactions/subscriptions/classify", response_model=ClassificationSummaryResponse)
 async def classify_subscriptions(
     current_user: User = Depends(get_current_user),
@@ -352,16 +497,24 @@ async def review_subscription_transaction(
     )
 
 
-@router.get("/transactions/subscriptions/needs-review", response_model=List[BankingTransactionResponse])
+@router.get("/transactions/subscriptions/needs-review", response_model=Union[List[BankingTransactionResponse], BankingTransactionPageResponse])
 async def query_subscriptions_needs_review(
     current_user: User = Depends(get_current_user),
     start_date: Optional[date] = Query(default=None, description="Filter transactions from this date onwards (inclusive)"),
     end_date: Optional[date] = Query(default=None, description="Filter transactions up to this date (inclusive)"),
     limit: Optional[int] = Query(default=None, ge=1, le=1000, description="Maximum number of results to return"),
     offset: int = Query(default=0, ge=0, description="Number of results to skip (for pagination)"),
-) -> List[BankingTransactionResponse]:
-    """Query debit transactions that need manual subscription review."""
+    cursor: Optional[str] = Query(default=None, description="Cursor from a previous page's next_cursor (implies pagination='cursor')"),
+    pagination: str = Query(default="offset", pattern="^(offset|cursor)$", description="'offset' returns a list; 'cursor' returns a page with next_cursor"),
+) -> Union[List[BankingTransactionResponse], BankingTransactionPageResponse]:
+    """Query debit transactions that need manual subscription review.
+
+    In cursor mode results are returned as a page ordered by (transaction_date, id) descending.
+    """
     user_id = current_user.id
+    use_cursor = pagination == "cursor" or cursor is not None
+    if use_cursor and limit is None:
+        limit = DEFAULT_CURSOR_PAGE_SIZE
 
     # Validate date range - if one is provided, both must be provided
     if (start_date is None) != (end_date is None):
@@ -379,9 +532,10 @@ async def query_subscriptions_needs_review(
             end_date=end_date,
             limit=limit,
             offset=offset,
+            cursor=cursor,
         )
 
-        return [
+        items = [
             BankingTransactionResponse(
                 id=tx.id,
                 user_id=tx.user_id,
@@ -410,6 +564,11 @@ async def query_subscriptions_needs_review(
             )
             for tx in transactions
         ]
+        if use_cursor:
+            return _to_page(transactions, items, limit, "transaction_date")
+        return items
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -417,7 +576,7 @@ async def query_subscriptions_needs_review(
         )
 
 
-@router.get("/transactions/subscriptions", response_model=List[BankingTransactionResponse])
+@router.get("/transactions/subscriptions", response_model=Union[List[BankingTransactionResponse], BankingTransactionPageResponse])
 async def query_subscriptions_all(
     current_user: User = Depends(get_current_user),
     start_date: Optional[date] = Query(default=None, description="Filter transactions from this date onwards (inclusive)"),
@@ -425,9 +584,11 @@ async def query_subscriptions_all(
     transaction_year: Optional[int] = Query(default=None, description="Filter by transaction year"),
     limit: Optional[int] = Query(default=None, ge=1, le=1000, description="Maximum number of results to return"),
     offset: int = Query(default=0, ge=0, description="Number of results to skip (for pagination)"),
+    cursor: Optional[str] = Query(default=None, description="Cursor from a previous page's next_cursor (implies pagination='cursor')"),
+    pagination: str = Query(default="offset", pattern="^(offset|cursor)$", description="'offset' returns a list; 'cursor' returns a page with next_cursor"),
     order_by: str = Query(default="transaction_date", description="Field to order by (default: 'transaction_date')"),
     order_desc: bool = Query(default=True, description="If True, order descending; if False, order ascending"),
-) -> List[BankingTransactionResponse]:
+) -> Union[List[BankingTransactionResponse], BankingTransactionPageResponse]:
     """Query all banking transactions classified as subscriptions.
     
     This endpoint returns transactions where is_subscription == True and transaction_type == 'debit'.
@@ -440,16 +601,24 @@ async def query_subscriptions_all(
     - `transaction_year`: Filter by transaction year
     - `limit`: Maximum number of results to return
     - `offset`: Number of results to skip (for pagination)
+    - `cursor`: Opaque cursor from a previous page's next_cursor
+    - `pagination`: 'offset' (plain list) or 'cursor' (keyset page with next_cursor)
     - `order_by`: Field to order by (default: 'transaction_date')
     - `order_desc`: If True, order descending; if False, order ascending
         
     Returns:
-    - `List[BankingTransactionResponse]`: List of matching subscription transactions
+    - `List[BankingTransactionResponse]`: List of matching subscription transactions (offset mode)
+    - `BankingTransactionPageResponse`: Page of transactions plus next_cursor (cursor mode)
         
     Raises:
     - `HTTPException`: If query fails or date range is invalid
     """
     user_id = current_user.id
+    use_cursor = pagination == "cursor" or cursor is not None
+    if use_cursor:
+        _check_cursor_order(order_by)
+        if limit is None:
+            limit = DEFAULT_CURSOR_PAGE_SIZE
     
     # Validate date range - if one is provided, both must be provided
     if (start_date is None) != (end_date is None):
@@ -474,12 +643,13 @@ async def query_subscriptions_all(
             transaction_year=transaction_year,
             limit=limit,
             offset=offset,
+            cursor=cursor,
             order_by=order_by,
             order_desc=order_desc,
         )
         
         # Convert to response models with subscription metadata
-        return [
+        items = [
             BankingTransactionResponse(
                 id=tx.id,
                 user_id=tx.user_id,
@@ -508,6 +678,11 @@ async def query_subscriptions_all(
             )
             for tx in transactions
         ]
+        if use_cursor:
+            return _to_page(transactions, items, limit, order_by)
+        return items
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -522,7 +697,11 @@ async def query_subscriptions_aggregated(
     transaction_year: Optional[int] = Query(default=None, description="Filter by transaction year"),
     limit: Optional[int] = Query(default=None, ge=1, le=1000, description="Maximum number of results to return"),
     offset: int = Query(default=0, ge=0, description="Number of results to skip (for pagination)"),
-    order_by: str = Query(default="transaction_date", description="Field to order by (default: 'transaction_date')"),
+    order_by: str = Query(
+        default="total_amount",
+        pattern="^(total_amount|average_monthly_amount|no_months_subscribed|transaction_count|confidence_avg|merchant_key|last_transaction_date)$",
+        description="Aggregate field to order by (default: 'total_amount')",
+    ),
     order_desc: bool = Query(default=True, description="If True, order descending; if False, order ascending"),
 ) -> List[SubscriptionAggregatedResponse]:
     """Query subscription transactions aggregated by merchant.
@@ -535,9 +714,9 @@ async def query_subscriptions_aggregated(
     - `start_date`: Filter transactions from this date onwards (inclusive)
     - `end_date`: Filter transactions up to this date (inclusive)
     - `transaction_year`: Filter by transaction year
-    - `limit`: Maximum number of results to return
-    - `offset`: Number of results to skip (for pagination)
-    - `order_by`: Field to order by (default: 'transaction_date')
+    - `limit`: Maximum number of subscriptions (groups) to return
+    - `offset`: Number of subscriptions (groups) to skip (for pagination)
+    - `order_by`: Aggregate field to order by (default: 'total_amount')
     - `order_desc`: If True, order descending; if False, order ascending
         
     Returns:
@@ -562,10 +741,9 @@ async def query_subscriptions_aggregated(
         )
     
     try:
-        transactions = database_service.filter_banking_transactions(
+        rows = await asyncio.to_thread(
+            database_service.aggregate_subscriptions,
             user_id=user_id,
-            is_subscription=True,
-            transaction_type='debit',  # Only debit transactions are considered as subscriptions
             start_date=start_date,
             end_date=end_date,
             transaction_year=transaction_year,
@@ -575,54 +753,18 @@ async def query_subscriptions_aggregated(
             order_desc=order_desc,
         )
 
-        if not transactions:
-            return []
-
-        # Convert SQLModel objects to dictionaries for pandas DataFrame
-        # Use subscription_merchant_key if available, otherwise fall back to merchant_name
-        transactions_dict = [
-            {
-                'merchant_key': tx.subscription_merchant_key or tx.merchant_name or 'Unknown',
-                'display_name': tx.subscription_name or tx.merchant_name or 'Unknown',
-                'category': tx.category,
-                'amount': float(tx.amount) if tx.amount else 0.0,
-                'transaction_month': tx.transaction_month,
-                'confidence': tx.subscription_confidence,
-            }
-            for tx in transactions
-        ]
-        
-        transactions_df = pd.DataFrame(transactions_dict)
-        
-        # Group by merchant_key and category
-        aggregated_df = transactions_df.groupby(['merchant_key', 'category']).agg({
-            'display_name': 'first',  # Take first display name
-            'amount': 'sum',
-            'transaction_month': 'nunique',
-            'confidence': 'mean',
-            'merchant_key': 'count',  # Count for transaction_count
-        }).rename(columns={'merchant_key': 'transaction_count'}).reset_index()
-
-        aggregated_df['average_monthly_amount'] = aggregated_df['amount'] / aggregated_df['transaction_month']
-        aggregated_df.rename(columns={
-            'transaction_month': 'no_months_subscribed',
-            'amount': 'total_amount',
-            'confidence': 'confidence_avg',
-        }, inplace=True)
-
-        # Convert to response models
         return [
             SubscriptionAggregatedResponse(
                 merchant_key=row['merchant_key'],
                 display_name=row['display_name'],
                 category=row['category'],
-                total_amount=Decimal(str(row['total_amount'])),
-                no_months_subscribed=int(row['no_months_subscribed']),
-                average_monthly_amount=Decimal(str(row['average_monthly_amount'])),
-                confidence_avg=row['confidence_avg'] if pd.notna(row['confidence_avg']) else None,
-                transaction_count=int(row['transaction_count']),
+                total_amount=row['total_amount'],
+                no_months_subscribed=row['no_months_subscribed'],
+                average_monthly_amount=row['average_monthly_amount'],
+                confidence_avg=row['confidence_avg'],
+                transaction_count=row['transaction_count'],
             )
-            for _, row in aggregated_df.iterrows()
+            for row in rows
         ]
     except Exception as e:
         raise HTTPException(
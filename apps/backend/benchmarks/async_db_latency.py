@@ -0,0 +1,128 @@
+"""
+Benchmark: request latency under concurrent load, blocking vs async database sessions.
+
+Each simulated request performs the lookup done by ``core.auth.get_current_user``
+(``get_user_by_clerk_id``). The "blocking" path opens a synchronous SQLModel
+``Session`` inside a coroutine (the pre-async behaviour), the "async" path awaits
+``DatabaseService.get_user_by_clerk_id`` on the async engine.
+
+A heartbeat task ticks every millisecond to show how long the event loop is stalled,
+which is what every other request on the same uvicorn worker experiences.
+
+Requires a reachable Postgres configured through the usual settings/.env.
+
+Usage:
+    python -m benchmarks.async_db_latency --requests 2000 --concurrency 1 10 50 100
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from sqlmodel import Session, select
+
+try:
+    from backend.models.user import User
+    from backend.services.db.postgres_connector import database_service
+except ImportError:
+    import sys
+    from pathlib import Path
+    apps_dir = Path(__file__).parent.parent.parent  # Go up to apps/
+    if str(apps_dir) not in sys.path:
+        sys.path.insert(0, str(apps_dir))
+    from backend.models.user import User
+    from backend.services.db.postgres_connector import database_service
+
+
+CLERK_ID = "benchmark_clerk_user"
+
+
+async def blocking_lookup(clerk_id: str) -> None:
+    """Pre-async behaviour: a blocking Session used directly on the event loop."""
+    with Session(database_service.engine) as session:
+        session.exec(select(User).where(User.clerk_id == clerk_id)).first()
+
+
+async def async_lookup(clerk_id: str) -> None:
+    """Current behaviour: non-blocking lookup on the async engine."""
+    await database_service.get_user_by_clerk_id(clerk_id)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_load(
+    lookup: Callable[[str], Awaitable[None]],
+    total_requests: int,
+    concurrency: int,
+) -> Dict[str, float]:
+    """Fire ``total_requests`` lookups with at most ``concurrency`` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    loop_lag: List[float] = []
+    stop = asyncio.Event()
+
+    async def heartbeat() -> None:
+        interval = 0.001
+        while not stop.is_set():
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            loop_lag.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+    async def one_request() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await lookup(CLERK_ID)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total_requests)))
+    wall_time = time.perf_counter() - wall_start
+    stop.set()
+    await heartbeat_task
+
+    return {
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+        "max_loop_lag_ms": max(loop_lag) if loop_lag else 0.0,
+        "throughput_rps": total_requests / wall_time if wall_time > 0 else 0.0,
+    }
+
+
+async def main(total_requests: int, concurrency_levels: List[int]) -> None:
+    # Warm both pools so connection setup is not part of the measurement
+    await run_load(blocking_lookup, 20, 5)
+    await run_load(async_lookup, 20, 5)
+
+    header = f"{'mode':<10}{'conc':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'loop lag':>10}{'req/s':>10}"
+    print(header)
+    print("-" * len(header))
+    for concurrency in concurrency_levels:
+        for mode, lookup in (("blocking", blocking_lookup), ("async", async_lookup)):
+            stats = await run_load(lookup, total_requests, concurrency)
+            print(
+                f"{mode:<10}{concurrency:>6}"
+                f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+                f"{stats['max_loop_lag_ms']:>10.2f}{stats['throughput_rps']:>10.0f}"
+            )
+
+    await database_service.async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100], help="Concurrency levels")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,202 @@
+"""
+Benchmark: per-row vs column-wise normalisation of extracted transactions.
+
+Generates N synthetic raw transactions (100k by default), shaped like the extractor's
+LLM output, and normalises them two ways, reporting best-of wall time:
+
+- ``per-row``: the previous ``FinancialTextExtractor._transform_transaction`` loop,
+  copied below as ``legacy_transform``, which tries every date format on every row
+  and rebuilds the category list per row
+- ``columnar``: ``normalization.normalize_transactions``, which infers the date format
+  once per batch and converts whole columns
+
+Both outputs are compared before timing. No database or network access is needed.
+
+Usage:
+    python -m benchmarks.normalization --rows 100000 --repeat 3 --date-format "%d %b %Y"
+"""
+
+import argparse
+import gc
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+try:
+    from backend.schemas.transaction_category import FinancialTransactionCategory
+    from backend.services.document_parser.normalization import normalize_transactions
+except ImportError:
+    import sys
+    from pathlib import Path
+    apps_dir = Path(__file__).parent.parent.parent  # Go up to apps/
+    if str(apps_dir) not in sys.path:
+        sys.path.insert(0, str(apps_dir))
+    from backend.schemas.transaction_category import FinancialTransactionCategory
+    from backend.services.document_parser.normalization import normalize_transactions
+
+
+MERCHANTS = ["GRAB", "TNG EWALLET", "SHOPEE", "NETFLIX", "TESCO", "SHELL", "MYDIN", "SPOTIFY"]
+CATEGORIES = ["food_and_dining_out", "transportation", "subscriptions", "groceries", "food", "bills", "retail", ""]
+
+
+def generate(rows: int, date_format: str) -> List[Dict[str, Any]]:
+    """Synthetic raw transactions, as the LLM returns them."""
+    rng = random.Random(7)
+    start = date(2022, 1, 1)
+    transactions = []
+    for i in range(rows):
+        merchant = rng.choice(MERCHANTS)
+        transactions.append({
+            "transaction_date": (start + timedelta(days=rng.randrange(3 * 365))).strftime(date_format),
+            "description": f" {merchant} PURCHASE REF{i:08d} ",
+            "merchant_name": merchant if rng.random() < 0.8 else None,
+            "amount": rng.randrange(0, 50000) / 100,
+            "transaction_type": "CREDIT" if rng.random() < 0.1 else "debit",
+            "balance": rng.randrange(0, 10_000_000) / 100 if rng.random() < 0.9 else None,
+            "reference_number": f"REF{i:08d}",
+            "transaction_code": None,
+            "category": rng.choice(CATEGORIES),
+            "currency": "myr",
+            "is_subscription": merchant in ("NETFLIX", "SPOTIFY"),
+        })
+    return transactions
+
+
+def legacy_parse_date(date_str: str) -> datetime | None:
+    """Copy of the previous ``FinancialTextExtractor._parse_date``."""
+    if not date_str:
+        return None
+    date_str = str(date_str).strip()
+    date_formats = [
+        '%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%Y/%m/%d', '%d %b %Y',
+        '%d %B %Y', '%b %d, %Y', '%B %d, %Y', '%d-%b-%Y', '%d-%B-%Y',
+    ]
+    for fmt in date_formats:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+    try:
+        return pd.to_datetime(date_str).to_pydatetime()
+    except Exception:
+        pass
+    return None
+
+
+def legacy_transform(transaction: Dict[str, Any], user_upload_id: str) -> Dict[str, Any] | None:
+    """Copy of the previous ``FinancialTextExtractor._transform_transaction``."""
+    try:
+        transaction_date = legacy_parse_date(transaction.get('transaction_date', ''))
+        if not transaction_date:
+            return None
+        description = transaction.get('description', '').strip()
+        if not description:
+            return None
+        amount = float(transaction.get('amount', 0))
+        if amount <= 0:
+            return None
+        transaction_type = transaction.get('transaction_type', '').lower()
+        if transaction_type not in ['debit', 'credit']:
+            transaction_type = 'debit'
+        merchant_name = transaction.get('merchant_name')
+        if merchant_name:
+            merchant_name = merchant_name.strip() or None
+        balance = transaction.get('balance')
+        if balance is not None:
+            try:
+                balance = float(balance)
+            except (ValueError, TypeError):
+                balance = None
+        reference_number = transaction.get('reference_number')
+        if reference_number:
+            reference_number = str(reference_number).strip() or None
+        transaction_code = transaction.get('transaction_code')
+        if transaction_code:
+            transaction_code = str(transaction_code).strip() or None
+        category = transaction.get('category')
+        if category:
+            category = str(category).strip().lower()
+            valid_categories = [cat.value for cat in FinancialTransactionCategory]
+            if category not in valid_categories:
+                category_mapping = {
+                    'food': 'food_and_dining_out', 'dining': 'food_and_dining_out',
+                    'restaurant': 'food_and_dining_out', 'transport': 'transportation',
+                    'travel': 'transportation', 'bills': 'utilities', 'utilities': 'utilities',
+                    'shopping': 'other', 'retail': 'other',
+                }
+                category = category_mapping.get(category, 'other')
+            category = category if category in valid_categories else None
+        else:
+            category = None
+        currency = transaction.get('currency', 'MYR').strip().upper() or 'MYR'
+        return {
+            'user_upload_id': user_upload_id or '',
+            'transaction_date': transaction_date.strftime('%Y-%m-%d'),
+            'transaction_year': transaction_date.year,
+            'transaction_month': transaction_date.month,
+            'transaction_day': transaction_date.day,
+            'description': description,
+            'merchant_name': merchant_name,
+            'amount': round(amount, 2),
+            'transaction_type': transaction_type,
+            'balance': round(balance, 2) if balance is not None else None,
+            'reference_number': reference_number,
+            'transaction_code': transaction_code,
+            'category': category,
+            'currency': currency,
+            'is_subscription': transaction.get('is_subscription', False),
+        }
+    except Exception as e:
+        print(f"Error transforming transaction: {str(e)}")
+        return None
+
+
+def per_row(transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    results = (legacy_transform(tx, "benchmark") for tx in transactions)
+    return [tx for tx in results if tx is not None]
+
+
+def columnar(transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return normalize_transactions(transactions, "benchmark")
+
+
+def measure(normalize: Callable[[], list], repeat: int) -> Dict[str, float]:
+    """Best-of-``repeat`` wall time for one implementation."""
+    times: List[float] = []
+    count = 0
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = normalize()
+        times.append(time.perf_counter() - started)
+        count = len(result)
+        del result
+    return {"rows": count, "seconds": min(times)}
+
+
+def main(rows: int, repeat: int, date_format: str) -> None:
+    transactions = generate(rows, date_format)
+
+    expected, actual = per_row(transactions), columnar(transactions)
+    if expected != actual:
+        mismatches = sum(1 for old, new in zip(expected, actual) if old != new)
+        print(f"warning: outputs differ ({len(expected)} vs {len(actual)} rows, {mismatches} mismatched)")
+
+    header = f"{'mode':<10}{'rows':>9}{'time s':>10}{'rows/s':>12}"
+    print(header)
+    print("-" * len(header))
+    for mode, normalize in (("per-row", per_row), ("columnar", columnar)):
+        stats = measure(lambda: normalize(transactions), repeat)
+        print(f"{mode:<10}{stats['rows']:>9}{stats['seconds']:>10.3f}{stats['rows'] / stats['seconds']:>12,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic transactions to generate")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (best is reported)")
+    parser.add_argument("--date-format", default="%d %b %Y", help="strftime format of the raw dates")
+    args = parser.parse_args()
+    main(args.rows, args.repeat, args.date_format)
@@ -0,0 +1,182 @@
+"""
+Benchmark: full ORM entities vs column projection in ``filter_banking_transactions``.
+
+Seeds a throwaway user with N synthetic transactions (50k by default), then loads them
+back three ways and reports wall time and peak Python heap (tracemalloc):
+
+- ``entities``: ``filter_banking_transactions(...)`` returning ``BankingTransaction`` objects
+- ``sankey``: ``columns=SANKEY_COLUMNS`` (4 columns, what ``to_sankey`` reads)
+- ``analysis``: ``columns=ANALYSIS_COLUMNS`` (8 columns, what the analyzer reads)
+
+The seeded user, upload and transactions are deleted afterwards.
+
+Requires a reachable Postgres configured through the usual settings/.env.
+
+Usage:
+    python -m benchmarks.projection_memory --rows 50000 --repeat 3
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import delete
+from sqlmodel import Session
+
+try:
+    from backend.models.banking_transaction import BankingTransaction
+    from backend.models.monthly_rollup import MonthlyRollup
+    from backend.models.user import User
+    from backend.models.user_upload import UserUpload
+    from backend.services.ai_agent.transaction_analyzer import ANALYSIS_COLUMNS
+    from backend.services.db.postgres_connector import database_service
+    from backend.utils.sankey import SANKEY_COLUMNS
+except ImportError:
+    import sys
+    from pathlib import Path
+    apps_dir = Path(__file__).parent.parent.parent  # Go up to apps/
+    if str(apps_dir) not in sys.path:
+        sys.path.insert(0, str(apps_dir))
+    from backend.models.banking_transaction import BankingTransaction
+    from backend.models.monthly_rollup import MonthlyRollup
+    from backend.models.user import User
+    from backend.models.user_upload import UserUpload
+    from backend.services.ai_agent.transaction_analyzer import ANALYSIS_COLUMNS
+    from backend.services.db.postgres_connector import database_service
+    from backend.utils.sankey import SANKEY_COLUMNS
+
+
+MERCHANTS = ["GRAB", "TNG EWALLET", "SHOPEE", "NETFLIX", "TESCO", "SHELL", "MYDIN", "SPOTIFY"]
+CATEGORIES = ["food", "transport", "shopping", "subscriptions", "groceries", "fuel", "utilities"]
+
+
+def seed(rows: int) -> Dict[str, object]:
+    """Create a benchmark user and upload holding ``rows`` synthetic transactions."""
+    with Session(database_service.engine) as session:
+        user = User(email=f"bench_{uuid.uuid4().hex[:8]}@example.com")
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        user_id = user.id
+
+    file_id = str(uuid.uuid4())
+    database_service.create_user_upload(
+        UserUpload(
+            file_id=file_id,
+            user_id=user_id,
+            file_name="benchmark.json",
+            file_type="json",
+            file_size=0,
+            file_url="benchmark",
+            file_mime_type="application/json",
+            file_extension="json",
+            statement_type="banking_transaction",
+            expense_month=1,
+            expense_year=2024,
+        )
+    )
+
+    rng = random.Random(7)
+    start = date(2022, 1, 1)
+    transactions = []
+    for i in range(rows):
+        tx_date = start + timedelta(days=rng.randrange(3 * 365))
+        merchant = rng.choice(MERCHANTS)
+        transactions.append(
+            BankingTransaction(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                file_id=file_id,
+                transaction_date=tx_date,
+                transaction_year=tx_date.year,
+                transaction_month=tx_date.month,
+                transaction_day=tx_date.day,
+                description=f"{merchant} PURCHASE REF{i:08d}",
+                merchant_name=merchant,
+                amount=Decimal(rng.randrange(100, 50000)) / 100,
+                transaction_type="credit" if rng.random() < 0.1 else "debit",
+                balance=Decimal(rng.randrange(0, 10_000_000)) / 100,
+                reference_number=f"REF{i:08d}",
+                category=rng.choice(CATEGORIES),
+                currency="MYR",
+            )
+        )
+    database_service.ingest_banking_transactions(transactions)
+    return {"user_id": user_id, "file_id": file_id}
+
+
+def cleanup(user_id: int, file_id: str) -> None:
+    """Remove the benchmark transactions, monthly rollups, upload and user.
+
+    Uses Core DELETEs: deleting the upload through the ORM would first try to null
+    out the NOT NULL ``file_id`` of every loaded transaction.
+    """
+    transactions = BankingTransaction.__table__
+    rollups = MonthlyRollup.__table__
+    uploads = UserUpload.__table__
+    users = User.__table__
+    with database_service.engine.begin() as connection:
+        connection.execute(delete(transactions).where(transactions.c.file_id == file_id))
+        connection.execute(delete(rollups).where(rollups.c.user_id == user_id))
+        connection.execute(delete(uploads).where(uploads.c.file_id == file_id))
+        connection.execute(delete(users).where(users.c.id == user_id))
+
+
+def measure(load: Callable[[], list], repeat: int) -> Dict[str, float]:
+    """Best-of-``repeat`` wall time and peak traced memory for one loader."""
+    times: List[float] = []
+    peaks: List[int] = []
+    count = 0
+    for _ in range(repeat):
+        gc.collect()
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = load()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        count = len(result)
+        del result
+        times.append(elapsed)
+        peaks.append(peak)
+    return {"rows": count, "seconds": min(times), "peak_mb": min(peaks) / (1024 * 1024)}
+
+
+def main(rows: int, repeat: int) -> None:
+    seeded = seed(rows)
+    user_id, file_id = seeded["user_id"], seeded["file_id"]
+
+    def loader(columns: Optional[Sequence[str]]) -> Callable[[], list]:
+        return lambda: database_service.filter_banking_transactions(
+            user_id=user_id,
+            file_id=file_id,
+            columns=columns,
+        )
+
+    try:
+        # Warm the pool and the statement cache
+        loader(None)()
+
+        header = f"{'mode':<10}{'columns':>9}{'rows':>9}{'time s':>10}{'peak MB':>10}"
+        print(header)
+        print("-" * len(header))
+        for mode, columns in (("entities", None), ("analysis", ANALYSIS_COLUMNS), ("sankey", SANKEY_COLUMNS)):
+            stats = measure(loader(columns), repeat)
+            width = len(columns) if columns else len(BankingTransaction.__table__.c)
+            print(f"{mode:<10}{width:>9}{stats['rows']:>9}{stats['seconds']:>10.3f}{stats['peak_mb']:>10.1f}")
+    finally:
+        cleanup(user_id, file_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000, help="Synthetic transactions to seed")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (best is reported)")
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -50,8 +50,31 @@ class AppSettings(BaseSettings):
     POSTGRES_SSLMODE: str = os.getenv("POSTGRES_SSLMODE", "prefer")
     POSTGRES_POOL_SIZE: int = 10
     POSTGRES_MAX_OVERFLOW: int = 5
+    POSTGRES_ASYNC_DRIVER: Literal["psycopg", "asyncpg"] = "psycopg"
     CHECKPOINT_TABLES: List[str] = ["checkpoint_blobs", "checkpoint_writes", "checkpoints"]
 
+    # Statement processing job queue
+    JOB_WORKER_IN_PROCESS: bool = True  # Run workers inside the API process; set False when using the separate worker entry point
+    JOB_WORKER_CONCURRENCY: int = 2  # Jobs processed at once per worker process (bounds LLM load)
+    JOB_WORKER_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BASE_DELAY_SECONDS: int = 30  # Exponential backoff: base * 2^(attempt - 1)
+    JOB_STALE_AFTER_SECONDS: int = 900  # Running jobs not heartbeated for this long are assumed orphaned and requeued
+    JOB_HEARTBEAT_INTERVAL_SECONDS: int = 60  # Running jobs refresh their lock this often (keep well below JOB_STALE_AFTER_SECONDS)
+
+    # Statement extraction (chunk scheduler shared by every upload in a process)
+    EXTRACTION_MAX_CONCURRENCY: int = 4  # LLM chunk requests in flight at once per process
+    EXTRACTION_TOKENS_PER_MINUTE: int = 150000  # Estimated tokens admitted per minute per process (keep below the API rate limit)
+    EXTRACTION_MAX_ATTEMPTS: int = 4  # Requests per chunk before it is reported as failed
+    EXTRACTION_RETRY_BASE_DELAY_SECONDS: float = 2.0  # Exponential backoff: base * 2^(attempt - 1), plus jitter
+    EXTRACTION_PROCESS_WORKERS: int = 2  # Worker processes for PDF and spreadsheet parsing (kept off the event loop)
+    EXTRACTION_CHUNK_CACHE_ENABLED: bool = True  # Reuse LLM output for identical chunks (retries, re-uploads, reprocessing)
+    EXTRACTION_CHUNK_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # Cached output kept in Postgres; least recently used entries are evicted beyond this
+
+    # File uploads
+    UPLOAD_CONCURRENCY: int = 4  # Files from one upload request stored (object store + DB) at once
+    UPLOAD_PROGRESS_POLL_SECONDS: float = 2.0  # Progress streams re-read the upload row this often (covers out-of-process workers)
+
     # Minio settings
     MINIO_ENDPOINT: str
     MINIO_SECURE: int = 0 # 0 for http, 1 for https
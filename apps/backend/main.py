@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
@@ -5,14 +7,26 @@ from fastapi.middleware.cors import CORSMiddleware
 from config import settings
 from services.db.postgres_connector import database_service
 from services.object_store.minio_connector import get_minio_connector
+from services.jobs.worker import job_worker
 from api.v1.api import api_router
 
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the statement-processing worker pool alongside the API when configured."""
+    if settings.JOB_WORKER_IN_PROCESS:
+        job_worker.start()
+    yield
+    if settings.JOB_WORKER_IN_PROCESS:
+        await job_worker.stop()
+
+
 app = FastAPI(
     title="Claire API",
     description=settings.BACKEND_API_DESCRIPTION,
     version=settings.BACKEND_API_VERSION,
+    lifespan=lifespan,
 )
 
 # Trust all proxies (Railway/Vercel/etc handling SSL termination)
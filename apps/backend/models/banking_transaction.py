@@ -48,6 +48,8 @@ class BankingTransaction(BaseModel, table=True):
         subscription_name: Display name for the subscription
         subscription_reason_codes: Array of reason codes from AI classification
         subscription_updated_at: When subscription classification was last updated
+        fingerprint: Deterministic hash identifying the real-world transaction across
+            overlapping statements (unique per user)
         created_at: When the transaction was created
         user: Relationship to the user
         user_upload: Relationship to the source upload
@@ -78,6 +80,7 @@ class BankingTransaction(BaseModel, table=True):
     subscription_name: Optional[str] = None  # Display name
     subscription_reason_codes: Optional[List[str]] = Field(default=None, sa_column=Column(JSONB))
     subscription_updated_at: Optional[datetime] = None
+    fingerprint: Optional[str] = None
     user: "User" = Relationship()
     user_upload: "UserUpload" = Relationship(back_populates="banking_transactions")
 
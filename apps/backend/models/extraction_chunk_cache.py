@@ -0,0 +1,36 @@
+"""Chunk extraction cache model for reusing LLM output across retries and re-uploads."""
+
+from datetime import datetime, UTC
+from typing import Any, Dict, List
+
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Column, Field, SQLModel
+
+
+class ExtractionChunkCache(SQLModel, table=True):
+    """Transactions the LLM extracted from one request payload, shared across users.
+
+    Keyed by the SHA-256 of what was sent (a PDF chunk, a whole document or its text),
+    the model and the extraction prompt version. Entries are evicted least recently
+    used first once the table outgrows ``EXTRACTION_CHUNK_CACHE_MAX_BYTES``.
+
+    Attributes:
+        chunk_hash: SHA-256 hex digest of the request payload
+        model: Model that produced the output
+        prompt_version: Extraction prompt version the output was produced with
+        transactions: Transactions parsed from the model response (before normalisation)
+        size_bytes: Size of the serialised transactions, counted against the cache budget
+        hit_count: Times the entry has been served
+        created_at: When the output was cached
+        last_used_at: When the entry was last stored or served (LRU order)
+    """
+    __tablename__ = "extraction_chunk_cache"
+
+    chunk_hash: str = Field(primary_key=True)
+    model: str = Field(primary_key=True)
+    prompt_version: str = Field(primary_key=True)
+    transactions: List[Dict[str, Any]] = Field(sa_column=Column(JSONB, nullable=False))
+    size_bytes: int = Field(default=0)
+    hit_count: int = Field(default=0)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    last_used_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
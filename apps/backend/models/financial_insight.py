@@ -2,7 +2,8 @@
 
 from typing import TYPE_CHECKING, Optional
 
-from sqlmodel import Field, Relationship, JSON, Column
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, Relationship, Column
 
 from backend.models.base import BaseModel
 
@@ -38,7 +39,7 @@ class FinancialInsight(BaseModel, table=True):
     description: str
     icon: str = Field(default="Lightbulb")  # Icon identifier for UI
     severity: Optional[str] = Field(default=None)  # Values: 'info', 'warning', 'critical'
-    insight_metadata: Optional[dict] = Field(default=None, sa_column=Column("metadata", JSON))
+    insight_metadata: Optional[dict] = Field(default=None, sa_column=Column("metadata", JSONB))
     
     user: "User" = Relationship()
     user_upload: Optional["UserUpload"] = Relationship()
@@ -0,0 +1,42 @@
+"""Monthly rollup model for pre-aggregated transaction totals."""
+
+from datetime import datetime, UTC
+from decimal import Decimal
+
+from sqlalchemy import Column, Numeric
+from sqlmodel import Field, SQLModel
+
+
+class MonthlyRollup(SQLModel, table=True):
+    """Per-user monthly transaction totals, maintained alongside statement_banking_transaction.
+
+    One row per (user, year, month, transaction_type, category, merchant_key), so month- and
+    range-level aggregates are answered from a handful of rows instead of re-scanning
+    raw transactions.
+
+    Attributes:
+        user_id: Foreign key to the user
+        year: Transaction year
+        month: Transaction month (1-12)
+        transaction_type: 'debit' or 'credit'
+        category: Transaction category ('other' when uncategorised)
+        merchant_key: Merchant name ('Unknown' when missing)
+        total_amount: Sum of transaction amounts
+        transaction_count: Number of transactions
+        subscription_amount: Sum of amounts flagged as subscriptions
+        subscription_count: Number of transactions flagged as subscriptions
+        updated_at: When the row was last recomputed
+    """
+    __tablename__ = "monthly_rollup"
+
+    user_id: int = Field(foreign_key="app_users.id", primary_key=True)
+    year: int = Field(primary_key=True)
+    month: int = Field(primary_key=True, ge=1, le=12)
+    transaction_type: str = Field(primary_key=True)
+    category: str = Field(primary_key=True)
+    merchant_key: str = Field(primary_key=True)
+    total_amount: Decimal = Field(default=Decimal("0.00"), sa_column=Column(Numeric(15, 2), nullable=False))
+    transaction_count: int = Field(default=0)
+    subscription_amount: Decimal = Field(default=Decimal("0.00"), sa_column=Column(Numeric(15, 2), nullable=False))
+    subscription_count: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
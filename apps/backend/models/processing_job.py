@@ -0,0 +1,46 @@
+"""Processing job model for the durable statement-processing queue."""
+
+import uuid
+from datetime import datetime, UTC
+from typing import Any, Dict, Optional
+
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Column, Field
+
+from backend.models.base import BaseModel
+
+
+class ProcessingJob(BaseModel, table=True):
+    """A unit of background work claimed by queue workers with FOR UPDATE SKIP LOCKED.
+
+    Attributes:
+        id: The primary key (job identifier)
+        job_type: Handler to run (e.g. 'banking_statement')
+        user_id: Foreign key to the user
+        file_id: Foreign key to the upload the job processes
+        payload: Handler-specific JSON arguments
+        status: Job state (queued, running, succeeded, failed)
+        attempts: Number of times the job has been claimed
+        max_attempts: Attempts allowed before the job is marked failed
+        run_after: Earliest time the job may be claimed (used for retry backoff)
+        locked_by: Worker that currently holds the job
+        locked_at: When the job was claimed
+        last_error: Error from the most recent failed attempt
+        finished_at: When the job succeeded or permanently failed
+        created_at: When the job was enqueued
+    """
+    __tablename__ = "processing_job"
+
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
+    job_type: str
+    user_id: int = Field(foreign_key="app_users.id")
+    file_id: Optional[str] = Field(default=None, foreign_key="user_upload.file_id")
+    payload: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSONB))
+    status: str = Field(default="queued")  # Values: 'queued', 'running', 'succeeded', 'failed'
+    attempts: int = Field(default=0)
+    max_attempts: int = Field(default=3)
+    run_after: datetime = Field(default_factory=lambda: datetime.now(UTC).replace(tzinfo=None))
+    locked_by: Optional[str] = None
+    locked_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    finished_at: Optional[datetime] = None
@@ -1,11 +1,18 @@
 """This file contains the user upload model for the application."""
 
+from datetime import datetime
 from typing import (
     TYPE_CHECKING,
+    Any,
+    Dict,
     List,
+    Optional,
 )
 
+from sqlalchemy import Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import (
+    Column,
     Field,
     Relationship,
 )
@@ -32,11 +39,33 @@ class UserUpload(BaseModel, table=True):
         statement_type: Type of statement (banking_transaction, receipt, invoice, other)
         expense_month: Month of the expense (1-12)
         expense_year: Year of the expense
+        processing_status: Processing state (queued, extracting, analyzing, done, failed)
+        transaction_count: Number of transactions extracted from the upload
+        processing_error: Error message when processing failed
+        processing_started_at: When extraction started
+        processing_completed_at: When processing finished (done or failed)
+        content_hash: SHA-256 hex digest of the file bytes (used to detect re-uploads;
+            unique per user and statement type among uploads that have not failed)
+        processing_progress: Progress counters for the current run (chunks_total,
+            chunks_done, rows_extracted, rows_inserted, rows_deduplicated (updated per
+            inserted batch), analysis_started, insights_written) and the final
+            per-chunk extraction status (chunk_report)
         created_at: When the upload was created
         user: Relationship to the upload owner
         banking_transactions: Relationship to banking transactions extracted from this upload
     """
     __tablename__ = "user_upload"
+    __table_args__ = (
+        # Also created by postgres/init.sql; decides concurrent uploads of the same file
+        Index(
+            "idx_user_upload_user_type_content_hash",
+            "user_id",
+            "statement_type",
+            "content_hash",
+            unique=True,
+            postgresql_where=text("processing_status <> 'failed'"),
+        ),
+    )
 
     file_id: str = Field(primary_key=True)
     user_id: int = Field(foreign_key="app_users.id")
@@ -49,6 +78,13 @@ class UserUpload(BaseModel, table=True):
     statement_type: str  # Values: 'banking_transaction', 'receipt', 'invoice', 'other'
     expense_month: int = Field(ge=1, le=12)
     expense_year: int
+    processing_status: str = Field(default="done")  # Values: 'queued', 'extracting', 'analyzing', 'done', 'failed'
+    transaction_count: int = Field(default=0)
+    processing_error: Optional[str] = None
+    processing_started_at: Optional[datetime] = None
+    processing_completed_at: Optional[datetime] = None
+    content_hash: Optional[str] = None
+    processing_progress: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSONB(none_as_null=True)))
     user: "User" = Relationship(back_populates="uploads")
     banking_transactions: List["BankingTransaction"] = Relationship(back_populates="user_upload")
 
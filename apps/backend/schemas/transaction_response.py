@@ -46,6 +46,15 @@ class BankingTransactionResponse(BaseModel):
         from_attributes = True
 
 
+class BankingTransactionPageResponse(BaseModel):
+    """A page of banking transactions returned in cursor pagination mode."""
+    transactions: List[BankingTransactionResponse] = Field(..., description="Transactions on this page")
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor for the next page; null when there are no more results",
+    )
+
+
 class SubscriptionAggregatedResponse(BaseModel):
     """Aggregated subscription response model for grouped subscription data."""
     merchant_key: str = Field(..., description="Normalized merchant key for grouping")
@@ -61,6 +70,19 @@ class SubscriptionAggregatedResponse(BaseModel):
         from_attributes = True
 
 
+class MonthlySummaryResponse(BaseModel):
+    """Aggregated totals read from the monthly rollup; dimension fields are set when grouped by."""
+    year: Optional[int] = Field(None, description="Transaction year")
+    month: Optional[int] = Field(None, description="Transaction month (1-12)")
+    transaction_type: Optional[str] = Field(None, description="Transaction type ('debit' or 'credit')")
+    category: Optional[str] = Field(None, description="Transaction category")
+    merchant_key: Optional[str] = Field(None, description="Merchant name")
+    total_amount: Decimal = Field(..., description="Total transaction amount")
+    transaction_count: int = Field(..., description="Number of transactions")
+    subscription_amount: Decimal = Field(..., description="Amount flagged as subscriptions")
+    subscription_count: int = Field(..., description="Number of transactions flagged as subscriptions")
+
+
 class ClassificationSummaryResponse(BaseModel):
     """Response model for subscription classification results."""
     total_processed: int = Field(..., description="Total number of transactions processed")
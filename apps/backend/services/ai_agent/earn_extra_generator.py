@@ -16,6 +16,17 @@ from backend.models.banking_transaction import BankingTransaction
 from backend.services.db.postgres_connector import database_service
 
 
+# Columns _build_spend_profile reads from each transaction
+SPEND_PROFILE_COLUMNS = [
+    "amount",
+    "currency",
+    "transaction_date",
+    "transaction_type",
+    "category",
+    "merchant_name",
+    "description",
+]
+
 SYSTEM_PROMPT = """
 You are an expert financial planning assistant for Malaysian users.
 Return ONLY valid JSON that matches the provided schema.
@@ -280,7 +291,11 @@ async def generate_earn_extra_plans(
 
     transactions = []
     if resolved_file_id:
-        transactions = database_service.filter_banking_transactions(user_id=user_id, file_id=resolved_file_id)
+        transactions = database_service.filter_banking_transactions(
+            user_id=user_id,
+            file_id=resolved_file_id,
+            columns=SPEND_PROFILE_COLUMNS,
+        )
 
     spend_profile = _build_spend_profile(transactions)
 
@@ -418,8 +418,8 @@ class SubscriptionClassifier:
             else:
                 summary.needs_review_count += 1
 
-        # Bulk update database
-        database_service.bulk_update_subscription_classification(updates)
+        # Apply the whole batch in one set-based UPDATE
+        database_service.apply_subscription_classification_batch(updates)
 
     def _mark_batch_as_needs_review(
         self,
@@ -447,7 +447,7 @@ class SubscriptionClassifier:
             summary.total_processed += 1
             summary.needs_review_count += 1
 
-        database_service.bulk_update_subscription_classification(updates)
+        database_service.apply_subscription_classification_batch(updates)
 
 
 # Singleton instance
@@ -2,14 +2,20 @@
 
 This module intentionally keeps *numbers deterministic* (computed from transactions)
 and uses the LLM primarily for *wording and prioritization*.
+
+In incremental mode, range analysis reads the persisted monthly rollup instead of raw
+rows, and the LLM is only called when the deterministic candidate set differs from the
+one the current insights were worded from.
 """
 
+import hashlib
+import json
 import uuid
 import re
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, TypedDict
-from collections import defaultdict
+from typing import Any, Dict, List, Literal, Optional, TypedDict
+from collections import Counter, defaultdict
 
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
@@ -33,12 +39,39 @@ except ImportError:
     from backend.services.db.postgres_connector import database_service
     from backend.utils.formatting import detect_file_currency, format_money
 
+# Columns the analysis pipeline reads from each transaction
+ANALYSIS_COLUMNS = [
+    "id",
+    "transaction_date",
+    "description",
+    "merchant_name",
+    "amount",
+    "transaction_type",
+    "category",
+    "currency",
+]
+
+# Candidate generation limits, shared by the row-level and rollup-backed summaries
+TOP_CATEGORY_CANDIDATES = 8
+TOP_MERCHANT_CANDIDATES = 10
+MERCHANT_FREQUENCY_MIN_COUNT = 4
+LARGEST_DEBIT_CANDIDATES = 5
+SUPPORTING_TRANSACTION_LIMIT = 3
+# Number of top candidates shown to the LLM
+LLM_CANDIDATE_LIMIT = 6
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+AnalysisMode = Literal["full", "incremental"]
+
 
 class AgentState(TypedDict):
     """State for the transaction analyzer agent."""
     user_id: int
     file_id: Optional[str]
+    mode: AnalysisMode
     transactions: List[Dict[str, Any]]
+    summary: Optional[Dict[str, Any]]  # pre-aggregated totals (incremental range mode)
     aggregated_data: Dict[str, Any]
     file_currency: str
     time_range: Dict[str, Optional[str]]
@@ -47,6 +80,8 @@ class AgentState(TypedDict):
     patterns: List[Dict[str, Any]]  # spending insights (final)
     alerts: List[Dict[str, Any]]  # alerts (final)
     recommendations: List[Dict[str, Any]]  # recommendations (final)
+    candidate_signature: Optional[str]
+    reused: bool  # existing insights kept because the candidate set is unchanged
     insights: List[FinancialInsight]
 
 
@@ -161,13 +196,19 @@ class TransactionAnalyzerAgent:
         # Add nodes
         workflow.add_node("analyze_transactions", self._analyze_transactions)
         workflow.add_node("generate_alerts", self._generate_alerts)
+        workflow.add_node("reuse_insights", self._reuse_insights)
         workflow.add_node("finalize_insights", self._finalize_insights)
         workflow.add_node("save_insights", self._save_insights)
 
-        # Define edges (linear flow)
+        # Define edges (linear flow, short-circuited when existing insights are reused)
         workflow.set_entry_point("analyze_transactions")
         workflow.add_edge("analyze_transactions", "generate_alerts")
-        workflow.add_edge("generate_alerts", "finalize_insights")
+        workflow.add_edge("generate_alerts", "reuse_insights")
+        workflow.add_conditional_edges(
+            "reuse_insights",
+            lambda state: "reused" if state.get("reused") else "changed",
+            {"reused": END, "changed": "finalize_insights"},
+        )
         workflow.add_edge("finalize_insights", "save_insights")
         workflow.add_edge("save_insights", END)
 
@@ -200,18 +241,17 @@ class TransactionAnalyzerAgent:
             return 0.0
         return float((numerator / denominator) * Decimal("100"))
 
-    def _analyze_transactions(self, state: AgentState) -> AgentState:
-        """Aggregate transaction data + produce scored insight candidates (deterministic)."""
-        transactions = state["transactions"]
-        
-        if not transactions:
-            state["aggregated_data"] = {}
-            state["file_currency"] = "MYR"
-            state["time_range"] = {"start": None, "end": None}
-            state["candidates"] = []
-            return state
+    def _top_transaction_ids(self, txs: List[Dict[str, Any]]) -> List[str]:
+        """IDs of the largest transactions, largest first."""
+        txs_sorted = sorted(
+            txs,
+            key=lambda t: Decimal(str(t.get("amount", "0"))),
+            reverse=True,
+        )
+        return [str(t.get("id")) for t in txs_sorted[:SUPPORTING_TRANSACTION_LIMIT] if t.get("id")]
 
-        # Aggregate by category
+    def _summarize_transactions(self, transactions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Aggregate transaction rows into the totals candidate generation works from."""
         category_totals = defaultdict(lambda: {"total": Decimal("0"), "count": 0, "txs": []})
         merchant_totals = defaultdict(lambda: {"total": Decimal("0"), "count": 0, "txs": []})
         weekday_spending = defaultdict(lambda: {"total": Decimal("0"), "count": 0})
@@ -257,12 +297,139 @@ class TransactionAnalyzerAgent:
                     weekday_spending[weekday]["total"] += amount
                     weekday_spending[weekday]["count"] += 1
 
-        file_currency = detect_file_currency(currencies, default="MYR", dominant_threshold=0.9)
-        start_dt = min(date_values) if date_values else None
-        end_dt = max(date_values) if date_values else None
+        largest = sorted(
+            [tx for tx in transactions if tx.get("transaction_type", "debit") != "credit"],
+            key=lambda t: Decimal(str(t.get("amount", "0"))),
+            reverse=True,
+        )[:LARGEST_DEBIT_CANDIDATES]
+
+        return {
+            "transaction_count": len(transactions),
+            "total_income": total_income,
+            "total_expenses": total_expenses,
+            "category_totals": {
+                k: {"total": v["total"], "count": v["count"], "supporting_ids": self._top_transaction_ids(v["txs"])}
+                for k, v in category_totals.items()
+            },
+            "merchant_totals": {
+                k: {"total": v["total"], "count": v["count"], "supporting_ids": self._top_transaction_ids(v["txs"])}
+                for k, v in merchant_totals.items()
+            },
+            "weekday_spending": dict(weekday_spending),
+            "median_expense": sorted(expense_amounts)[len(expense_amounts) // 2] if expense_amounts else None,
+            "largest_debits": [
+                {"id": tx.get("id"), "amount": Decimal(str(tx.get("amount", "0")))} for tx in largest
+            ],
+            "currencies": currencies,
+            "first_date": min(date_values).strftime("%Y-%m-%d") if date_values else None,
+            "last_date": max(date_values).strftime("%Y-%m-%d") if date_values else None,
+        }
+
+    def _summarize_range(
+        self,
+        user_id: int,
+        start_date: Optional[date],
+        end_date: Optional[date],
+    ) -> Dict[str, Any]:
+        """Build the same summary as ``_summarize_transactions`` from persisted aggregates.
+
+        Totals come from the monthly rollup (raw rows are only read for partial edge
+        months); medians, weekday totals and supporting IDs are computed in SQL, so no
+        transaction rows are loaded. Merchants are keyed by merchant name only, and
+        transactions without one are left out of the merchant candidates.
+        """
+        category_totals = defaultdict(lambda: {"total": Decimal("0"), "count": 0})
+        merchant_totals = defaultdict(lambda: {"total": Decimal("0"), "count": 0})
+        total_income = Decimal("0")
+        total_expenses = Decimal("0")
+
+        for row in database_service.get_range_rollup_totals(user_id, start_date, end_date):
+            amount = Decimal(row["total_amount"])
+            count = int(row["transaction_count"])
+            if row["transaction_type"] == "credit":
+                total_income += amount
+                continue
+            total_expenses += amount
+            category_totals[row["category"]]["total"] += amount
+            category_totals[row["category"]]["count"] += count
+            if row["merchant_key"] != "Unknown":
+                merchant_totals[row["merchant_key"]]["total"] += amount
+                merchant_totals[row["merchant_key"]]["count"] += count
+
+        # Supporting IDs are only needed for the groups candidate generation looks at
+        top_categories = [
+            category for category, _ in sorted(
+                category_totals.items(), key=lambda kv: kv[1]["total"], reverse=True
+            )[:TOP_CATEGORY_CANDIDATES]
+        ]
+        top_merchants = [
+            merchant for merchant, data in sorted(
+                merchant_totals.items(), key=lambda kv: (kv[1]["count"], kv[1]["total"]), reverse=True
+            )[:TOP_MERCHANT_CANDIDATES]
+            if data["count"] >= MERCHANT_FREQUENCY_MIN_COUNT
+        ]
+        category_ids = database_service.get_top_transaction_ids(
+            user_id, "category", top_categories, start_date, end_date, per_group=SUPPORTING_TRANSACTION_LIMIT
+        )
+        merchant_ids = database_service.get_top_transaction_ids(
+            user_id, "merchant_key", top_merchants, start_date, end_date, per_group=SUPPORTING_TRANSACTION_LIMIT
+        )
+
+        stats = database_service.get_transaction_range_stats(user_id, start_date, end_date)
+        largest = database_service.filter_banking_transactions(
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            transaction_type="debit",
+            limit=LARGEST_DEBIT_CANDIDATES,
+            order_by="amount",
+            order_desc=True,
+            columns=["id", "amount"],
+        )
+        median = stats.get("median_debit")
+
+        return {
+            "transaction_count": int(stats.get("transaction_count") or 0),
+            "total_income": total_income,
+            "total_expenses": total_expenses,
+            "category_totals": {
+                k: {**v, "supporting_ids": category_ids.get(k, [])} for k, v in category_totals.items()
+            },
+            "merchant_totals": {
+                k: {**v, "supporting_ids": merchant_ids.get(k, [])} for k, v in merchant_totals.items()
+            },
+            "weekday_spending": {
+                WEEKDAYS[day - 1]: {"total": Decimal(v["total"]), "count": int(v["count"])}
+                for day, v in stats.get("weekday_debits", {}).items()
+            },
+            "median_expense": Decimal(median) if median is not None else None,
+            "largest_debits": [{"id": tx.id, "amount": Decimal(tx.amount)} for tx in largest],
+            "currencies": list(Counter(stats.get("currencies") or {}).elements()),
+            "first_date": stats["first_date"].isoformat() if stats.get("first_date") else None,
+            "last_date": stats["last_date"].isoformat() if stats.get("last_date") else None,
+        }
+
+    def _analyze_transactions(self, state: AgentState) -> AgentState:
+        """Aggregate transaction data + produce scored insight candidates (deterministic)."""
+        summary = state.get("summary") or self._summarize_transactions(state["transactions"])
+        
+        if not summary["transaction_count"]:
+            state["aggregated_data"] = {}
+            state["file_currency"] = "MYR"
+            state["time_range"] = {"start": None, "end": None}
+            state["candidates"] = []
+            return state
+
+        category_totals = summary["category_totals"]
+        merchant_totals = summary["merchant_totals"]
+        weekday_spending = summary["weekday_spending"]
+        total_income = summary["total_income"]
+        total_expenses = summary["total_expenses"]
+
+        file_currency = detect_file_currency(summary["currencies"], default="MYR", dominant_threshold=0.9)
         observed_time_range = {
-            "start": start_dt.strftime("%Y-%m-%d") if start_dt else None,
-            "end": end_dt.strftime("%Y-%m-%d") if end_dt else None,
+            "start": summary["first_date"],
+            "end": summary["last_date"],
         }
         requested_time_range = state.get("time_range") or {"start": None, "end": None}
         has_requested = bool(requested_time_range.get("start") and requested_time_range.get("end"))
@@ -277,7 +444,7 @@ class TransactionAnalyzerAgent:
             key=lambda kv: kv[1]["total"],
             reverse=True,
         )
-        for category, data in sorted_categories[:8]:
+        for category, data in sorted_categories[:TOP_CATEGORY_CANDIDATES]:
             if total_expenses <= 0:
                 continue
             share = float(data["total"] / total_expenses)
@@ -285,12 +452,7 @@ class TransactionAnalyzerAgent:
                 continue
 
             # supporting IDs: top 3 txs by amount for this category
-            txs_sorted = sorted(
-                data["txs"],
-                key=lambda t: Decimal(str(t.get("amount", "0"))),
-                reverse=True,
-            )
-            supporting_ids = [str(t.get("id")) for t in txs_sorted[:3] if t.get("id")]
+            supporting_ids = data["supporting_ids"]
             candidate_key = f"category_concentration:{self._normalize_key(category)}"
 
             metric_value = (
@@ -319,16 +481,11 @@ class TransactionAnalyzerAgent:
             key=lambda kv: (kv[1]["count"], kv[1]["total"]),
             reverse=True,
         )
-        for merchant, data in sorted_merchants[:10]:
-            if data["count"] < 4:
+        for merchant, data in sorted_merchants[:TOP_MERCHANT_CANDIDATES]:
+            if data["count"] < MERCHANT_FREQUENCY_MIN_COUNT:
                 continue
             share = float(data["total"] / total_expenses) if total_expenses > 0 else 0.0
-            txs_sorted = sorted(
-                data["txs"],
-                key=lambda t: Decimal(str(t.get("amount", "0"))),
-                reverse=True,
-            )
-            supporting_ids = [str(t.get("id")) for t in txs_sorted[:3] if t.get("id")]
+            supporting_ids = data["supporting_ids"]
             candidate_key = f"merchant_frequency:{self._normalize_key(merchant)}"
             metric_value = (
                 f"{data['count']} txs totaling {format_money(data['total'], file_currency)}"
@@ -352,19 +509,10 @@ class TransactionAnalyzerAgent:
             })
 
         # 3) Outlier spikes: largest individual debits
-        if expense_amounts:
-            median_expense = sorted(expense_amounts)[len(expense_amounts) // 2]
-            all_debits = [
-                tx for tx in transactions
-                if tx.get("transaction_type", "debit") != "credit"
-            ]
-            largest = sorted(
-                all_debits,
-                key=lambda t: Decimal(str(t.get("amount", "0"))),
-                reverse=True,
-            )[:5]
-            for tx in largest:
-                amt = Decimal(str(tx.get("amount", "0")))
+        median_expense = summary["median_expense"]
+        if median_expense is not None:
+            for tx in summary["largest_debits"]:
+                amt = tx["amount"]
                 if median_expense > 0 and amt < median_expense * Decimal("3"):
                     continue
                 tx_id = tx.get("id")
@@ -413,7 +561,7 @@ class TransactionAnalyzerAgent:
                     "average": float(v["total"] / v["count"]) if v["count"] > 0 else 0}
                 for k, v in weekday_spending.items()
             },
-            "transaction_count": len(transactions),
+            "transaction_count": summary["transaction_count"],
             "time_range": effective_time_range,
             "observed_time_range": observed_time_range,
             "file_currency": file_currency,
@@ -472,20 +620,64 @@ class TransactionAnalyzerAgent:
         state["alerts"] = alerts[:2]  # MVP: limit to 2 alerts
         return state
 
+    def _candidate_signature(self, state: AgentState) -> str:
+        """Hash of everything the LLM would word insights from."""
+        payload = {
+            "model": getattr(self.llm, "model_name", "unknown"),
+            "system_prompt": INSIGHTS_SYSTEM_PROMPT,
+            "file_currency": state.get("file_currency"),
+            "time_range": state.get("time_range"),
+            "candidates": [
+                {
+                    "key": c.get("key"),
+                    "metric_value": (c.get("metrics") or {}).get("metric_value"),
+                    "supporting_transaction_ids": c.get("supporting_transaction_ids"),
+                }
+                for c in (state.get("candidates") or [])[:LLM_CANDIDATE_LIMIT]
+            ],
+            "alerts": [
+                {"title": a.get("title"), "metric": a.get("metric")}
+                for a in state.get("alerts") or []
+            ],
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _reuse_insights(self, state: AgentState) -> AgentState:
+        """Keep the existing insights when the candidate set has not changed.
+
+        The candidate signature is stored on every saved insight. In incremental mode,
+        if every AI insight the save step would replace carries the current signature,
+        those insights are returned as-is and the LLM and the rewrite are skipped.
+        """
+        signature = self._candidate_signature(state)
+        state["candidate_signature"] = signature
+        state["reused"] = False
+        if state.get("mode") != "incremental":
+            return state
+
+        existing = database_service.get_user_ai_insights(
+            user_id=state["user_id"], file_id=state.get("file_id")
+        )
+        if existing and all(
+            (insight.insight_metadata or {}).get("candidate_signature") == signature
+            for insight in existing
+        ):
+            state["insights"] = existing
+            state["reused"] = True
+        return state
+
     def _finalize_insights(self, state: AgentState) -> AgentState:
         """Use LLM to select + phrase final insights from deterministic candidates.
 
         Output shape is validated later by the post-processing layer.
         """
-        import json
-
         candidates = state.get("candidates", []) or []
         alerts = state.get("alerts", []) or []
         file_currency = state.get("file_currency") or "MYR"
         time_range = state.get("time_range") or {"start": None, "end": None}
 
         # Pre-truncate candidates to keep the prompt small-model friendly
-        top_candidates = candidates[:6]
+        top_candidates = candidates[:LLM_CANDIDATE_LIMIT]
 
         schema = INSIGHTS_LLM_OUTPUT_JSON_SCHEMA
         system_prompt = INSIGHTS_SYSTEM_PROMPT
@@ -680,6 +872,7 @@ class TransactionAnalyzerAgent:
         file_currency = state.get("file_currency") or "MYR"
         time_range = state.get("time_range") or {"start": None, "end": None}
         observed_time_range = state.get("observed_time_range") or {"start": None, "end": None}
+        candidate_signature = state.get("candidate_signature")
         
         insights = []
         
@@ -704,6 +897,7 @@ class TransactionAnalyzerAgent:
                     "supporting_transaction_ids": pattern.get("supporting_transaction_ids", []),
                     "source_candidate_key": pattern.get("source_candidate_key"),
                     "model": getattr(self.llm, "model_name", "unknown"),
+                    "candidate_signature": candidate_signature,
                 },
             )
             insights.append(insight)
@@ -728,6 +922,7 @@ class TransactionAnalyzerAgent:
                     "metric": metric,
                     "supporting_transaction_ids": alert.get("supporting_transaction_ids", []),
                     "model": getattr(self.llm, "model_name", "unknown"),
+                    "candidate_signature": candidate_signature,
                 },
             )
             insights.append(insight)
@@ -750,6 +945,7 @@ class TransactionAnalyzerAgent:
                     "file_currency": file_currency,
                     "linked_to_title": rec.get("linked_to_title"),
                     "model": getattr(self.llm, "model_name", "unknown"),
+                    "candidate_signature": candidate_signature,
                 },
             )
             insights.append(insight)
@@ -776,6 +972,7 @@ class TransactionAnalyzerAgent:
         start_date: Optional[date] = None,
         end_date: Optional[date] = None,
         transactions: Optional[List[BankingTransaction]] = None,
+        mode: AnalysisMode = "full",
     ) -> List[FinancialInsight]:
         """Run the transaction analysis pipeline.
 
@@ -785,10 +982,19 @@ class TransactionAnalyzerAgent:
             start_date: Optional start date (inclusive) to filter transactions
             end_date: Optional end date (inclusive) to filter transactions
             transactions: Optional pre-loaded transactions (if None, will fetch from DB)
+            mode: 'full' recomputes from transaction rows and always rewords insights.
+                'incremental' aggregates range analyses from the monthly rollup (covering
+                the whole range rather than the latest 500 rows) and keeps the existing
+                insights when the candidate set is unchanged
 
         Returns:
-            List[FinancialInsight]: Generated insights
+            List[FinancialInsight]: Generated insights (or the reused existing ones)
         """
+        summary = None
+        if mode == "incremental" and file_id is None and transactions is None:
+            summary = self._summarize_range(user_id, start_date, end_date)
+            transactions = []
+
         # Fetch transactions if not provided
         if transactions is None:
             transactions = database_service.filter_banking_transactions(
@@ -798,6 +1004,7 @@ class TransactionAnalyzerAgent:
                 end_date=end_date,
                 limit=500,  # Limit for performance
                 order_desc=True,
+                columns=ANALYSIS_COLUMNS,
             )
 
         # Convert transactions to dictionaries
@@ -823,7 +1030,9 @@ class TransactionAnalyzerAgent:
         initial_state: AgentState = {
             "user_id": user_id,
             "file_id": file_id,
+            "mode": mode,
             "transactions": tx_dicts,
+            "summary": summary,
             "aggregated_data": {},
             "file_currency": "MYR",
             "patterns": [],
@@ -832,6 +1041,8 @@ class TransactionAnalyzerAgent:
             "time_range": requested_time_range,
             "observed_time_range": {"start": None, "end": None},
             "candidates": [],
+            "candidate_signature": None,
+            "reused": False,
             "insights": [],
         }
 
@@ -1,16 +1,50 @@
 """This file contains the database service for the application."""
 
-from datetime import date, datetime
+import base64
+import hashlib
+import json
+import re
+from collections import defaultdict
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from typing import (
+    Any,
+    Callable,
     Dict,
+    Iterable,
     List,
+    Literal,
     Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypedDict,
+    Union,
 )
 
 from fastapi import HTTPException
-from sqlalchemy import and_, or_
+from sqlalchemy import (
+    Boolean,
+    Float,
+    String,
+    and_,
+    case,
+    column,
+    delete,
+    distinct,
+    func,
+    literal,
+    literal_column,
+    or_,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy import select as sa_select
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by, insert as pg_insert
+from sqlalchemy.engine import Connection, Row
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.pool import QueuePool
 from sqlmodel import (
     Session,
@@ -18,6 +52,7 @@ from sqlmodel import (
     create_engine,
     select,
 )
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 # Try to import settings, with fallback for when running as script
 try:
@@ -29,6 +64,9 @@ try:
     from backend.models.user_upload import UserUpload
     from backend.models.financial_insight import FinancialInsight
     from backend.models.earn_extra_plan import EarnExtraPlan
+    from backend.models.monthly_rollup import MonthlyRollup
+    from backend.models.processing_job import ProcessingJob
+    from backend.models.extraction_chunk_cache import ExtractionChunkCache
 except ImportError:
     # If running as script, add parent directory to path
     import sys
@@ -46,6 +84,137 @@ except ImportError:
     from backend.models.user_upload import UserUpload
     from backend.models.financial_insight import FinancialInsight
     from backend.models.earn_extra_plan import EarnExtraPlan
+    from backend.models.monthly_rollup import MonthlyRollup
+    from backend.models.processing_job import ProcessingJob
+    from backend.models.extraction_chunk_cache import ExtractionChunkCache
+
+
+# Columns that can back keyset (cursor) pagination: they must be NOT NULL so that
+# (order value, id) is a strict total order over the result set. Each maps to the
+# function that turns the JSON value stored in a cursor back into the column's type.
+CURSOR_ORDER_FIELDS: Dict[str, Callable[[Any], Any]] = {
+    "transaction_date": date.fromisoformat,
+    "transaction_year": int,
+    "transaction_month": int,
+    "transaction_day": int,
+    "amount": Decimal,
+    "created_at": datetime.fromisoformat,
+    "description": str,
+    "transaction_type": str,
+    "id": str,
+}
+
+# monthly_rollup columns, in the order produced by DatabaseService._monthly_rollup_select
+MONTHLY_ROLLUP_COLUMNS = [
+    "user_id",
+    "year",
+    "month",
+    "transaction_type",
+    "category",
+    "merchant_key",
+    "total_amount",
+    "transaction_count",
+    "subscription_amount",
+    "subscription_count",
+    "updated_at",
+]
+MONTHLY_ROLLUP_DIMENSIONS = MONTHLY_ROLLUP_COLUMNS[:6]
+# First key of the per-user advisory locks that serialise monthly rollup writes
+MONTHLY_ROLLUP_LOCK_NAMESPACE = 0x726F6C6C
+
+
+class IngestResult(TypedDict):
+    """Outcome of ``DatabaseService.ingest_banking_transactions``.
+
+    Attributes:
+        inserted_ids: IDs of the rows that were inserted (or updated, for 'update')
+        deduplicated: Rows skipped because the user already has the same transaction
+            (matching fingerprint) from another statement
+    """
+    inserted_ids: List[str]
+    deduplicated: int
+
+
+def _normalize_description(description: str) -> str:
+    """Lowercase a description and collapse punctuation and whitespace runs."""
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", (description or "").lower()).split())
+
+
+def assign_transaction_fingerprints(
+    transactions: Sequence[BankingTransaction],
+    occurrences: Optional[Dict[Tuple[int, str], int]] = None,
+) -> None:
+    """Set a deterministic ``fingerprint`` on transactions that do not have one.
+
+    The fingerprint hashes date, type, amount, normalised description, reference number
+    and balance, plus the occurrence number of that combination within the statement.
+    The occurrence number keeps genuinely repeated transactions in one statement (e.g.
+    two identical purchases on the same day with no balance column) distinct, while the
+    n-th occurrence in an overlapping statement still matches the n-th one already stored.
+
+    Args:
+        transactions: The transactions of one statement, in statement order
+        occurrences: Occurrence counts carried over from earlier batches of the same
+            statement, updated in place; pass the same dict for every batch when a
+            statement is ingested in several batches
+    """
+    if occurrences is None:
+        occurrences = {}
+    for tx in transactions:
+        if tx.fingerprint:
+            continue
+        key = "|".join([
+            tx.transaction_date.isoformat(),
+            tx.transaction_type,
+            f"{Decimal(tx.amount):.2f}",
+            _normalize_description(tx.description),
+            (tx.reference_number or "").strip().upper(),
+            f"{Decimal(tx.balance):.2f}" if tx.balance is not None else "",
+        ])
+        occurrence = occurrences.get((tx.user_id, key), 0)
+        occurrences[(tx.user_id, key)] = occurrence + 1
+        tx.fingerprint = hashlib.sha256(f"{key}|{occurrence}".encode("utf-8")).hexdigest()
+
+
+def encode_transaction_cursor(transaction: BankingTransaction, order_by: str = "transaction_date") -> str:
+    """Build an opaque pagination cursor pointing just after ``transaction``.
+
+    Args:
+        transaction: The last transaction of the current page
+        order_by: The field the page is ordered by
+
+    Returns:
+        str: URL-safe cursor encoding (order_by, order value, id)
+    """
+    value = getattr(transaction, order_by)
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    elif isinstance(value, Decimal):
+        value = str(value)
+    payload = json.dumps([order_by, value, transaction.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_transaction_cursor(cursor: str, order_by: str) -> Tuple[Any, str]:
+    """Decode a cursor built by ``encode_transaction_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed or was built for another ordering
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_order_by, raw_value, transaction_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if cursor_order_by != order_by:
+        raise ValueError("Cursor does not match order_by")
+
+    try:
+        value = CURSOR_ORDER_FIELDS[order_by](raw_value)
+    except (KeyError, TypeError, ValueError, ArithmeticError):
+        raise ValueError("Invalid cursor")
+    return value, str(transaction_id)
 
 
 class DatabaseService:
@@ -53,6 +222,12 @@ class DatabaseService:
 
     This class handles all database operations for Users, Sessions, and Messages.
     It uses SQLModel for ORM operations and maintains a connection pool.
+
+    Two engines share the same database:
+    - ``engine``: a blocking engine used by the synchronous methods, which are
+      called from worker threads (``asyncio.to_thread``) or background jobs.
+    - ``async_engine``: a non-blocking engine (psycopg3 or asyncpg) used by every
+      ``async def`` method, so awaiting them never stalls the event loop.
     """
 
     def __init__(self):
@@ -63,10 +238,7 @@ class DatabaseService:
             max_overflow = settings.POSTGRES_MAX_OVERFLOW
 
             # Create engine with appropriate pool configuration
-            connection_url = (
-                f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
-                f"@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
-            )
+            connection_url = self._build_connection_url("postgresql")
             if getattr(settings, "POSTGRES_SSLMODE", None):
                 connection_url += f"?sslmode={settings.POSTGRES_SSLMODE}"
 
@@ -80,6 +252,8 @@ class DatabaseService:
                 pool_recycle=1800,  # Recycle connections after 30 minutes
             )
 
+            self.async_engine = self._create_async_engine(pool_size, max_overflow)
+
             # Create tables (only if they don't exist)
             SQLModel.metadata.create_all(self.engine)
 
@@ -93,6 +267,61 @@ class DatabaseService:
             # logger.error("database_initialization_error", error=str(e), environment=settings.ENVIRONMENT.value)
             raise
 
+    @staticmethod
+    def _build_connection_url(scheme: str) -> str:
+        """Build a connection URL for the configured database.
+
+        Args:
+            scheme: SQLAlchemy dialect+driver scheme (e.g. 'postgresql', 'postgresql+psycopg')
+
+        Returns:
+            str: The connection URL without query parameters
+        """
+        return (
+            f"{scheme}://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
+            f"@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+        )
+
+    def _create_async_engine(self, pool_size: int, max_overflow: int) -> AsyncEngine:
+        """Create the non-blocking engine used by the async methods.
+
+        Args:
+            pool_size: Number of pooled connections to keep open
+            max_overflow: Extra connections allowed above pool_size
+
+        Returns:
+            AsyncEngine: Engine backed by psycopg3 or asyncpg (see POSTGRES_ASYNC_DRIVER)
+        """
+        driver = getattr(settings, "POSTGRES_ASYNC_DRIVER", "psycopg")
+        sslmode = getattr(settings, "POSTGRES_SSLMODE", None)
+
+        connect_args = {}
+        connection_url = self._build_connection_url(f"postgresql+{driver}")
+        if sslmode:
+            if driver == "asyncpg":
+                # asyncpg does not understand the libpq sslmode query parameter
+                connect_args["ssl"] = sslmode
+            else:
+                connection_url += f"?sslmode={sslmode}"
+
+        return create_async_engine(
+            connection_url,
+            connect_args=connect_args,
+            pool_pre_ping=True,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=30,  # Connection timeout (seconds)
+            pool_recycle=1800,  # Recycle connections after 30 minutes
+        )
+
+    def _async_session(self) -> AsyncSession:
+        """Open a non-blocking session on the async engine.
+
+        Objects are not expired on commit so they can be read after the
+        session closes without triggering a lazy (blocking) refresh.
+        """
+        return AsyncSession(self.async_engine, expire_on_commit=False)
+
     async def create_user(self, email: str, password: str) -> User:
         """Create a new user.
 
@@ -103,11 +332,11 @@ class DatabaseService:
         Returns:
             User: The created user
         """
-        with Session(self.engine) as session:
+        async with self._async_session() as session:
             user = User(email=email, hashed_password=password)
             session.add(user)
-            session.commit()
-            session.refresh(user)
+            await session.commit()
+            await session.refresh(user)
             # logger.info("user_created", email=email)
             return user
 
@@ -120,8 +349,8 @@ class DatabaseService:
         Returns:
             Optional[User]: The user if found, None otherwise
         """
-        with Session(self.engine) as session:
-            user = session.get(User, user_id)
+        async with self._async_session() as session:
+            user = await session.get(User, user_id)
             return user
 
     async def get_user_by_email(self, email: str) -> Optional[User]:
@@ -133,9 +362,9 @@ class DatabaseService:
         Returns:
             Optional[User]: The user if found, None otherwise
         """
-        with Session(self.engine) as session:
+        async with self._async_session() as session:
             statement = select(User).where(User.email == email)
-            user = session.exec(statement).first()
+            user = (await session.exec(statement)).first()
             return user
 
     async def get_user_by_clerk_id(self, clerk_id: str) -> Optional[User]:
@@ -147,9 +376,9 @@ class DatabaseService:
         Returns:
             Optional[User]: The user if found, None otherwise
         """
-        with Session(self.engine) as session:
+        async with self._async_session() as session:
             statement = select(User).where(User.clerk_id == clerk_id)
-            user = session.exec(statement).first()
+            user = (await session.exec(statement)).first()
             return user
 
     async def create_user_from_clerk(self, clerk_id: str, email: str) -> User:
@@ -162,11 +391,11 @@ class DatabaseService:
         Returns:
             User: The created user
         """
-        with Session(self.engine) as session:
+        async with self._async_session() as session:
             user = User(clerk_id=clerk_id, email=email, hashed_password=None)
             session.add(user)
-            session.commit()
-            session.refresh(user)
+            await session.commit()
+            await session.refresh(user)
             return user
 
     async def delete_user_by_email(self, email: str) -> bool:
@@ -178,13 +407,13 @@ class DatabaseService:
         Returns:
             bool: True if deletion was successful, False if user not found
         """
-        with Session(self.engine) as session:
-            user = session.exec(select(User).where(User.email == email)).first()
+        async with self._async_session() as session:
+            user = (await session.exec(select(User).where(User.email == email))).first()
             if not user:
                 return False
 
-            session.delete(user)
-            session.commit()
+            await session.delete(user)
+            await session.commit()
             # logger.info("user_deleted", email=email)
             return True
 
@@ -199,11 +428,11 @@ class DatabaseService:
         Returns:
             ChatSession: The created session
         """
-        with Session(self.engine) as session:
+        async with self._async_session() as session:
             chat_session = ChatSession(id=session_id, user_id=user_id, name=name)
             session.add(chat_session)
-            session.commit()
-            session.refresh(chat_session)
+            await session.commit()
+            await session.refresh(chat_session)
             # logger.info("session_created", session_id=session_id, user_id=user_id, name=name)
             return chat_session
 
@@ -216,13 +445,13 @@ class DatabaseService:
         Returns:
             bool: True if deletion was successful, False if session not found
         """
-        with Session(self.engine) as session:
-            chat_session = session.get(ChatSession, session_id)
+        async with self._async_session() as session:
+            chat_session = await session.get(ChatSession, session_id)
             if not chat_session:
                 return False
 
-            session.delete(chat_session)
-            session.commit()
+            await session.delete(chat_session)
+            await session.commit()
             # logger.info("session_deleted", session_id=session_id)
             return True
 
@@ -235,8 +464,8 @@ class DatabaseService:
         Returns:
             Optional[ChatSession]: The session if found, None otherwise
         """
-        with Session(self.engine) as session:
-            chat_session = session.get(ChatSession, session_id)
+        async with self._async_session() as session:
+            chat_session = await session.get(ChatSession, session_id)
             return chat_session
 
     async def get_user_sessions(self, user_id: int) -> List[ChatSession]:
@@ -248,9 +477,9 @@ class DatabaseService:
         Returns:
             List[ChatSession]: List of user's sessions
         """
-        with Session(self.engine) as session:
+        async with self._async_session() as session:
             statement = select(ChatSession).where(ChatSession.user_id == user_id).order_by(ChatSession.created_at)
-            sessions = session.exec(statement).all()
+            sessions = (await session.exec(statement)).all()
             return sessions
 
     async def update_session_name(self, session_id: str, name: str) -> ChatSession:
@@ -266,15 +495,15 @@ class DatabaseService:
         Raises:
             HTTPException: If session is not found
         """
-        with Session(self.engine) as session:
-            chat_session = session.get(ChatSession, session_id)
+        async with self._async_session() as session:
+            chat_session = await session.get(ChatSession, session_id)
             if not chat_session:
                 raise HTTPException(status_code=404, detail="Session not found")
 
             chat_session.name = name
             session.add(chat_session)
-            session.commit()
-            session.refresh(chat_session)
+            await session.commit()
+            await session.refresh(chat_session)
             # logger.info("session_name_updated", session_id=session_id, name=name)
             return chat_session
 
@@ -286,6 +515,14 @@ class DatabaseService:
         """
         return Session(self.engine)
 
+    def get_async_session_maker(self) -> AsyncSession:
+        """Get a non-blocking session for use inside ``async def`` code.
+
+        Returns:
+            AsyncSession: A SQLModel async session bound to the async engine
+        """
+        return self._async_session()
+
     def create_banking_transaction(self, banking_transaction: BankingTransaction) -> BankingTransaction:
         """Create a new banking transaction.
 
@@ -297,6 +534,8 @@ class DatabaseService:
         """
         with Session(self.engine) as session:
             session.add(banking_transaction)
+            session.flush()
+            self._add_to_monthly_rollup(session.connection(), [banking_transaction.id])
             session.commit()
             session.refresh(banking_transaction)
             return banking_transaction
@@ -320,12 +559,130 @@ class DatabaseService:
 
         with Session(self.engine) as session:
             session.add_all(banking_transactions)
+            session.flush()
+            self._add_to_monthly_rollup(session.connection(), [tx.id for tx in banking_transactions])
             session.commit()
             # Refresh all transactions
             for transaction in banking_transactions:
                 session.refresh(transaction)
             return banking_transactions
 
+    def ingest_banking_transactions(
+        self,
+        banking_transactions: List[BankingTransaction],
+        batch_size: int = 1000,
+        on_conflict: Literal["skip", "update"] = "skip",
+    ) -> IngestResult:
+        """Insert banking transactions with one multi-row INSERT per batch.
+
+        Unlike ``create_banking_transactions_bulk`` this never refreshes rows
+        one by one: each batch is a single ``INSERT ... ON CONFLICT ...
+        RETURNING id`` round-trip, so ingest cost scales with the number of
+        batches rather than the number of transactions.
+
+        Transactions are fingerprinted (see ``assign_transaction_fingerprints``) and
+        the unique (user_id, fingerprint) index makes the insert skip transactions
+        the user already has from an overlapping statement.
+
+        Args:
+            banking_transactions: Transactions to insert (not attached to any session)
+            batch_size: Rows per INSERT statement
+            on_conflict: 'skip' leaves existing rows untouched, 'update' overwrites rows
+                with the same ID (fingerprint duplicates from other statements are
+                skipped either way)
+
+        The monthly rollup is maintained in the same transaction: inserted rows are
+        added to it, and for 'update' the months touched by overwritten rows are recomputed.
+
+        Returns:
+            IngestResult: Written row IDs and the number of rows deduplicated
+        """
+        if not banking_transactions:
+            return {"inserted_ids": [], "deduplicated": 0}
+
+        if on_conflict not in {"skip", "update"}:
+            raise ValueError("on_conflict must be 'skip' or 'update'")
+
+        assign_transaction_fingerprints(banking_transactions)
+
+        table = BankingTransaction.__table__
+        column_names = {column.name for column in table.columns}
+        rows = [
+            {key: value for key, value in tx.model_dump().items() if key in column_names}
+            for tx in banking_transactions
+        ]
+
+        written_ids: List[str] = []
+        deduplicated = 0
+        touched_months: Set[Tuple[int, int, int]] = set()
+        with self.engine.begin() as connection:
+            for batch_start in range(0, len(rows), batch_size):
+                batch = rows[batch_start:batch_start + batch_size]
+                batch_ids = [row["id"] for row in batch]
+                if on_conflict == "update":
+                    # ON CONFLICT DO UPDATE takes a single arbiter (id), so drop rows
+                    # whose fingerprint is already stored under another ID up front
+                    duplicate_fingerprints = set(
+                        connection.execute(
+                            sa_select(table.c.user_id, table.c.fingerprint).where(
+                                tuple_(table.c.user_id, table.c.fingerprint).in_(
+                                    [(row["user_id"], row["fingerprint"]) for row in batch]
+                                ),
+                                table.c.id.notin_(batch_ids),
+                            )
+                        ).all()
+                    )
+                    if duplicate_fingerprints:
+                        batch = [
+                            row for row in batch
+                            if (row["user_id"], row["fingerprint"]) not in duplicate_fingerprints
+                        ]
+                        deduplicated += len(batch_ids) - len(batch)
+                        if not batch:
+                            continue
+                        batch_ids = [row["id"] for row in batch]
+
+                    # Months of the rows about to be overwritten, in case their dates change
+                    existing_months = connection.execute(
+                        sa_select(table.c.user_id, table.c.transaction_year, table.c.transaction_month)
+                        .where(table.c.id.in_(batch_ids))
+                        .distinct()
+                    )
+                    touched_months.update(tuple(month) for month in existing_months)
+                    touched_months.update(
+                        (row["user_id"], row["transaction_year"], row["transaction_month"]) for row in batch
+                    )
+                    statement = pg_insert(table).values(batch)
+                    statement = statement.on_conflict_do_update(
+                        index_elements=[table.c.id],
+                        set_={
+                            name: statement.excluded[name]
+                            for name in column_names
+                            if name not in {"id", "created_at"}
+                        },
+                    )
+                else:
+                    # No conflict target: skips both existing IDs and duplicate fingerprints
+                    statement = pg_insert(table).values(batch).on_conflict_do_nothing()
+                result = connection.execute(statement.returning(table.c.id))
+                inserted = result.scalars().all()
+                written_ids.extend(inserted)
+                if on_conflict == "skip":
+                    self._add_to_monthly_rollup(connection, inserted)
+                    skipped_ids = set(batch_ids) - set(inserted)
+                    if skipped_ids:
+                        # Skipped rows whose ID is not stored were fingerprint duplicates;
+                        # the rest are re-runs of an already ingested statement
+                        already_stored = connection.execute(
+                            sa_select(func.count()).select_from(table).where(table.c.id.in_(skipped_ids))
+                        ).scalar()
+                        deduplicated += len(skipped_ids) - already_stored
+
+            if on_conflict == "update":
+                self._refresh_monthly_rollup(connection, touched_months)
+
+        return {"inserted_ids": written_ids, "deduplicated": deduplicated}
+
     def filter_banking_transactions(
         self,
         user_id: Optional[int] = None,
@@ -342,11 +699,14 @@ class DatabaseService:
         transaction_month: Optional[int] = None,
         currency: Optional[str] = None,
         description: Optional[str] = None,
+        search: Optional[str] = None,
         limit: Optional[int] = None,
         offset: int = 0,
         order_by: str = "transaction_date",
         order_desc: bool = True,
-    ) -> List[BankingTransaction]:
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Union[List[BankingTransaction], List[Row]]:
         """Filter banking transactions by various criteria.
 
         Args:
@@ -364,16 +724,38 @@ class DatabaseService:
             transaction_month: Filter by transaction month (1-12)
             currency: Filter by currency code (e.g., 'MYR')
             description: Filter by description (partial match, case-insensitive)
+            search: Fuzzy search over merchant name and description (pg_trgm word similarity,
+                tolerant of typos); combine with order_by='relevance' to rank best matches first
             limit: Maximum number of results to return
             offset: Number of results to skip (for pagination)
-            order_by: Field to order by (default: 'transaction_date')
+            order_by: Field to order by (default: 'transaction_date'), or 'relevance'
+                when search is given
             order_desc: If True, order descending; if False, order ascending
+            cursor: Opaque cursor from ``encode_transaction_cursor``; when set, rows are
+                seeked past the cursor position instead of skipped with OFFSET
+            columns: Optional list of column names to project. When given, only those
+                columns are selected and lightweight named rows (``row.amount``) are
+                returned instead of ORM entities, skipping identity-map bookkeeping
 
         Returns:
-            List[BankingTransaction]: List of matching banking transactions
+            Union[List[BankingTransaction], List[Row]]: Matching banking transactions, as
+                ORM entities or, when ``columns`` is given, as named rows
+
+        Raises:
+            ValueError: If the cursor is invalid, order_by cannot back a cursor,
+                order_by is 'relevance' without a search term, or a column is unknown
         """
+        if columns is not None:
+            table_columns = BankingTransaction.__table__.c
+            unknown = [name for name in columns if name not in table_columns]
+            if unknown:
+                raise ValueError(f"Unknown banking transaction columns: {', '.join(unknown)}")
+
         with Session(self.engine) as session:
-            statement = select(BankingTransaction)
+            if columns is not None:
+                statement = sa_select(*(table_columns[name] for name in columns))
+            else:
+                statement = select(BankingTransaction)
             conditions = []
 
             # Filter by user_id
@@ -430,19 +812,50 @@ class DatabaseService:
             if description is not None:
                 conditions.append(BankingTransaction.description.ilike(f"%{description}%"))
 
+            # Fuzzy search (served by the gin_trgm_ops indexes on description and merchant_name)
+            if search is not None:
+                conditions.append(
+                    or_(
+                        BankingTransaction.description.op("%>")(search),
+                        BankingTransaction.merchant_name.op("%>")(search),
+                        BankingTransaction.description.ilike(f"%{search}%"),
+                        BankingTransaction.merchant_name.ilike(f"%{search}%"),
+                    )
+                )
+
+            if order_by == "relevance":
+                if search is None:
+                    raise ValueError("order_by='relevance' requires a search term")
+                order_field = func.greatest(
+                    func.word_similarity(search, BankingTransaction.description),
+                    func.coalesce(func.word_similarity(search, BankingTransaction.merchant_name), 0),
+                )
+            else:
+                order_field = getattr(BankingTransaction, order_by, BankingTransaction.transaction_date)
+
+            # Seek past the cursor position: (order value, id) strictly after the last row seen
+            if cursor is not None:
+                if order_by not in CURSOR_ORDER_FIELDS:
+                    raise ValueError(f"Cursor pagination is not supported for order_by '{order_by}'")
+                cursor_value, cursor_id = _decode_transaction_cursor(cursor, order_by)
+                position = tuple_(order_field, BankingTransaction.id)
+                if order_desc:
+                    conditions.append(position < tuple_(cursor_value, cursor_id))
+                else:
+                    conditions.append(position > tuple_(cursor_value, cursor_id))
+
             # Apply all conditions
             if conditions:
                 statement = statement.where(and_(*conditions))
 
-            # Apply ordering
-            order_field = getattr(BankingTransaction, order_by, BankingTransaction.transaction_date)
+            # Apply ordering (id breaks ties so pages are stable)
             if order_desc:
-                statement = statement.order_by(order_field.desc())
+                statement = statement.order_by(order_field.desc(), BankingTransaction.id.desc())
             else:
-                statement = statement.order_by(order_field.asc())
+                statement = statement.order_by(order_field.asc(), BankingTransaction.id.asc())
 
             # Apply pagination
-            if offset > 0:
+            if offset > 0 and cursor is None:
                 statement = statement.offset(offset)
             if limit is not None:
                 statement = statement.limit(limit)
@@ -693,6 +1106,171 @@ class DatabaseService:
             uploads = session.exec(statement).all()
             return uploads
 
+    def find_user_upload_by_hash(
+        self, user_id: int, statement_type: str, content_hash: str
+    ) -> Optional[UserUpload]:
+        """Find an earlier upload of the same file by the same user, as the same statement type.
+
+        Failed uploads are ignored so a re-upload can retry them.
+
+        Args:
+            user_id: The uploading user
+            statement_type: Statement type the file is uploaded as
+            content_hash: SHA-256 hex digest of the file bytes
+
+        Returns:
+            Optional[UserUpload]: The most recent matching upload, or None
+        """
+        with Session(self.engine) as session:
+            statement = (
+                select(UserUpload)
+                .where(
+                    UserUpload.user_id == user_id,
+                    UserUpload.statement_type == statement_type,
+                    UserUpload.content_hash == content_hash,
+                    UserUpload.processing_status != "failed",
+                )
+                .order_by(UserUpload.created_at.desc())
+                .limit(1)
+            )
+            return session.exec(statement).first()
+
+    def create_user_upload_unless_duplicate(self, user_upload: UserUpload) -> Tuple[UserUpload, bool]:
+        """Create an upload unless the user already has a live one of the same file and type.
+
+        The partial unique index on (user_id, statement_type, content_hash), which
+        excludes failed uploads, decides the race when the same file is uploaded
+        concurrently: only one insert wins, and the others get the winning row.
+
+        Args:
+            user_upload: The upload to create; must have content_hash set
+
+        Returns:
+            Tuple[UserUpload, bool]: The created upload and True, or the existing
+                upload and False
+        """
+        table = UserUpload.__table__
+        values = {column.name: getattr(user_upload, column.name) for column in table.columns}
+        while True:
+            with self.engine.begin() as connection:
+                created = connection.execute(
+                    pg_insert(table)
+                    .values(**values)
+                    .on_conflict_do_nothing(
+                        index_elements=[table.c.user_id, table.c.statement_type, table.c.content_hash],
+                        # Inlined so it matches the index predicate under server-side binding too
+                        index_where=table.c.processing_status != literal_column("'failed'"),
+                    )
+                    .returning(table.c.file_id)
+                ).first()
+            if created is not None:
+                return user_upload, True
+            existing = self.find_user_upload_by_hash(
+                user_upload.user_id, user_upload.statement_type, user_upload.content_hash
+            )
+            # None if the conflicting upload failed in the meantime: try the insert again
+            if existing is not None:
+                return existing, False
+
+    def update_upload_processing(
+        self,
+        file_id: str,
+        processing_status: Literal["queued", "extracting", "analyzing", "done", "failed"],
+        transaction_count: Optional[int] = None,
+        processing_error: Optional[str] = None,
+        progress: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Record a processing state transition for an upload in a single UPDATE.
+
+        Moving to 'extracting' stamps processing_started_at and resets the progress
+        counters; moving to 'done' or 'failed' stamps processing_completed_at.
+
+        Args:
+            file_id: The upload to update
+            processing_status: New processing state
+            transaction_count: Number of extracted transactions, if known
+            processing_error: Error message (stored for 'failed', cleared otherwise)
+            progress: Progress counters to merge into processing_progress
+        """
+        now = datetime.utcnow()
+        changes: Dict[str, Any] = {
+            "processing_status": processing_status,
+            "processing_error": processing_error if processing_status == "failed" else None,
+        }
+        if transaction_count is not None:
+            changes["transaction_count"] = transaction_count
+        table = UserUpload.__table__
+        if processing_status == "extracting":
+            changes["processing_started_at"] = now
+            changes["processing_completed_at"] = None
+            changes["processing_progress"] = progress or {}
+        else:
+            if processing_status in {"done", "failed"}:
+                changes["processing_completed_at"] = now
+            if progress:
+                changes["processing_progress"] = self._merged_progress(table, progress)
+
+        with self.engine.begin() as connection:
+            connection.execute(update(table).where(table.c.file_id == file_id).values(**changes))
+
+    def update_upload_progress(self, file_id: str, progress: Dict[str, Any]) -> None:
+        """Merge progress counters into an upload's processing_progress without changing its state.
+
+        Args:
+            file_id: The upload to update
+            progress: Counters to merge (e.g. {"chunks_done": 3, "chunks_total": 5})
+        """
+        table = UserUpload.__table__
+        with self.engine.begin() as connection:
+            connection.execute(
+                update(table)
+                .where(table.c.file_id == file_id)
+                .values(processing_progress=self._merged_progress(table, progress))
+            )
+
+    @staticmethod
+    def _merged_progress(table, progress: Dict[str, Any]):
+        """JSONB expression merging ``progress`` into the stored processing_progress.
+
+        Both operands are bound as JSONB values (serialised once by the type), so ``||``
+        merges two objects rather than building an array with a JSON string in it. A
+        JSON ``null`` stored before the column mapped None to SQL NULL counts as empty.
+        """
+        stored = func.nullif(table.c.processing_progress, literal_column("'null'::jsonb"))
+        return func.coalesce(stored, literal({}, JSONB)).op("||")(
+            literal(progress, JSONB)
+        )
+
+    def get_upload_progress(self, user_id: int, file_id: str) -> Optional[Dict[str, Any]]:
+        """Get the processing state and progress counters of one of a user's uploads.
+
+        Args:
+            user_id: The owning user
+            file_id: The upload to read
+
+        Returns:
+            Optional[Dict[str, Any]]: processing_status, transaction_count,
+                processing_error and progress, or None if the upload is not the user's
+        """
+        table = UserUpload.__table__
+        statement = sa_select(
+            table.c.processing_status,
+            table.c.transaction_count,
+            table.c.processing_error,
+            table.c.processing_progress,
+        ).where(table.c.file_id == file_id, table.c.user_id == user_id)
+        with self.engine.connect() as connection:
+            row = connection.execute(statement).mappings().first()
+        if row is None:
+            return None
+        return {
+            "file_id": file_id,
+            "processing_status": row["processing_status"],
+            "transaction_count": row["transaction_count"],
+            "processing_error": row["processing_error"],
+            "progress": row["processing_progress"] or {},
+        }
+
     async def health_check(self) -> bool:
         """Check database connection health.
 
@@ -700,9 +1278,9 @@ class DatabaseService:
             bool: True if database is healthy, False otherwise
         """
         try:
-            with Session(self.engine) as session:
+            async with self._async_session() as session:
                 # Execute a simple query to check connection
-                session.exec(select(1)).first()
+                (await session.exec(select(1))).first()
                 return True
         except Exception:
             # logger.error("database_health_check_failed", error=str(e))
@@ -827,36 +1405,58 @@ class DatabaseService:
         self,
         user_id: int,
         file_id: Optional[str] = None,
+        source: str = "ai_analysis",
     ) -> int:
         """Delete AI-generated insights (metadata.source == 'ai_analysis') for a user.
 
         This is used to make analysis runs reproducible: re-running analysis should
-        replace prior AI insights rather than accumulating duplicates.
+        replace prior AI insights rather than accumulating duplicates. The match is a
+        single DELETE served by the (user_id, metadata->>'source') index.
 
         Args:
             user_id: The user ID to delete insights for
             file_id: Optional filter to only delete insights for a specific file
+            source: metadata.source value to delete (default: 'ai_analysis')
 
         Returns:
             int: Number of deleted insights
         """
-        with Session(self.engine) as session:
-            statement = select(FinancialInsight).where(FinancialInsight.user_id == user_id)
-            if file_id is not None:
-                statement = statement.where(FinancialInsight.file_id == file_id)
+        table = FinancialInsight.__table__
+        statement = delete(table).where(
+            table.c.user_id == user_id,
+            table.c["metadata"]["source"].astext == source,
+        )
+        if file_id is not None:
+            statement = statement.where(table.c.file_id == file_id)
 
-            insights = session.exec(statement).all()
-            to_delete = []
-            for insight in insights:
-                meta = getattr(insight, "insight_metadata", None) or {}
-                if meta.get("source") == "ai_analysis":
-                    to_delete.append(insight)
+        with self.engine.begin() as connection:
+            return connection.execute(statement).rowcount
 
-            for insight in to_delete:
-                session.delete(insight)
+    def get_user_ai_insights(
+        self,
+        user_id: int,
+        file_id: Optional[str] = None,
+        source: str = "ai_analysis",
+    ) -> List[FinancialInsight]:
+        """Get the AI-generated insights that ``delete_user_ai_insights`` would replace.
 
-            session.commit()
-            return len(to_delete)
+        Args:
+            user_id: The user ID to get insights for
+            file_id: Optional filter to only return insights for a specific file
+            source: metadata.source value to match (default: 'ai_analysis')
+
+        Returns:
+            List[FinancialInsight]: Matching insights, oldest first
+        """
+        with Session(self.engine) as session:
+            statement = select(FinancialInsight).where(
+                FinancialInsight.user_id == user_id,
+                FinancialInsight.__table__.c["metadata"]["source"].astext == source,
+            )
+            if file_id is not None:
+                statement = statement.where(FinancialInsight.file_id == file_id)
+            statement = statement.order_by(FinancialInsight.created_at.asc())
+            return session.exec(statement).all()
 
     # Subscription classification methods
     def get_subscription_candidates(
@@ -938,6 +1538,7 @@ class DatabaseService:
 
         updated_count = 0
         now = datetime.utcnow()
+        touched_months: Set[Tuple[int, int, int]] = set()
 
         with Session(self.engine) as session:
             for update in updates:
@@ -965,12 +1566,89 @@ class DatabaseService:
 
                 transaction.subscription_updated_at = now
                 session.add(transaction)
+                touched_months.add(
+                    (transaction.user_id, transaction.transaction_year, transaction.transaction_month)
+                )
                 updated_count += 1
 
+            session.flush()
+            self._refresh_monthly_rollup(session.connection(), touched_months)
             session.commit()
 
         return updated_count
 
+    def apply_subscription_classification_batch(
+        self,
+        updates: List[Dict],
+    ) -> int:
+        """Apply a batch of subscription classifications in a single UPDATE statement.
+
+        Runs ``UPDATE statement_banking_transaction ... FROM (VALUES ...)`` so a whole
+        classifier batch costs one round-trip instead of a SELECT and UPDATE per row.
+        Every update must carry the full set of classification fields. Months touched by
+        the batch are recomputed in the monthly rollup within the same transaction.
+
+        Args:
+            updates: List of dicts with keys:
+                - transaction_id: str
+                - is_subscription: bool
+                - subscription_status: str ('predicted', 'confirmed', 'rejected', 'needs_review')
+                - subscription_confidence: float (0.0 to 1.0)
+                - subscription_merchant_key: str | None
+                - subscription_name: str | None
+                - subscription_reason_codes: List[str] | None
+
+        Returns:
+            int: Number of transactions updated
+        """
+        rows = [
+            (
+                update_row["transaction_id"],
+                update_row["is_subscription"],
+                update_row["subscription_status"],
+                update_row["subscription_confidence"],
+                update_row["subscription_merchant_key"],
+                update_row["subscription_name"],
+                update_row["subscription_reason_codes"],
+            )
+            for update_row in updates
+            if update_row.get("transaction_id")
+        ]
+        if not rows:
+            return 0
+
+        decisions = values(
+            column("transaction_id", String),
+            column("is_subscription", Boolean),
+            column("subscription_status", String),
+            column("subscription_confidence", Float),
+            column("subscription_merchant_key", String),
+            column("subscription_name", String),
+            column("subscription_reason_codes", JSONB),
+            name="decisions",
+        ).data(rows)
+
+        table = BankingTransaction.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == decisions.c.transaction_id)
+            .values(
+                is_subscription=decisions.c.is_subscription,
+                subscription_status=decisions.c.subscription_status,
+                subscription_confidence=decisions.c.subscription_confidence,
+                subscription_merchant_key=decisions.c.subscription_merchant_key,
+                subscription_name=decisions.c.subscription_name,
+                subscription_reason_codes=decisions.c.subscription_reason_codes,
+                subscription_updated_at=datetime.utcnow(),
+            )
+            .returning(table.c.user_id, table.c.transaction_year, table.c.transaction_month)
+        )
+
+        with self.engine.begin() as connection:
+            touched = connection.execute(statement).all()
+            self._refresh_monthly_rollup(connection, {tuple(month) for month in touched})
+            return len(touched)
+
     def review_subscription_transaction(
         self,
         user_id: int,
@@ -1030,6 +1708,11 @@ class DatabaseService:
             tx.subscription_updated_at = now
 
             session.add(tx)
+            session.flush()
+            self._refresh_monthly_rollup(
+                session.connection(),
+                {(tx.user_id, tx.transaction_year, tx.transaction_month)},
+            )
             session.commit()
             session.refresh(tx)
 
@@ -1042,8 +1725,13 @@ class DatabaseService:
         end_date: Optional[date] = None,
         limit: Optional[int] = None,
         offset: int = 0,
+        cursor: Optional[str] = None,
     ) -> List[BankingTransaction]:
-        """Get debit transactions flagged as needs_review for subscription classification."""
+        """Get debit transactions flagged as needs_review for subscription classification.
+
+        Results are ordered by (transaction_date, id) descending. Pass a cursor built with
+        ``encode_transaction_cursor(last_row, "transaction_date")`` to seek to the next page.
+        """
         with Session(self.engine) as session:
             statement = select(BankingTransaction).where(
                 and_(
@@ -1057,19 +1745,874 @@ class DatabaseService:
                 statement = statement.where(BankingTransaction.transaction_date >= start_date)
             if end_date is not None:
                 statement = statement.where(BankingTransaction.transaction_date <= end_date)
+            if cursor is not None:
+                cursor_value, cursor_id = _decode_transaction_cursor(cursor, "transaction_date")
+                statement = statement.where(
+                    tuple_(BankingTransaction.transaction_date, BankingTransaction.id)
+                    < tuple_(cursor_value, cursor_id)
+                )
 
             statement = statement.order_by(
                 BankingTransaction.transaction_date.desc(),
                 BankingTransaction.id.desc(),
             )
 
-            if offset > 0:
+            if offset > 0 and cursor is None:
                 statement = statement.offset(offset)
             if limit is not None:
                 statement = statement.limit(limit)
 
             return session.exec(statement).all()
 
+    def aggregate_subscriptions(
+        self,
+        user_id: int,
+        file_id: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        transaction_year: Optional[int] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        order_by: str = "total_amount",
+        order_desc: bool = True,
+    ) -> List[Dict]:
+        """Aggregate subscription debits per merchant and category in SQL.
+
+        Rows are grouped by subscription_merchant_key (falling back to merchant_name) and
+        category, so only one compact row per subscription leaves the database.
+
+        Args:
+            user_id: The ID of the user
+            file_id: Filter by file ID (user upload file ID)
+            start_date: Filter transactions from this date onwards (inclusive)
+            end_date: Filter transactions up to this date (inclusive)
+            transaction_year: Filter by transaction year
+            limit: Maximum number of groups to return
+            offset: Number of groups to skip (for pagination)
+            order_by: One of 'total_amount', 'average_monthly_amount', 'no_months_subscribed',
+                'transaction_count', 'confidence_avg', 'merchant_key' or 'last_transaction_date'
+            order_desc: If True, order descending; if False, order ascending
+
+        Returns:
+            List[Dict]: One dict per group with merchant_key, display_name, category,
+                total_amount, no_months_subscribed, average_monthly_amount, confidence_avg,
+                transaction_count and last_transaction_date
+        """
+        table = BankingTransaction.__table__
+        merchant_key = func.coalesce(table.c.subscription_merchant_key, table.c.merchant_name, "Unknown")
+        display_name = func.coalesce(table.c.subscription_name, table.c.merchant_name, "Unknown")
+
+        total_amount = func.coalesce(func.sum(table.c.amount), 0)
+        no_months = func.count(distinct(tuple_(table.c.transaction_year, table.c.transaction_month)))
+        aggregates = {
+            "merchant_key": merchant_key,
+            # Display name of the most recent transaction in the group
+            "display_name": func.array_agg(
+                aggregate_order_by(display_name, table.c.transaction_date.desc())
+            )[1],
+            "category": table.c.category,
+            "total_amount": total_amount,
+            "no_months_subscribed": no_months,
+            "average_monthly_amount": total_amount / func.nullif(no_months, 0),
+            "confidence_avg": func.avg(table.c.subscription_confidence),
+            "transaction_count": func.count(),
+            "last_transaction_date": func.max(table.c.transaction_date),
+        }
+
+        conditions = [
+            table.c.user_id == user_id,
+            table.c.transaction_type == "debit",
+            table.c.is_subscription.is_(True),
+        ]
+        if file_id is not None:
+            conditions.append(table.c.file_id == file_id)
+        if start_date is not None:
+            conditions.append(table.c.transaction_date >= start_date)
+        if end_date is not None:
+            conditions.append(table.c.transaction_date <= end_date)
+        if transaction_year is not None:
+            conditions.append(table.c.transaction_year == transaction_year)
+
+        order_field = aggregates.get(order_by, aggregates["total_amount"])
+        statement = (
+            select(*(expr.label(name) for name, expr in aggregates.items()))
+            .where(and_(*conditions))
+            .group_by(merchant_key, table.c.category)
+            .order_by(
+                order_field.desc() if order_desc else order_field.asc(),
+                merchant_key.asc(),
+            )
+        )
+        if offset > 0:
+            statement = statement.offset(offset)
+        if limit is not None:
+            statement = statement.limit(limit)
+
+        with self.engine.connect() as connection:
+            return [dict(row) for row in connection.execute(statement).mappings()]
+
+
+    # Monthly rollup methods
+    @staticmethod
+    def _monthly_rollup_select(*conditions):
+        """Build a SELECT aggregating raw transactions into monthly_rollup rows.
+
+        Columns are produced in ``MONTHLY_ROLLUP_COLUMNS`` order.
+        """
+        table = BankingTransaction.__table__
+        # Inline literals so the GROUP BY expressions match the SELECT list exactly
+        category = func.coalesce(table.c.category, literal_column("'other'"))
+        merchant_key = func.coalesce(table.c.merchant_name, literal_column("'Unknown'"))
+        is_subscription = table.c.is_subscription.is_(True)
+        return (
+            sa_select(
+                table.c.user_id,
+                table.c.transaction_year,
+                table.c.transaction_month,
+                table.c.transaction_type,
+                category,
+                merchant_key,
+                func.sum(table.c.amount),
+                func.count(),
+                func.coalesce(func.sum(table.c.amount).filter(is_subscription), 0),
+                func.count().filter(is_subscription),
+                func.now(),
+            )
+            .where(*conditions)
+            .group_by(
+                table.c.user_id,
+                table.c.transaction_year,
+                table.c.transaction_month,
+                table.c.transaction_type,
+                category,
+                merchant_key,
+            )
+        )
+
+    def _add_to_monthly_rollup(self, connection: Connection, transaction_ids: Sequence[str]) -> None:
+        """Add newly inserted transactions to the monthly rollup.
+
+        Aggregates just the given rows and upserts them, incrementing existing totals.
+        Must only be called once per transaction, right after it is inserted.
+        """
+        if not transaction_ids:
+            return
+
+        rollup = MonthlyRollup.__table__
+        table = BankingTransaction.__table__
+        user_ids = connection.execute(
+            sa_select(distinct(table.c.user_id)).where(table.c.id.in_(list(transaction_ids)))
+        ).scalars()
+        self._lock_monthly_rollup(connection, user_ids)
+        statement = pg_insert(rollup).from_select(
+            MONTHLY_ROLLUP_COLUMNS,
+            self._monthly_rollup_select(table.c.id.in_(list(transaction_ids))),
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[rollup.c[name] for name in MONTHLY_ROLLUP_DIMENSIONS],
+            set_={
+                "total_amount": rollup.c.total_amount + statement.excluded.total_amount,
+                "transaction_count": rollup.c.transaction_count + statement.excluded.transaction_count,
+                "subscription_amount": rollup.c.subscription_amount + statement.excluded.subscription_amount,
+                "subscription_count": rollup.c.subscription_count + statement.excluded.subscription_count,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+        connection.execute(statement)
+
+    @staticmethod
+    def _lock_monthly_rollup(connection: Connection, user_ids: Iterable[int]) -> None:
+        """Take the rollup write lock of each user until the transaction ends.
+
+        Rollup additions and refreshes for the same user run one after the other, so a
+        refresh never recreates a rollup row that a concurrent addition is inserting
+        (a unique violation) or misses its transactions. Locks are taken in user order
+        to avoid deadlocks.
+        """
+        for user_id in sorted(set(user_ids)):
+            connection.execute(sa_select(func.pg_advisory_xact_lock(MONTHLY_ROLLUP_LOCK_NAMESPACE, user_id)))
+
+    def _refresh_monthly_rollup(self, connection: Connection, months: Set[Tuple[int, int, int]]) -> None:
+        """Recompute the monthly rollup for specific (user_id, year, month) buckets.
+
+        Used when existing transactions change (reclassification, overwrites), where a
+        delta is not known. Cost is bounded by the transactions in the touched months.
+        """
+        if not months:
+            return
+
+        rollup = MonthlyRollup.__table__
+        table = BankingTransaction.__table__
+        months = list(months)
+        self._lock_monthly_rollup(connection, (user_id for user_id, _, _ in months))
+        connection.execute(
+            delete(rollup).where(tuple_(rollup.c.user_id, rollup.c.year, rollup.c.month).in_(months))
+        )
+        connection.execute(
+            pg_insert(rollup).from_select(
+                MONTHLY_ROLLUP_COLUMNS,
+                self._monthly_rollup_select(
+                    tuple_(table.c.user_id, table.c.transaction_year, table.c.transaction_month).in_(months)
+                ),
+            )
+        )
+
+    def rebuild_monthly_rollup(self, user_id: Optional[int] = None) -> int:
+        """Rebuild the monthly rollup from raw transactions (backfill).
+
+        Args:
+            user_id: Only rebuild this user's rollup; rebuilds every user when None
+
+        Returns:
+            int: Number of rollup rows written
+        """
+        rollup = MonthlyRollup.__table__
+        table = BankingTransaction.__table__
+
+        delete_statement = delete(rollup)
+        conditions = []
+        if user_id is not None:
+            delete_statement = delete_statement.where(rollup.c.user_id == user_id)
+            conditions.append(table.c.user_id == user_id)
+
+        with self.engine.begin() as connection:
+            connection.execute(delete_statement)
+            result = connection.execute(
+                pg_insert(rollup).from_select(MONTHLY_ROLLUP_COLUMNS, self._monthly_rollup_select(*conditions))
+            )
+            return result.rowcount
+
+    def get_monthly_rollup(
+        self,
+        user_id: int,
+        start_month: Optional[Tuple[int, int]] = None,
+        end_month: Optional[Tuple[int, int]] = None,
+        transaction_type: Optional[str] = None,
+        category: Optional[str] = None,
+        group_by: Sequence[str] = ("year", "month", "transaction_type"),
+    ) -> List[Dict]:
+        """Read month- or range-level aggregates from the monthly rollup.
+
+        Args:
+            user_id: The ID of the user
+            start_month: Inclusive (year, month) lower bound
+            end_month: Inclusive (year, month) upper bound
+            transaction_type: Filter by transaction type ('debit' or 'credit')
+            category: Filter by category ('other' for uncategorised transactions)
+            group_by: Rollup dimensions to group by, any of 'year', 'month',
+                'transaction_type', 'category', 'merchant_key'. An empty sequence
+                returns a single total for the whole range.
+
+        Returns:
+            List[Dict]: One dict per group with the group_by keys plus total_amount,
+                transaction_count, subscription_amount and subscription_count
+
+        Raises:
+            ValueError: If group_by contains an unknown dimension
+        """
+        unknown = [name for name in group_by if name not in MONTHLY_ROLLUP_DIMENSIONS or name == "user_id"]
+        if unknown:
+            raise ValueError(f"Unknown rollup dimensions: {', '.join(unknown)}")
+
+        rollup = MonthlyRollup.__table__
+        conditions = [rollup.c.user_id == user_id]
+        if start_month is not None:
+            conditions.append(tuple_(rollup.c.year, rollup.c.month) >= tuple_(*start_month))
+        if end_month is not None:
+            conditions.append(tuple_(rollup.c.year, rollup.c.month) <= tuple_(*end_month))
+        if transaction_type is not None:
+            conditions.append(rollup.c.transaction_type == transaction_type)
+        if category is not None:
+            conditions.append(rollup.c.category == category)
+
+        dimensions = [rollup.c[name] for name in group_by]
+        statement = (
+            sa_select(
+                *dimensions,
+                func.coalesce(func.sum(rollup.c.total_amount), 0).label("total_amount"),
+                func.coalesce(func.sum(rollup.c.transaction_count), 0).label("transaction_count"),
+                func.coalesce(func.sum(rollup.c.subscription_amount), 0).label("subscription_amount"),
+                func.coalesce(func.sum(rollup.c.subscription_count), 0).label("subscription_count"),
+            )
+            .where(and_(*conditions))
+            .group_by(*dimensions)
+            .order_by(*dimensions)
+        )
+
+        with self.engine.connect() as connection:
+            return [dict(row) for row in connection.execute(statement).mappings()]
+
+    def get_sankey_rollup_rows(
+        self,
+        user_id: int,
+        transaction_year: Optional[int] = None,
+        transaction_month: Optional[int] = None,
+        transaction_type: Optional[str] = None,
+        category: Optional[str] = None,
+    ) -> Optional[List[Dict]]:
+        """Build ``to_sankey`` input from the monthly rollup instead of raw transactions.
+
+        Args:
+            user_id: The ID of the user
+            transaction_year: Restrict to this year
+            transaction_month: Restrict to this month (requires transaction_year)
+            transaction_type: Filter by transaction type ('debit' or 'credit')
+            category: Filter by transaction category
+
+        Returns:
+            Optional[List[Dict]]: Dicts with amount, transaction_type, merchant_name and
+                category, or None when the filters cannot be answered from the rollup
+                (a month without a year, or category 'other', which the rollup also
+                uses for uncategorised transactions)
+        """
+        if transaction_month is not None and transaction_year is None:
+            return None
+        if category == "other":
+            return None
+
+        start_month = end_month = None
+        if transaction_year is not None:
+            start_month = (transaction_year, transaction_month or 1)
+            end_month = (transaction_year, transaction_month or 12)
+
+        rows = self.get_monthly_rollup(
+            user_id=user_id,
+            start_month=start_month,
+            end_month=end_month,
+            transaction_type=transaction_type,
+            category=category,
+            group_by=("transaction_type", "category", "merchant_key"),
+        )
+        return [
+            {
+                'amount': float(row['total_amount']),
+                'transaction_type': row['transaction_type'],
+                'merchant_name': row['merchant_key'],
+                'category': row['category'],
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _month_edges(
+        start_date: Optional[date], end_date: Optional[date]
+    ) -> Tuple[Optional[Tuple[int, int]], Optional[Tuple[int, int]], List[Tuple[Optional[date], Optional[date]]]]:
+        """Split a date range into whole months and the partial months at its edges.
+
+        Returns:
+            Tuple: Inclusive (year, month) bounds of the whole months (None for an open
+                end), and the (start, end) date ranges of the partial edge months. When
+                the range holds no whole month, the bounds are None and the single
+                partial range is the range itself.
+        """
+        full_start = full_end = None
+        edges: List[Tuple[Optional[date], Optional[date]]] = []
+        if start_date is not None:
+            if start_date.day == 1:
+                full_start = (start_date.year, start_date.month)
+            else:
+                next_month = (start_date.replace(day=28) + timedelta(days=4)).replace(day=1)
+                full_start = (next_month.year, next_month.month)
+                edges.append((start_date, next_month - timedelta(days=1)))
+        if end_date is not None:
+            if (end_date + timedelta(days=1)).day == 1:
+                full_end = (end_date.year, end_date.month)
+            else:
+                month_start = end_date.replace(day=1)
+                previous_month = month_start - timedelta(days=1)
+                full_end = (previous_month.year, previous_month.month)
+                edges.append((month_start, end_date))
+
+        if full_start is not None and full_end is not None and full_start > full_end:
+            return None, None, [(start_date, end_date)]
+        return full_start, full_end, edges
+
+    def get_range_rollup_totals(
+        self,
+        user_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> List[Dict]:
+        """Per (transaction_type, category, merchant_key) totals over a date range.
+
+        Whole months are read from the monthly rollup and only the partial months at the
+        edges of the range are aggregated from raw transactions, so the cost stays
+        bounded by two months of rows however much history the range covers.
+
+        Args:
+            user_id: The ID of the user
+            start_date: Inclusive start date; unbounded when None
+            end_date: Inclusive end date; unbounded when None
+
+        Returns:
+            List[Dict]: One dict per group with transaction_type, category, merchant_key,
+                total_amount and transaction_count
+        """
+        if start_date is not None and end_date is not None and start_date > end_date:
+            return []
+
+        full_start, full_end, edges = self._month_edges(start_date, end_date)
+        totals: Dict[Tuple[str, str, str], Dict] = {}
+
+        def add(row: Dict) -> None:
+            key = (row["transaction_type"], row["category"], row["merchant_key"])
+            entry = totals.setdefault(key, {
+                "transaction_type": key[0],
+                "category": key[1],
+                "merchant_key": key[2],
+                "total_amount": Decimal("0"),
+                "transaction_count": 0,
+            })
+            entry["total_amount"] += Decimal(row["total_amount"])
+            entry["transaction_count"] += int(row["transaction_count"])
+
+        if full_start is not None or full_end is not None or not edges:
+            for row in self.get_monthly_rollup(
+                user_id=user_id,
+                start_month=full_start,
+                end_month=full_end,
+                group_by=("transaction_type", "category", "merchant_key"),
+            ):
+                add(row)
+
+        table = BankingTransaction.__table__
+        with self.engine.connect() as connection:
+            for edge_start, edge_end in edges:
+                conditions = [table.c.user_id == user_id]
+                if edge_start is not None:
+                    conditions.append(table.c.transaction_date >= edge_start)
+                if edge_end is not None:
+                    conditions.append(table.c.transaction_date <= edge_end)
+                for row in connection.execute(self._monthly_rollup_select(*conditions)):
+                    add(dict(zip(MONTHLY_ROLLUP_COLUMNS, row)))
+
+        return list(totals.values())
+
+    def get_transaction_range_stats(
+        self,
+        user_id: int,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """Row-level statistics the monthly rollup cannot answer, computed in SQL.
+
+        Args:
+            user_id: The ID of the user
+            start_date: Inclusive start date; unbounded when None
+            end_date: Inclusive end date; unbounded when None
+
+        Returns:
+            Dict[str, Any]: transaction_count, first_date, last_date, median_debit,
+                currencies ({currency: count}) and weekday_debits
+                ({ISO weekday: {"total", "count"}})
+        """
+        table = BankingTransaction.__table__
+        conditions = [table.c.user_id == user_id]
+        if start_date is not None:
+            conditions.append(table.c.transaction_date >= start_date)
+        if end_date is not None:
+            conditions.append(table.c.transaction_date <= end_date)
+        is_debit = table.c.transaction_type != "credit"
+        weekday = func.extract("isodow", table.c.transaction_date)
+
+        summary_statement = sa_select(
+            func.count().label("transaction_count"),
+            func.min(table.c.transaction_date).label("first_date"),
+            func.max(table.c.transaction_date).label("last_date"),
+            # Ordered-set aggregates skip NULLs, so credits drop out of the median
+            func.percentile_disc(0.5).within_group(case((is_debit, table.c.amount))).label("median_debit"),
+        ).where(*conditions)
+        currency_statement = (
+            sa_select(table.c.currency, func.count())
+            .where(*conditions)
+            .group_by(table.c.currency)
+        )
+        weekday_statement = (
+            sa_select(weekday, func.sum(table.c.amount), func.count())
+            .where(*conditions, is_debit)
+            .group_by(weekday)
+        )
+
+        with self.engine.connect() as connection:
+            stats = dict(connection.execute(summary_statement).mappings().one())
+            stats["currencies"] = {
+                currency: count for currency, count in connection.execute(currency_statement)
+            }
+            stats["weekday_debits"] = {
+                int(day): {"total": total, "count": count}
+                for day, total, count in connection.execute(weekday_statement)
+            }
+        return stats
+
+    def get_top_transaction_ids(
+        self,
+        user_id: int,
+        group_by: Literal["category", "merchant_key"],
+        keys: Sequence[str],
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        per_group: int = 3,
+    ) -> Dict[str, List[str]]:
+        """IDs of the largest debits per category or merchant, ranked in SQL.
+
+        Groups use the monthly rollup keys: 'other' for uncategorised transactions and
+        'Unknown' for transactions without a merchant name.
+
+        Args:
+            user_id: The ID of the user
+            group_by: 'category' or 'merchant_key'
+            keys: Group keys to return IDs for
+            start_date: Inclusive start date; unbounded when None
+            end_date: Inclusive end date; unbounded when None
+            per_group: Maximum IDs per group
+
+        Returns:
+            Dict[str, List[str]]: Transaction IDs per key, largest amount first
+        """
+        if not keys:
+            return {}
+
+        table = BankingTransaction.__table__
+        if group_by == "category":
+            group_expr = func.coalesce(table.c.category, literal_column("'other'"))
+        else:
+            group_expr = func.coalesce(table.c.merchant_name, literal_column("'Unknown'"))
+
+        conditions = [
+            table.c.user_id == user_id,
+            table.c.transaction_type != "credit",
+            group_expr.in_(list(keys)),
+        ]
+        if start_date is not None:
+            conditions.append(table.c.transaction_date >= start_date)
+        if end_date is not None:
+            conditions.append(table.c.transaction_date <= end_date)
+
+        ranked = (
+            sa_select(
+                group_expr.label("group_key"),
+                table.c.id,
+                func.row_number().over(
+                    partition_by=group_expr,
+                    order_by=(table.c.amount.desc(), table.c.id),
+                ).label("rank"),
+            )
+            .where(*conditions)
+            .subquery()
+        )
+        statement = (
+            sa_select(ranked.c.group_key, ranked.c.id)
+            .where(ranked.c.rank <= per_group)
+            .order_by(ranked.c.group_key, ranked.c.rank)
+        )
+
+        top_ids: Dict[str, List[str]] = defaultdict(list)
+        with self.engine.connect() as connection:
+            for group_key, tx_id in connection.execute(statement):
+                top_ids[group_key].append(tx_id)
+        return dict(top_ids)
+
+
+    # Extraction cache methods
+    def get_cached_chunk_extraction(
+        self,
+        chunk_hash: str,
+        model: str,
+        prompt_version: str,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Get cached LLM output for a request payload, marking the entry as recently used.
+
+        Args:
+            chunk_hash: SHA-256 hex digest of the request payload
+            model: Model the output must come from
+            prompt_version: Extraction prompt version the output must match
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: The cached transactions, or None on a miss
+        """
+        table = ExtractionChunkCache.__table__
+        statement = (
+            update(table)
+            .where(
+                table.c.chunk_hash == chunk_hash,
+                table.c.model == model,
+                table.c.prompt_version == prompt_version,
+            )
+            .values(hit_count=table.c.hit_count + 1, last_used_at=datetime.utcnow())
+            .returning(table.c.transactions)
+        )
+        with self.engine.begin() as connection:
+            return connection.execute(statement).scalar()
+
+    def store_cached_chunk_extraction(
+        self,
+        chunk_hash: str,
+        model: str,
+        prompt_version: str,
+        transactions: List[Dict[str, Any]],
+        max_bytes: int,
+    ) -> int:
+        """Cache LLM output for a request payload and evict least recently used entries.
+
+        Entries are dropped, oldest ``last_used_at`` first, until the cached output fits
+        in ``max_bytes`` again. The entry just stored is the most recently used and is
+        only evicted when it alone exceeds the budget.
+
+        Args:
+            chunk_hash: SHA-256 hex digest of the request payload
+            model: Model that produced the output
+            prompt_version: Extraction prompt version used
+            transactions: Transactions parsed from the model response
+            max_bytes: Total size of cached output to keep
+
+        Returns:
+            int: Number of entries evicted
+        """
+        table = ExtractionChunkCache.__table__
+        now = datetime.utcnow()
+        upsert = (
+            pg_insert(table)
+            .values(
+                chunk_hash=chunk_hash,
+                model=model,
+                prompt_version=prompt_version,
+                transactions=transactions,
+                size_bytes=len(json.dumps(transactions, default=str)),
+                hit_count=0,
+                created_at=now,
+                last_used_at=now,
+            )
+            .on_conflict_do_update(
+                index_elements=[table.c.chunk_hash, table.c.model, table.c.prompt_version],
+                set_={"last_used_at": now},
+            )
+        )
+
+        # Running total of entry sizes, most recently used first; entries past the budget go
+        retained = (
+            sa_select(
+                table.c.chunk_hash,
+                table.c.model,
+                table.c.prompt_version,
+                func.sum(table.c.size_bytes).over(
+                    order_by=(table.c.last_used_at.desc(), table.c.chunk_hash)
+                ).label("retained_bytes"),
+            )
+            .subquery()
+        )
+        evict = delete(table).where(
+            tuple_(table.c.chunk_hash, table.c.model, table.c.prompt_version).in_(
+                sa_select(retained.c.chunk_hash, retained.c.model, retained.c.prompt_version)
+                .where(retained.c.retained_bytes > max_bytes)
+            )
+        )
+        with self.engine.begin() as connection:
+            connection.execute(upsert)
+            return connection.execute(evict).rowcount
+
+    # Processing job queue methods
+    def enqueue_processing_job(self, job: ProcessingJob) -> ProcessingJob:
+        """Add a job to the processing queue.
+
+        Args:
+            job: The job to enqueue
+
+        Returns:
+            ProcessingJob: The enqueued job
+        """
+        with Session(self.engine) as session:
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+            return job
+
+    def claim_processing_job(self, worker_id: str) -> Optional[ProcessingJob]:
+        """Atomically claim the next runnable job.
+
+        Uses ``SELECT ... FOR UPDATE SKIP LOCKED`` so concurrent workers (in this or
+        other processes) never claim the same job and never block on each other.
+
+        Args:
+            worker_id: Identifier of the claiming worker
+
+        Returns:
+            Optional[ProcessingJob]: The claimed job (status 'running', attempts
+                incremented), or None if nothing is runnable
+        """
+        now = datetime.utcnow()
+        table = ProcessingJob.__table__
+        next_job = (
+            sa_select(table.c.id)
+            .where(table.c.status == "queued", table.c.run_after <= now)
+            .order_by(table.c.run_after)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        statement = (
+            update(table)
+            .where(table.c.id == next_job)
+            .values(
+                status="running",
+                attempts=table.c.attempts + 1,
+                locked_by=worker_id,
+                locked_at=now,
+            )
+            .returning(*table.c)
+        )
+        with self.engine.begin() as connection:
+            row = connection.execute(statement).mappings().first()
+        return ProcessingJob(**row) if row else None
+
+    def heartbeat_processing_job(self, job_id: str, worker_id: str) -> bool:
+        """Refresh a running job's ``locked_at`` so the stale-job reaper leaves it alone.
+
+        Args:
+            job_id: The running job
+            worker_id: Worker that claimed the job
+
+        Returns:
+            bool: True if the worker still holds the job, False if its lease was lost
+                (the job was requeued as stale, possibly claimed by another worker)
+        """
+        table = ProcessingJob.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == job_id, table.c.locked_by == worker_id, table.c.status == "running")
+            .values(locked_at=datetime.utcnow())
+        )
+        with self.engine.begin() as connection:
+            return connection.execute(statement).rowcount > 0
+
+    def complete_processing_job(self, job_id: str, worker_id: str) -> bool:
+        """Mark a claimed job as succeeded.
+
+        A no-op when the worker no longer holds the job, so a worker that lost its
+        lease cannot overwrite the outcome of the worker that took the job over.
+
+        Args:
+            job_id: The job to complete
+            worker_id: Worker that claimed the job
+
+        Returns:
+            bool: True if the job was marked succeeded, False if the lease was lost
+        """
+        table = ProcessingJob.__table__
+        with self.engine.begin() as connection:
+            result = connection.execute(
+                update(table)
+                .where(table.c.id == job_id, table.c.locked_by == worker_id, table.c.status == "running")
+                .values(status="succeeded", finished_at=datetime.utcnow(), last_error=None, locked_by=None)
+            )
+            return result.rowcount > 0
+
+    def fail_processing_job(
+        self,
+        job_id: str,
+        worker_id: str,
+        error: str,
+        retry_delay_seconds: float,
+    ) -> Optional[bool]:
+        """Record a failed attempt, requeueing the job with a delay if attempts remain.
+
+        A no-op when the worker no longer holds the job (see ``complete_processing_job``).
+
+        Args:
+            job_id: The job that failed
+            worker_id: Worker that claimed the job
+            error: Error message from the attempt
+            retry_delay_seconds: Delay before the job may be claimed again
+
+        Returns:
+            Optional[bool]: True if the job was requeued, False if it is now permanently
+                failed, None if the worker had lost its lease and nothing was recorded
+        """
+        now = datetime.utcnow()
+        table = ProcessingJob.__table__
+        retry = table.c.attempts < table.c.max_attempts
+        statement = (
+            update(table)
+            .where(table.c.id == job_id, table.c.locked_by == worker_id, table.c.status == "running")
+            .values(
+                status=case((retry, "queued"), else_="failed"),
+                run_after=case((retry, now + timedelta(seconds=retry_delay_seconds)), else_=table.c.run_after),
+                finished_at=case((retry, None), else_=now),
+                last_error=error,
+                locked_by=None,
+            )
+            .returning(table.c.status)
+        )
+        with self.engine.begin() as connection:
+            status = connection.execute(statement).scalar()
+        if status is None:
+            return None
+        return status == "queued"
+
+    def requeue_stale_processing_jobs(self, stale_after_seconds: float) -> List[ProcessingJob]:
+        """Recover jobs whose worker died mid-run (e.g. restart or deploy).
+
+        Running jobs whose lock was not refreshed (see ``heartbeat_processing_job``) for
+        longer than ``stale_after_seconds`` are requeued, or marked failed if they have
+        used all their attempts.
+
+        Args:
+            stale_after_seconds: How long a job may go without a heartbeat before it is
+                considered orphaned
+
+        Returns:
+            List[ProcessingJob]: The recovered jobs with their new status
+        """
+        now = datetime.utcnow()
+        table = ProcessingJob.__table__
+        retry = table.c.attempts < table.c.max_attempts
+        statement = (
+            update(table)
+            .where(
+                table.c.status == "running",
+                table.c.locked_at < now - timedelta(seconds=stale_after_seconds),
+            )
+            .values(
+                status=case((retry, "queued"), else_="failed"),
+                run_after=now,
+                finished_at=case((retry, None), else_=now),
+                last_error="Worker stopped before the job finished",
+                locked_by=None,
+            )
+            .returning(*table.c)
+        )
+        with self.engine.begin() as connection:
+            return [ProcessingJob(**row) for row in connection.execute(statement).mappings()]
+
+    def get_processing_queue_stats(self, user_id: Optional[int] = None) -> Dict[str, Any]:
+        """Summarise queue depth by status.
+
+        Args:
+            user_id: Restrict the counts to one user's jobs; counts every job when None
+
+        Returns:
+            Dict[str, Any]: Counts per status (queued, running, succeeded, failed) and
+                oldest_queued_seconds, the age of the oldest runnable queued job
+        """
+        now = datetime.utcnow()
+        table = ProcessingJob.__table__
+        statement = sa_select(
+            table.c.status,
+            func.count().label("count"),
+            func.min(table.c.run_after).label("oldest_run_after"),
+        ).group_by(table.c.status)
+        if user_id is not None:
+            statement = statement.where(table.c.user_id == user_id)
+
+        with self.engine.connect() as connection:
+            rows = connection.execute(statement).mappings().all()
+
+        stats: Dict[str, Any] = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0, "oldest_queued_seconds": None}
+        for row in rows:
+            stats[row["status"]] = row["count"]
+            if row["status"] == "queued" and row["oldest_run_after"] is not None:
+                stats["oldest_queued_seconds"] = max(0.0, (now - row["oldest_run_after"]).total_seconds())
+        return stats
+
 
 # Create a singleton instance
 database_service = DatabaseService()
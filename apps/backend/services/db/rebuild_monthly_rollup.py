@@ -0,0 +1,35 @@
+"""Backfill or rebuild the monthly_rollup table from raw banking transactions.
+
+Run after deploying the rollup table against an existing database, or any time the
+rollup is suspected to have drifted from statement_banking_transaction.
+
+Usage:
+    python -m backend.services.db.rebuild_monthly_rollup            # every user
+    python -m backend.services.db.rebuild_monthly_rollup --user-id 1
+"""
+
+import argparse
+from typing import Optional
+
+try:
+    from backend.services.db.postgres_connector import database_service
+except ImportError:
+    import sys
+    from pathlib import Path
+    apps_dir = Path(__file__).parent.parent.parent.parent  # Go up to apps/
+    if str(apps_dir) not in sys.path:
+        sys.path.insert(0, str(apps_dir))
+    from backend.services.db.postgres_connector import database_service
+
+
+def main(user_id: Optional[int] = None) -> None:
+    written = database_service.rebuild_monthly_rollup(user_id=user_id)
+    scope = f"user {user_id}" if user_id is not None else "all users"
+    print(f"Rebuilt monthly_rollup for {scope}: {written} rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this user's rollup")
+    args = parser.parse_args()
+    main(args.user_id)
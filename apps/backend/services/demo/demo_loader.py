@@ -7,6 +7,7 @@ from pathlib import Path
 from typing import List, Tuple
 
 from backend.models.banking_transaction import BankingTransaction
+from backend.services.db.postgres_connector import database_service
 
 
 def _demo_data_path() -> Path:
@@ -85,3 +86,17 @@ def load_demo_transactions(user_id: int, file_id: str) -> Tuple[List[BankingTran
     }
 
     return transactions, metadata
+
+
+def seed_demo_transactions(user_id: int, file_id: str) -> Tuple[List[BankingTransaction], dict]:
+    """Load the demo transactions and ingest them for ``file_id`` in batched inserts.
+
+    Rows that already exist (same ``{file_id}_{idx}`` id) are skipped, so seeding
+    twice is harmless. ``metadata["inserted_count"]`` reports how many were new and
+    ``metadata["deduplicated_count"]`` how many matched transactions from other uploads.
+    """
+    transactions, metadata = load_demo_transactions(user_id, file_id)
+    result = database_service.ingest_banking_transactions(transactions)
+    metadata["inserted_count"] = len(result["inserted_ids"])
+    metadata["deduplicated_count"] = result["deduplicated"]
+    return transactions, metadata
@@ -0,0 +1,157 @@
+"""Persistent cache of LLM extraction output, keyed by request payload.
+
+The same statement pages are sent to the LLM again on job retries, re-uploads and
+reprocessing runs. Before every extraction request the extractor looks the payload up
+here by ``(sha256(payload), model, prompt_version)``, and only requests that miss go
+to ``chunk_scheduler`` (so cached chunks use no concurrency slot or token budget). The
+entries live in the ``extraction_chunk_cache`` table, shared by every process, and are
+evicted least recently used first once they outgrow
+``EXTRACTION_CHUNK_CACHE_MAX_BYTES``.
+
+The cache is an optimisation only: a database error is logged and treated as a miss,
+so extraction never fails because of it. Hit, miss and eviction counts are kept per
+process (see ``ChunkCache.stats``); each entry's ``hit_count`` is kept in the table.
+"""
+
+import asyncio
+import hashlib
+from typing import Any, Dict, List, Optional, TypedDict
+
+try:
+    from backend.config import settings
+    from backend.services.db.postgres_connector import database_service
+except ImportError:
+    import sys
+    from pathlib import Path
+    apps_dir = Path(__file__).parent.parent.parent.parent  # Go up to apps/
+    if str(apps_dir) not in sys.path:
+        sys.path.insert(0, str(apps_dir))
+    from backend.config import settings
+    from backend.services.db.postgres_connector import database_service
+
+
+class ChunkCacheStats(TypedDict):
+    """Extraction cache counters since the process started.
+
+    Attributes:
+        hits: Lookups served from the cache
+        misses: Lookups that went to the LLM
+        hit_rate: hits / (hits + misses), 0.0 before the first lookup
+        stores: Entries written
+        evictions: Entries evicted to stay within the size budget
+        errors: Lookups or writes that failed (counted as misses or skipped)
+    """
+    hits: int
+    misses: int
+    hit_rate: float
+    stores: int
+    evictions: int
+    errors: int
+
+
+def payload_hash(*parts: bytes) -> str:
+    """SHA-256 hex digest of a request payload given as one or more byte strings.
+
+    Parts are length-prefixed, so ('ab', 'c') and ('a', 'bc') hash differently.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class ChunkCache:
+    """Looks up and stores LLM extraction output in the extraction_chunk_cache table."""
+
+    def __init__(
+        self,
+        enabled: bool = settings.EXTRACTION_CHUNK_CACHE_ENABLED,
+        max_bytes: int = settings.EXTRACTION_CHUNK_CACHE_MAX_BYTES,
+    ):
+        """Initialize the cache.
+
+        Args:
+            enabled: Whether lookups and writes are made at all
+            max_bytes: Total size of cached output kept before LRU eviction
+        """
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.errors = 0
+
+    async def get(self, chunk_hash: str, model: str, prompt_version: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached transactions for a payload, or None on a miss.
+
+        Args:
+            chunk_hash: ``payload_hash`` of the request payload
+            model: Model the request would be sent to
+            prompt_version: Current extraction prompt version
+        """
+        if not self.enabled:
+            return None
+        try:
+            cached = await asyncio.to_thread(
+                database_service.get_cached_chunk_extraction, chunk_hash, model, prompt_version
+            )
+        except Exception as e:
+            self.errors += 1
+            print(f"Error reading extraction cache: {str(e)}")
+            cached = None
+        if cached is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return cached
+
+    async def put(
+        self,
+        chunk_hash: str,
+        model: str,
+        prompt_version: str,
+        transactions: List[Dict[str, Any]],
+    ) -> None:
+        """Cache the transactions extracted from a payload, evicting LRU entries over budget.
+
+        Args:
+            chunk_hash: ``payload_hash`` of the request payload
+            model: Model that produced the output
+            prompt_version: Extraction prompt version used
+            transactions: Transactions parsed from the model response
+        """
+        if not self.enabled:
+            return
+        try:
+            evicted = await asyncio.to_thread(
+                database_service.store_cached_chunk_extraction,
+                chunk_hash,
+                model,
+                prompt_version,
+                transactions,
+                self.max_bytes,
+            )
+        except Exception as e:
+            self.errors += 1
+            print(f"Error writing extraction cache: {str(e)}")
+            return
+        self.stores += 1
+        self.evictions += evicted
+
+    def stats(self) -> ChunkCacheStats:
+        """Return the cache counters since the process started."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "errors": self.errors,
+        }
+
+
+# Process-wide instance used by the extractor
+chunk_cache = ChunkCache()
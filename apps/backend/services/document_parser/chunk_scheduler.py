@@ -0,0 +1,157 @@
+"""Process-wide scheduler for LLM extraction requests.
+
+Every in-flight upload in a process submits its chunk requests through the shared
+``chunk_scheduler``, which bounds them with one semaphore
+(``EXTRACTION_MAX_CONCURRENCY``) and a token bucket refilled at
+``EXTRACTION_TOKENS_PER_MINUTE``. A chunk whose request fails is retried on its own
+with exponential backoff; chunks that succeeded are never re-sent. Separate worker
+processes each have their own scheduler, so size the budget per process.
+"""
+
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, List, Literal, Optional, TypedDict, TypeVar
+
+from openai import APIConnectionError, APIStatusError, APITimeoutError
+
+try:
+    from backend.config import settings
+except ImportError:
+    import sys
+    from pathlib import Path
+    apps_dir = Path(__file__).parent.parent.parent.parent  # Go up to apps/
+    if str(apps_dir) not in sys.path:
+        sys.path.insert(0, str(apps_dir))
+    from backend.config import settings
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+class ChunkStatus(TypedDict):
+    """Outcome of one extraction chunk, stored in the upload's progress report.
+
+    Attributes:
+        chunk: 1-based chunk number
+        pages: 1-based page numbers sent in the chunk
+        status: 'pending', 'succeeded' or 'failed'
+        attempts: Requests made for the chunk (0 when served from the extraction cache)
+        error: Last error, for failed chunks
+    """
+    chunk: int
+    pages: List[int]
+    status: Literal["pending", "succeeded", "failed"]
+    attempts: int
+    error: Optional[str]
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a failed chunk request may succeed when sent again.
+
+    Client errors from the API (bad request, auth, not found) are final; everything
+    else, including malformed or truncated JSON output, is retried.
+    """
+    if isinstance(error, (APIConnectionError, APITimeoutError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return True
+
+
+class ChunkScheduler:
+    """Bounds and retries LLM chunk requests across all uploads in the process."""
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.EXTRACTION_MAX_CONCURRENCY,
+        tokens_per_minute: int = settings.EXTRACTION_TOKENS_PER_MINUTE,
+        max_attempts: int = settings.EXTRACTION_MAX_ATTEMPTS,
+        retry_base_delay: float = settings.EXTRACTION_RETRY_BASE_DELAY_SECONDS,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            max_concurrency: Chunk requests in flight at once
+            tokens_per_minute: Estimated tokens admitted per minute
+            max_attempts: Requests per chunk before it is reported as failed
+            retry_base_delay: Backoff base in seconds: base * 2^(attempt - 1), plus jitter
+        """
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.tokens_per_minute = tokens_per_minute
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._budget_lock = asyncio.Lock()
+        self._available_tokens = float(tokens_per_minute)
+        self._refilled_at = time.monotonic()
+
+    async def _reserve_tokens(self, tokens: int) -> None:
+        """Wait until the token bucket can admit a request of ``tokens`` estimated tokens.
+
+        Requests larger than the whole per-minute budget wait for a full bucket.
+        """
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._budget_lock:
+            while True:
+                now = time.monotonic()
+                self._available_tokens = min(
+                    float(self.tokens_per_minute),
+                    self._available_tokens + (now - self._refilled_at) * self.tokens_per_minute / 60.0,
+                )
+                self._refilled_at = now
+                if self._available_tokens >= tokens:
+                    self._available_tokens -= tokens
+                    return
+                deficit = tokens - self._available_tokens
+                await asyncio.sleep(deficit * 60.0 / self.tokens_per_minute)
+
+    async def run(
+        self,
+        request: Callable[[], Awaitable[T]],
+        estimated_tokens: int,
+        status: ChunkStatus,
+    ) -> T:
+        """Run one chunk request, retrying it with exponential backoff.
+
+        ``status`` is updated in place with the attempt count and outcome.
+
+        Args:
+            request: Coroutine factory that sends the chunk and parses its output
+            estimated_tokens: Estimated input plus output tokens of one attempt
+            status: The chunk's status entry
+
+        Returns:
+            T: The request's result
+
+        Raises:
+            Exception: The last error, once the chunk failed permanently
+        """
+        while True:
+            status["attempts"] += 1
+            await self._reserve_tokens(estimated_tokens)
+            try:
+                async with self._semaphore:
+                    result = await request()
+            except Exception as e:
+                status["error"] = str(e)
+                if status["attempts"] >= self.max_attempts or not is_retryable(e):
+                    status["status"] = "failed"
+                    raise
+                delay = self.retry_base_delay * 2 ** (status["attempts"] - 1)
+                retry_after = getattr(getattr(e, "response", None), "headers", {}).get("retry-after")
+                if retry_after:
+                    try:
+                        delay = max(delay, float(retry_after))
+                    except ValueError:
+                        pass
+                await asyncio.sleep(delay + random.uniform(0, self.retry_base_delay))
+                continue
+            status["status"] = "succeeded"
+            status["error"] = None
+            return result
+
+
+# Shared by every upload processed in this process
+chunk_scheduler = ChunkScheduler()
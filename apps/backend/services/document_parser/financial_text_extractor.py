@@ -9,14 +9,15 @@ This module extracts structured banking transaction data from various document f
 
 import io
 import os
+import re
 import json
 import base64
 import asyncio
+from collections import defaultdict
 from pathlib import Path
-from datetime import datetime
-from typing import List, Dict, Any, Literal
+from typing import AsyncIterator, Awaitable, BinaryIO, Callable, List, Dict, Any, Literal, Set, Tuple
 
-from openai import OpenAI, AsyncOpenAI
+from openai import AsyncOpenAI
 
 import pandas as pd
 
@@ -24,6 +25,16 @@ import pandas as pd
 try:
     from backend.config import settings
     from backend.schemas.transaction_category import FinancialTransactionCategory
+    from backend.services.document_parser.chunk_cache import chunk_cache, payload_hash
+    from backend.services.document_parser.chunk_scheduler import ChunkStatus, chunk_scheduler
+    from backend.services.document_parser.pdf_processing import (
+        PreparedPdf,
+        extract_pdf_text,
+        prepare_pdf,
+        run_in_process_pool,
+    )
+    from backend.services.document_parser.normalization import normalize_transactions
+    from backend.services.document_parser.spreadsheet_parser import parse_spreadsheet
 except ImportError:
     # If running as script, add parent directory to path
     import sys
@@ -35,6 +46,42 @@ except ImportError:
         sys.path.insert(0, str(apps_dir))
     from backend.config import settings
     from backend.schemas.transaction_category import FinancialTransactionCategory
+    from backend.services.document_parser.chunk_cache import chunk_cache, payload_hash
+    from backend.services.document_parser.chunk_scheduler import ChunkStatus, chunk_scheduler
+    from backend.services.document_parser.pdf_processing import (
+        PreparedPdf,
+        extract_pdf_text,
+        prepare_pdf,
+        run_in_process_pool,
+    )
+    from backend.services.document_parser.normalization import normalize_transactions
+    from backend.services.document_parser.spreadsheet_parser import parse_spreadsheet
+
+
+# Called with (chunks_done, chunks_total) as extraction chunks complete
+ProgressCallback = Callable[[int, int], None]
+
+# Called once with the final status of every LLM chunk of a document
+ChunkReportCallback = Callable[[List[ChunkStatus]], None]
+
+# Model used for structured extraction
+EXTRACTION_MODEL = "gpt-4o-mini"
+
+# Version of the extraction prompts and normalisation. Bump it whenever either changes
+# so cached extraction output produced by the old prompts is no longer reused.
+EXTRACTION_PROMPT_VERSION = "2"
+
+# MIME types parsed as spreadsheets before falling back to the LLM. Browsers report CSV
+# files under several of these, so the parser tells the formats apart by content.
+SPREADSHEET_MIME_TYPES = {
+    "text/csv",
+    "application/csv",
+    "text/comma-separated-values",
+    "application/vnd.ms-excel",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+# Rows per batch yielded for locally parsed spreadsheets
+SPREADSHEET_BATCH_ROWS = 1000
 
 
 class FinancialTextExtractor:
@@ -46,29 +93,73 @@ class FinancialTextExtractor:
         api_key = getattr(settings, 'OPENAI_API_KEY', None) or os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY must be set in environment or config")
-        self.client = OpenAI(api_key=api_key)
         self.async_client = AsyncOpenAI(api_key=api_key)
     
     async def extract_from_file(
         self,
         file_path: str | Path | None = None,
-        file_content: bytes | None = None,
+        file_content: bytes | BinaryIO | None = None,
         file_mime_type: str | None = None,
         user_upload_id: str | None = None,
         backend: Literal["pypdf2", "openai"] = "openai",
+        progress_callback: ProgressCallback | None = None,
+        chunk_report_callback: ChunkReportCallback | None = None,
     ) -> List[Dict[str, Any]]:
         """
         Extract banking transactions from a file.
         
         Args:
             file_path: Path to the file (or filename if file_content provided)
-            file_content: Optional file content as bytes
+            file_content: Optional file content as bytes or a readable binary file handle
+                (e.g. a temporary file; PDFs are then read page by page instead of copied)
             file_mime_type: MIME type of the file (e.g., 'application/pdf', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
             user_upload_id: Optional user upload ID to associate with transactions
             backend: Backend to use for extraction. Either "pypdf2" or "openai". For "openai", the text extraction is done by OpenAI. For "pypdf2", the text extraction is done by pypdf2.
+            progress_callback: Optional callable invoked with (chunks_done, chunks_total) as chunks are extracted
+            chunk_report_callback: Optional callable invoked with the final per-chunk status report
         Returns:
             List of transaction dictionaries matching the statement_banking_transaction schema
         """
+        transactions = []
+        async for batch in self.iter_transactions(
+            file_path=file_path,
+            file_content=file_content,
+            file_mime_type=file_mime_type,
+            user_upload_id=user_upload_id,
+            backend=backend,
+            progress_callback=progress_callback,
+            chunk_report_callback=chunk_report_callback,
+        ):
+            transactions.extend(batch)
+        return transactions
+
+    async def iter_transactions(
+        self,
+        file_path: str | Path | None = None,
+        file_content: bytes | BinaryIO | None = None,
+        file_mime_type: str | None = None,
+        user_upload_id: str | None = None,
+        backend: Literal["pypdf2", "openai"] = "openai",
+        progress_callback: ProgressCallback | None = None,
+        chunk_report_callback: ChunkReportCallback | None = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Extract banking transactions from a file, batch by batch as extraction chunks complete.
+
+        Takes the same arguments as ``extract_from_file``. Batches come in statement
+        order: for PDFs one per locally parsed page or LLM chunk (a chunk is yielded once
+        it and the block after it are in, so their shared overlap page is reconciled);
+        spreadsheets parsed locally (see ``spreadsheet_parser``) are yielded
+        ``SPREADSHEET_BATCH_ROWS`` rows at a time; other documents and the "pypdf2"
+        backend yield a single batch.
+
+        Raises:
+            ValueError: If extraction fails. Batches already yielded stay valid; a failed
+                chunk stops the iteration at the first batch that depends on it
+
+        Yields:
+            List of transaction dictionaries matching the statement_banking_transaction schema
+        """
         # Determine file type
         if file_mime_type:
             mime_type = file_mime_type
@@ -78,23 +169,54 @@ class FinancialTextExtractor:
             mime_type = self._get_mime_type_from_path(file_path)
         
         if backend == "pypdf2":
-            # Extract text/data from file
+            # Extract text/data from file, off the event loop
             if 'pdf' in mime_type.lower():
-                text_content = self._extract_from_pdf(file_path, file_content)
-            elif 'excel' in mime_type.lower() or 'spreadsheet' in mime_type.lower() or \
-                file_path.suffix.lower() in ['.xlsx', '.xls'] if isinstance(file_path, Path) else \
-                str(file_path).lower().endswith(('.xlsx', '.xls')):
-                text_content = self._extract_from_excel(file_path, file_content)
+                # pdfplumber holds the GIL for the whole parse, so it runs in the process pool
+                text_content = await run_in_process_pool(
+                    extract_pdf_text, self._pool_source(file_path, file_content)
+                )
             else:
-                # Try to extract as text
-                text_content = self._extract_as_text(file_path, file_content)
+                # The text extractors below work on bytes
+                if file_content is not None and not isinstance(file_content, bytes):
+                    file_content = self._open_content(None, file_content).read()
+
+                if 'excel' in mime_type.lower() or 'spreadsheet' in mime_type.lower() or \
+                    file_path.suffix.lower() in ['.xlsx', '.xls'] if isinstance(file_path, Path) else \
+                    str(file_path).lower().endswith(('.xlsx', '.xls')):
+                    text_content = await asyncio.to_thread(self._extract_from_excel, file_path, file_content)
+                else:
+                    # Try to extract as text
+                    text_content = await asyncio.to_thread(self._extract_as_text, file_path, file_content)
             
             # Use OpenAI to extract structured data
+            if progress_callback:
+                progress_callback(0, 1)
             transactions = await self._extract_structured_data_using_pypdf2(text_content, user_upload_id)
+            if progress_callback:
+                progress_callback(1, 1)
+            yield transactions
         else:
+            if mime_type.lower() in SPREADSHEET_MIME_TYPES:
+                # Bank exports with a recognisable header are parsed without the LLM
+                parsed = await run_in_process_pool(parse_spreadsheet, self._pool_source(file_path, file_content))
+                if parsed is not None:
+                    if progress_callback:
+                        progress_callback(1, 1)
+                    rows = parsed["transactions"]
+                    for start in range(0, len(rows), SPREADSHEET_BATCH_ROWS):
+                        yield self._transform_transactions(rows[start:start + SPREADSHEET_BATCH_ROWS], user_upload_id)
+                    return
+
             # Use OpenAI to extract structured data
-            transactions = await self._extract_structured_data_using_openai(file_path, file_content, mime_type, user_upload_id=user_upload_id)
-        return transactions
+            async for batch in self._iter_structured_data_using_openai(
+                file_path,
+                file_content,
+                mime_type,
+                user_upload_id=user_upload_id,
+                progress_callback=progress_callback,
+                chunk_report_callback=chunk_report_callback,
+            ):
+                yield batch
     
     def _get_mime_type_from_path(self, file_path: str | Path) -> str:
         """Infer MIME type from file extension."""
@@ -111,68 +233,40 @@ class FinancialTextExtractor:
         
         return mime_types.get(suffix, 'application/octet-stream')
     
+    @staticmethod
+    def _open_content(file_path: str | Path | None, file_content: bytes | BinaryIO | None) -> BinaryIO:
+        """Return a readable binary stream positioned at the start of the document."""
+        if file_content is None:
+            if not file_path:
+                raise ValueError("Either file_path or file_content must be provided")
+            return open(file_path, "rb")
+        if isinstance(file_content, bytes):
+            return io.BytesIO(file_content)
+        file_content.seek(0)
+        return file_content
+
+    @staticmethod
+    def _pool_source(file_path: str | Path | None, file_content: bytes | BinaryIO | None) -> bytes | str:
+        """Return the document as something a pool worker can read: a path when it is on
+        disk (so large statements are not copied between processes), otherwise its bytes."""
+        if file_content is None:
+            if not file_path:
+                raise ValueError("Either file_path or file_content must be provided")
+            return str(file_path)
+        if isinstance(file_content, bytes):
+            return file_content
+        name = getattr(file_content, "name", None)
+        if isinstance(name, str) and os.path.isfile(name):
+            # Spooled uploads may still have buffered writes
+            if file_content.writable():
+                file_content.flush()
+            return name
+        file_content.seek(0)
+        return file_content.read()
+
     def _extract_from_pdf(self, file_path: str | Path, file_content: bytes | None = None) -> str:
-        """
-        Extract text content from PDF file.
-        
-        Note: This is a basic implementation. For production, consider using
-        pdfplumber or PyMuPDF for better extraction.
-        """
-        try:
-            # Try using pdfplumber first (better for tables)
-            import pdfplumber
-            text_parts = []
-            
-            if file_content:
-                pdf_file = io.BytesIO(file_content)
-            else:
-                pdf_file = open(file_path, 'rb')
-            
-            with pdfplumber.open(pdf_file) as pdf:
-                for page in pdf.pages:
-                    # Extract text
-                    text = page.extract_text()
-                    if text:
-                        text_parts.append(text)
-                    
-                    # Try to extract tables
-                    tables = page.extract_tables()
-                    for table in tables:
-                        if table:
-                            # Convert table to text representation
-                            table_text = '\n'.join([' | '.join(str(cell) if cell else '' for cell in row) for row in table])
-                            text_parts.append(table_text)
-            
-            if not isinstance(file_content, bytes):
-                pdf_file.close()
-            
-            return '\n\n'.join(text_parts)
-        except ImportError:
-            # Fallback to PyPDF2 if pdfplumber not available
-            try:
-                import PyPDF2
-                text_parts = []
-                
-                if file_content:
-                    pdf_file = io.BytesIO(file_content)
-                else:
-                    pdf_file = open(file_path, 'rb')
-                
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-                for page in pdf_reader.pages:
-                    text = page.extract_text()
-                    if text:
-                        text_parts.append(text)
-                
-                if not isinstance(file_content, bytes):
-                    pdf_file.close()
-                
-                return '\n\n'.join(text_parts)
-            except ImportError:
-                raise ImportError(
-                    "PDF extraction requires either 'pdfplumber' or 'PyPDF2'. "
-                    "Install with: pip install pdfplumber or pip install PyPDF2"
-                )
+        """Extract text content from PDF file (see ``pdf_processing.extract_pdf_text``)."""
+        return extract_pdf_text(file_content if file_content else str(file_path))
     
     def _extract_from_excel(self, file_path: str | Path, file_content: bytes | None = None) -> str:
         """Extract text content from Excel file."""
@@ -280,9 +374,9 @@ class FinancialTextExtractor:
 
         Return a JSON object with a "transactions" key containing an array of transaction objects with the fields specified above."""
 
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",  # or "gpt-4-turbo-preview" for better structured extraction
+        async def request():
+            response = await self.async_client.chat.completions.create(
+                model=EXTRACTION_MODEL,  # or "gpt-4-turbo-preview" for better structured extraction
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
@@ -290,63 +384,53 @@ class FinancialTextExtractor:
                 response_format={"type": "json_object"},
                 temperature=0.1,  # Low temperature for consistent extraction
             )
-            
-            # Parse the response
-            content = response.choices[0].message.content
-            
-            # Try to extract JSON from the response
-            # Sometimes OpenAI wraps it in markdown code blocks
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
-            
-            # Parse JSON
-            try:
-                data = json.loads(content)
-                # Handle both {"transactions": [...]} and [...] formats
-                if isinstance(data, dict) and "transactions" in data:
-                    transactions = data["transactions"]
-                elif isinstance(data, list):
-                    transactions = data
-                elif isinstance(data, dict):
-                    # Try to find any array value in the dict
-                    transactions = next((v for v in data.values() if isinstance(v, list)), [])
-                else:
-                    transactions = []
-            except json.JSONDecodeError:
-                # Try to find JSON array in the text
-                import re
-                json_match = re.search(r'\[.*\]', content, re.DOTALL)
-                if json_match:
-                    transactions = json.loads(json_match.group())
-                else:
-                    raise ValueError(f"Failed to parse JSON from OpenAI response: {content}")
-            
-            # Transform to match database schema
-            structured_transactions = []
-            for tx in transactions:
-                structured_tx = self._transform_transaction(tx, user_upload_id)
-                if structured_tx:
-                    structured_transactions.append(structured_tx)
-            
-            return structured_transactions
-            
+            return self._parse_transactions_json(response.choices[0].message.content)
+
+        status: ChunkStatus = {"chunk": 1, "pages": [], "status": "pending", "attempts": 0, "error": None}
+        try:
+            # ~4 characters per token, plus the JSON output
+            transactions = await self._run_cached(
+                payload_hash(b"text", text_content.encode("utf-8")),
+                request,
+                len(text_content) // 2,
+                status,
+            )
         except Exception as e:
             raise ValueError(f"Failed to extract structured data: {str(e)}")
 
-    async def _extract_structured_data_using_openai(
+        # Transform to match database schema
+        return self._transform_transactions(transactions, user_upload_id)
+
+    async def _iter_structured_data_using_openai(
         self, 
         file_path: str | Path | None = None,
-        file_content: bytes | None = None,
+        file_content: bytes | BinaryIO | None = None,
         file_mime_type: str | None = None,
         user_upload_id: str | None = None,
-    ) -> List[Dict[str, Any]]:
+        progress_callback: ProgressCallback | None = None,
+        chunk_report_callback: ChunkReportCallback | None = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
         """
         Uses OpenAI to extract structured banking transaction data from file.
-        For PDFs, splits into 2-page chunks and processes them in parallel.
+        PDFs from known bank layouts are parsed locally first (see
+        ``statement_layouts``); the remaining pages are split into chunks sized by an
+        estimated token and row budget (see ``pdf_processing.plan_pdf_chunks``). Both
+        steps run in the PDF process pool so the event loop keeps serving requests.
+        Every request, including the single one for non-PDF documents, is first looked
+        up in the extraction cache (see ``chunk_cache``); misses go through the async
+        client and the shared ``chunk_scheduler``, which bounds concurrency and token
+        rate across uploads and retries each failed chunk on its own. Each
+        finished chunk is reported to ``progress_callback`` and the final per-chunk
+        statuses to ``chunk_report_callback``. Transactions are yielded per block in
+        page order, each once the rows extracted twice from its overlap with the next
+        block are reconciled.
+
+        Raises:
+            ValueError: If extraction fails, including when any chunk still fails after
+                its retries (iteration stops there, so the job is retried rather than
+                silently storing a gap)
         
-        Returns a list of transaction dictionaries matching the schema.
+        Yields lists of transaction dictionaries matching the schema.
         """
         # Get valid category values from enum
         valid_categories = [cat.value for cat in FinancialTransactionCategory]
@@ -398,111 +482,9 @@ class FinancialTextExtractor:
 
         user_prompt = f"""Extract all banking transactions from the following file. Return a JSON object with a "transactions" key containing an array of transaction objects with the fields specified above."""
 
-        # Ensure we have file_content
-        if file_path and file_content is None:
-            with open(file_path, "rb") as f:
-                file_content = f.read()
-        
-        if file_content is None:
-            raise ValueError("Either file_path or file_content must be provided")
-        
-        try:
-            # If PDF, split into 2-page chunks and process in parallel
-            if file_mime_type and 'pdf' in file_mime_type.lower():
-                # Split PDF into 2-page chunks
-                import PyPDF2
-                pdf_file = io.BytesIO(file_content)
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-                total_pages = len(pdf_reader.pages)
-                
-                chunks = []
-                for start_page in range(0, total_pages, 2):
-                    end_page = min(start_page + 2, total_pages)
-                    pdf_writer = PyPDF2.PdfWriter()
-                    for page_num in range(start_page, end_page):
-                        pdf_writer.add_page(pdf_reader.pages[page_num])
-                    chunk_buffer = io.BytesIO()
-                    pdf_writer.write(chunk_buffer)
-                    chunks.append(chunk_buffer.getvalue())
-                    chunk_buffer.close()
-                pdf_file.close()
-                
-                # Process chunks in parallel
-                async def process_chunk(chunk_content):
-                    response = await self.async_client.responses.create(
-                        model="gpt-4o-mini",
-                        input=[
-                            {"role": "system", "content": system_prompt},
-                            {
-                                "role": "user",
-                                "content": [
-                                    {
-                                        "type": "input_text",
-                                        "text": user_prompt
-                                    },
-                                    {
-                                        "type": "input_file", 
-                                        "filename": "financial_document",
-                                        "file_data": f"data:{file_mime_type};base64,{base64.b64encode(chunk_content).decode('utf-8')}"
-                                    }
-                                ]
-                            }
-                        ],
-                        temperature=0.1,
-                    )
-                    return response.output_text
-                
-                # Run all chunks in parallel
-                tasks = [process_chunk(chunk) for chunk in chunks]
-                responses = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                # Parse all responses and combine transactions
-                all_transactions = []
-                for i, content in enumerate(responses):
-                    if isinstance(content, Exception):
-                        print(f"Error processing chunk {i+1}: {str(content)}")
-                        continue
-                    
-                    # Try to extract JSON from the response
-                    if "```json" in content:
-                        content = content.split("```json")[1].split("```")[0].strip()
-                    elif "```" in content:
-                        content = content.split("```")[1].split("```")[0].strip()
-                    
-                    # Parse JSON
-                    try:
-                        data = json.loads(content)
-                        if isinstance(data, dict) and "transactions" in data:
-                            transactions = data["transactions"]
-                        elif isinstance(data, list):
-                            transactions = data
-                        elif isinstance(data, dict):
-                            transactions = next((v for v in data.values() if isinstance(v, list)), [])
-                        else:
-                            transactions = []
-                    except json.JSONDecodeError:
-                        import re
-                        json_match = re.search(r'\[.*\]', content, re.DOTALL)
-                        if json_match:
-                            transactions = json.loads(json_match.group())
-                        else:
-                            print(f"Failed to parse JSON from chunk {i+1}: {content}")
-                            continue
-                    
-                    all_transactions.extend(transactions)
-                
-                # Transform to match database schema
-                structured_transactions = []
-                for tx in all_transactions:
-                    structured_tx = self._transform_transaction(tx, user_upload_id)
-                    if structured_tx:
-                        structured_transactions.append(structured_tx)
-                
-                return structured_transactions
-            
-            # For non-PDF files, use the original synchronous approach
-            response = self.client.responses.create(
-                model="gpt-4o-mini",  # or "gpt-4-turbo-preview" for better structured extraction
+        async def request_extraction(file_bytes: bytes):
+            response = await self.async_client.responses.create(
+                model=EXTRACTION_MODEL,
                 input=[
                     {"role": "system", "content": system_prompt},
                     {
@@ -515,65 +497,280 @@ class FinancialTextExtractor:
                             {
                                 "type": "input_file", 
                                 "filename": "financial_document",
-                                "file_data": f"data:{file_mime_type};base64,{base64.b64encode(file_content).decode('utf-8')}"
+                                "file_data": f"data:{file_mime_type};base64,{base64.b64encode(file_bytes).decode('utf-8')}"
                             }
                         ]
                     }
                 ],
                 temperature=0.1,  # Low temperature for consistent extraction
             )
+            # Parsed inside the scheduled request so truncated JSON is retried too
+            return self._parse_transactions_json(response.output_text)
+
+        try:
+            # If PDF, split into token-budgeted chunks and process in parallel
+            if file_mime_type and 'pdf' in file_mime_type.lower():
+                # Layout parsing and splitting are CPU-bound and run in the process pool
+                prepared: PreparedPdf = await run_in_process_pool(
+                    prepare_pdf, self._pool_source(file_path, file_content)
+                )
+                layout_result = prepared["layout_result"]
+                chunk_plans = prepared["chunk_plans"]
+                chunks = prepared["chunks"]
+
+                # Raw rows of the locally parsed pages, keyed by page
+                exact_blocks: Dict[int, List[Dict[str, Any]]] = {}
+                if layout_result is not None:
+                    exact_blocks = layout_result["pages"]
+
+                chunk_statuses: List[ChunkStatus] = [
+                    {
+                        "chunk": i + 1,
+                        "pages": [page_num + 1 for page_num in plan["pages"]],
+                        "status": "pending",
+                        "attempts": 0,
+                        "error": None,
+                    }
+                    for i, plan in enumerate(chunk_plans)
+                ]
+                chunks_done = 0
+
+                # Process chunks in parallel, bounded and retried by the shared scheduler
+                async def process_chunk_with_progress(i, chunk_content):
+                    nonlocal chunks_done
+                    try:
+                        return await self._run_cached(
+                            payload_hash(file_mime_type.encode(), chunk_content),
+                            lambda: request_extraction(chunk_content),
+                            chunk_plans[i]["estimated_tokens"],
+                            chunk_statuses[i],
+                        )
+                    finally:
+                        chunks_done += 1
+                        if progress_callback:
+                            progress_callback(chunks_done, len(chunks))
+
+                if progress_callback:
+                    if chunks:
+                        progress_callback(0, len(chunks))
+                    else:
+                        # A fully parsed statement counts as a single finished chunk
+                        progress_callback(1, 1)
+
+                # LLM chunks keyed by their first page, like the parsed pages
+                chunk_tasks = {
+                    plan["pages"][0]: asyncio.create_task(process_chunk_with_progress(i, chunk))
+                    for i, (plan, chunk) in enumerate(zip(chunk_plans, chunks))
+                }
+                # The chunk bytes are held by their tasks until sent
+                del chunks
+
+                async def load_block(start: int) -> List[Dict[str, Any]]:
+                    """Transformed rows of the block starting at ``start``, once extracted."""
+                    if start in exact_blocks:
+                        return self._transform_transactions(exact_blocks[start], user_upload_id)
+                    try:
+                        transactions = await chunk_tasks[start]
+                    except Exception:
+                        # Let the other chunks settle so the report lists every failure
+                        await asyncio.gather(*chunk_tasks.values(), return_exceptions=True)
+                        if chunk_report_callback:
+                            chunk_report_callback(chunk_statuses)
+                        failed = [status for status in chunk_statuses if status["status"] == "failed"]
+                        raise ValueError(
+                            f"{len(failed)} of {len(chunk_statuses)} chunks failed: "
+                            + "; ".join(f"chunk {status['chunk']}: {status['error']}" for status in failed)
+                        )
+                    return self._transform_transactions(transactions, user_upload_id)
+
+                # Blocks are yielded in page order. Chunks end with an overlap page that
+                # the next block also covers, so a chunk is held back until the next
+                # block is in and the rows extracted twice across the boundary are dropped.
+                overlapping_blocks = {plan["pages"][0] for plan in chunk_plans if len(plan["pages"]) > 1}
+                block_starts = sorted(set(exact_blocks) | set(chunk_tasks))
+                try:
+                    current = await load_block(block_starts[0]) if block_starts else []
+                    for position, start in enumerate(block_starts):
+                        following: List[Dict[str, Any]] = []
+                        if position + 1 < len(block_starts):
+                            following_start = block_starts[position + 1]
+                            following = await load_block(following_start)
+                            if start in overlapping_blocks:
+                                current, following = self._reconcile_chunk_boundary(
+                                    current,
+                                    following,
+                                    later_is_exact=following_start in exact_blocks,
+                                )
+                        if current:
+                            yield current
+                        current = following
+                finally:
+                    # Stop chunks still in flight when the consumer stops early or a chunk failed
+                    for task in chunk_tasks.values():
+                        task.cancel()
+
+                if chunk_report_callback and chunk_statuses:
+                    chunk_report_callback(chunk_statuses)
+                return
             
-            # Parse the response
-            content = response.output_text
-            
-            # Try to extract JSON from the response
-            # Sometimes OpenAI wraps it in markdown code blocks
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
-            
-            # Parse JSON
+            # Other documents go to the LLM whole, as a single scheduled request
+            document = self._open_content(file_path, file_content)
             try:
-                data = json.loads(content)
-                # Handle both {"transactions": [...]} and [...] formats
-                if isinstance(data, dict) and "transactions" in data:
-                    transactions = data["transactions"]
-                elif isinstance(data, list):
-                    transactions = data
-                elif isinstance(data, dict):
-                    # Try to find any array value in the dict
-                    transactions = next((v for v in data.values() if isinstance(v, list)), [])
-                else:
-                    transactions = []
-            except json.JSONDecodeError:
-                # Try to find JSON array in the text
-                import re
-                json_match = re.search(r'\[.*\]', content, re.DOTALL)
-                if json_match:
-                    transactions = json.loads(json_match.group())
-                else:
-                    raise ValueError(f"Failed to parse JSON from OpenAI response: {content}")
-            
+                file_bytes = document.read()
+            finally:
+                # Only close streams opened here; caller-provided handles stay open
+                if document is not file_content:
+                    document.close()
+
+            status: ChunkStatus = {"chunk": 1, "pages": [], "status": "pending", "attempts": 0, "error": None}
+            if progress_callback:
+                progress_callback(0, 1)
+            try:
+                # ~4 bytes per token, plus the JSON output
+                transactions = await self._run_cached(
+                    payload_hash(file_mime_type.encode(), file_bytes),
+                    lambda: request_extraction(file_bytes),
+                    len(file_bytes) // 2,
+                    status,
+                )
+            finally:
+                if progress_callback:
+                    progress_callback(1, 1)
+                if chunk_report_callback:
+                    chunk_report_callback([status])
+
             # Transform to match database schema
-            structured_transactions = []
-            for tx in transactions:
-                structured_tx = self._transform_transaction(tx, user_upload_id)
-                if structured_tx:
-                    structured_transactions.append(structured_tx)
-            
-            return structured_transactions
+            yield self._transform_transactions(transactions, user_upload_id)
             
         except Exception as e:
             raise ValueError(f"Failed to extract structured data: {str(e)}")
     
-    def _transform_transaction(
-        self, 
-        transaction: Dict[str, Any], 
+    async def _run_cached(
+        self,
+        chunk_hash: str,
+        request: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        estimated_tokens: int,
+        status: ChunkStatus,
+    ) -> List[Dict[str, Any]]:
+        """Return a request's transactions from the extraction cache, or make the request.
+
+        Cached output is returned without touching ``chunk_scheduler`` (``status`` is
+        marked succeeded with no attempts); on a miss the request is scheduled as usual
+        and its parsed output cached under ``chunk_hash``, ``EXTRACTION_MODEL`` and
+        ``EXTRACTION_PROMPT_VERSION`` (see ``chunk_cache``). Empty output is not cached,
+        so a chunk the model returned nothing for is asked again next time.
+
+        Args:
+            chunk_hash: ``payload_hash`` of everything the request sends besides the prompts
+            request: Makes the LLM request and parses its transactions
+            estimated_tokens: Estimated input plus output tokens of the request
+            status: The chunk's entry in the chunk report
+        """
+        cached = await chunk_cache.get(chunk_hash, EXTRACTION_MODEL, EXTRACTION_PROMPT_VERSION)
+        if cached is not None:
+            status["status"] = "succeeded"
+            return cached
+        transactions = await chunk_scheduler.run(request, estimated_tokens, status)
+        if transactions:
+            await chunk_cache.put(chunk_hash, EXTRACTION_MODEL, EXTRACTION_PROMPT_VERSION, transactions)
+        return transactions
+
+    @staticmethod
+    def _parse_transactions_json(content: str) -> List[Dict[str, Any]]:
+        """Parse the transaction list out of a model response.
+
+        Raises:
+            ValueError: If no JSON transaction list can be found in the response
+        """
+        # Sometimes OpenAI wraps it in markdown code blocks
+        if "```json" in content:
+            content = content.split("```json")[1].split("```")[0].strip()
+        elif "```" in content:
+            content = content.split("```")[1].split("```")[0].strip()
+
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError:
+            # Try to find JSON array in the text
+            json_match = re.search(r'\[.*\]', content, re.DOTALL)
+            if not json_match:
+                raise ValueError(f"Failed to parse JSON from OpenAI response: {content}")
+            try:
+                return json.loads(json_match.group())
+            except json.JSONDecodeError:
+                raise ValueError(f"Failed to parse JSON from OpenAI response: {content}")
+
+        # Handle both {"transactions": [...]} and [...] formats
+        if isinstance(data, dict) and "transactions" in data:
+            return data["transactions"]
+        if isinstance(data, list):
+            return data
+        if isinstance(data, dict):
+            # Try to find any array value in the dict
+            return next((v for v in data.values() if isinstance(v, list)), [])
+        return []
+
+    @staticmethod
+    def _same_transaction(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+        """Whether two rows with the same date and amount describe one transaction."""
+        if a["balance"] is not None and b["balance"] is not None and a["balance"] != b["balance"]:
+            return False
+        desc_a = re.sub(r"[^a-z0-9]", "", a["description"].lower())
+        desc_b = re.sub(r"[^a-z0-9]", "", b["description"].lower())
+        # A row cut at a page break keeps only the start of its description
+        return desc_a.startswith(desc_b) or desc_b.startswith(desc_a)
+
+    def _reconcile_chunk_boundary(
+        self,
+        earlier: List[Dict[str, Any]],
+        later: List[Dict[str, Any]],
+        later_is_exact: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Remove transactions extracted twice across a chunk boundary.
+
+        The earlier chunk's overlap page is also covered by the later block, so rows are
+        matched one-to-one on date, amount, balance and description. Of each matched
+        pair the copy with the longer description is kept, since the other was usually
+        cut at the page break; locally parsed (exact) rows are always kept.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: The earlier and later rows
+                without the duplicates
+        """
+        later_by_key: Dict[Tuple[Any, Any], List[int]] = defaultdict(list)
+        for index, tx in enumerate(later):
+            later_by_key[(tx["transaction_date"], tx["amount"])].append(index)
+
+        matched: Set[int] = set()
+        drop_earlier: Set[int] = set()
+        drop_later: Set[int] = set()
+        for index, tx in enumerate(earlier):
+            for later_index in later_by_key.get((tx["transaction_date"], tx["amount"]), []):
+                if later_index in matched or not self._same_transaction(tx, later[later_index]):
+                    continue
+                matched.add(later_index)
+                if later_is_exact or len(later[later_index]["description"]) >= len(tx["description"]):
+                    drop_earlier.add(index)
+                else:
+                    drop_later.add(later_index)
+                break
+
+        return (
+            [tx for index, tx in enumerate(earlier) if index not in drop_earlier],
+            [tx for index, tx in enumerate(later) if index not in drop_later],
+        )
+
+    def _transform_transactions(
+        self,
+        transactions: List[Dict[str, Any]],
         user_upload_id: str | None = None,
-    ) -> Dict[str, Any] | None:
+    ) -> List[Dict[str, Any]]:
         """
-        Transform extracted transaction to match database schema.
+        Transform a batch of extracted transactions to match the database schema,
+        dropping rows without a date, description or positive amount.
+
+        The batch is normalised column-wise (see ``normalization.normalize_transactions``),
+        with its date format inferred once for the whole batch.
         
         Schema fields:
         - id: TEXT PRIMARY KEY
@@ -593,158 +790,28 @@ class FinancialTextExtractor:
         - currency: TEXT NOT NULL DEFAULT 'MYR'
         - is_subscription: BOOLEAN NOT NULL DEFAULT FALSE
         """
-        try:
-            # Parse date
-            date_str = transaction.get('transaction_date', '')
-            if not date_str:
-                return None
-            
-            # Parse date in various formats
-            transaction_date = self._parse_date(date_str)
-            if not transaction_date:
-                return None
-            
-            # Extract date components
-            transaction_year = transaction_date.year
-            transaction_month = transaction_date.month
-            transaction_day = transaction_date.day
-            
-            # Get required fields
-            description = transaction.get('description', '').strip()
-            if not description:
-                return None
-            
-            amount = float(transaction.get('amount', 0))
-            if amount <= 0:
-                return None
-            
-            transaction_type = transaction.get('transaction_type', '').lower()
-            if transaction_type not in ['debit', 'credit']:
-                # Try to infer from context
-                transaction_type = 'debit'  # Default to debit
-            
-            # Get optional fields
-            merchant_name = transaction.get('merchant_name')
-            if merchant_name:
-                merchant_name = merchant_name.strip() or None
-            
-            balance = transaction.get('balance')
-            if balance is not None:
-                try:
-                    balance = float(balance)
-                except (ValueError, TypeError):
-                    balance = None
-            
-            reference_number = transaction.get('reference_number')
-            if reference_number:
-                reference_number = str(reference_number).strip() or None
-            
-            transaction_code = transaction.get('transaction_code')
-            if transaction_code:
-                transaction_code = str(transaction_code).strip() or None
-            
-            category = transaction.get('category')
-            if category:
-                category = str(category).strip().lower()
-                # Validate category against enum values
-                valid_categories = [cat.value for cat in FinancialTransactionCategory]
-                if category not in valid_categories:
-                    # Try to find a close match or default to 'other'
-                    # Normalize common variations
-                    category_mapping = {
-                        'food': 'food_and_dining_out',
-                        'dining': 'food_and_dining_out',
-                        'restaurant': 'food_and_dining_out',
-                        'transport': 'transportation',
-                        'travel': 'transportation',
-                        'bills': 'utilities',
-                        'utilities': 'utilities',
-                        'shopping': 'other',
-                        'retail': 'other',
-                    }
-                    category = category_mapping.get(category, 'other')
-                category = category if category in valid_categories else None
-            else:
-                category = None
-            
-            currency = transaction.get('currency', 'MYR').strip().upper() or 'MYR'
-
-            is_subscription = transaction.get('is_subscription', False)
-            
-            return {
-                'user_upload_id': user_upload_id or '',
-                'transaction_date': transaction_date.strftime('%Y-%m-%d'),
-                'transaction_year': transaction_year,
-                'transaction_month': transaction_month,
-                'transaction_day': transaction_day,
-                'description': description,
-                'merchant_name': merchant_name,
-                'amount': round(amount, 2),
-                'transaction_type': transaction_type,
-                'balance': round(balance, 2) if balance is not None else None,
-                'reference_number': reference_number,
-                'transaction_code': transaction_code,
-                'category': category,
-                'currency': currency,
-                'is_subscription': is_subscription,
-            }
-        except Exception as e:
-            # Log error but don't fail completely
-            print(f"Error transforming transaction: {str(e)}")
-            return None
-    
-    def _parse_date(self, date_str: str) -> datetime | None:
-        """Parse date string in various formats."""
-        if not date_str:
-            return None
-        
-        date_str = str(date_str).strip()
-        
-        # Common date formats
-        date_formats = [
-            '%Y-%m-%d',
-            '%d/%m/%Y',
-            '%d-%m-%Y',
-            '%d.%m.%Y',
-            '%Y/%m/%d',
-            '%d %b %Y',
-            '%d %B %Y',
-            '%b %d, %Y',
-            '%B %d, %Y',
-            '%d-%b-%Y',
-            '%d-%B-%Y',
-        ]
-        
-        for fmt in date_formats:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
-        
-        # Try pandas parsing as fallback
-        try:
-            return pd.to_datetime(date_str).to_pydatetime()
-        except Exception:
-            pass
-        
-        return None
+        return normalize_transactions(transactions, user_upload_id)
 
 
 # Convenience function for easy usage
 async def extract_banking_transactions(
     file_path: str | Path | None = None,
-    file_content: bytes | None = None,
+    file_content: bytes | BinaryIO | None = None,
     file_mime_type: str | None = None,
     user_upload_id: str | None = None,
+    progress_callback: ProgressCallback | None = None,
+    chunk_report_callback: ChunkReportCallback | None = None,
 ) -> List[Dict[str, Any]]:
     """
     Convenience function to extract banking transactions from a file.
     
     Args:
         file_path: Path to the file (or filename if file_content provided)
-        file_content: Optional file content as bytes
+        file_content: Optional file content as bytes or a readable binary file handle
         file_mime_type: MIME type of the file
         user_upload_id: Optional user upload ID to associate with transactions
+        progress_callback: Optional callable invoked with (chunks_done, chunks_total)
+        chunk_report_callback: Optional callable invoked with the final per-chunk status report
         
     Returns:
         List of transaction dictionaries matching the statement_banking_transaction schema
@@ -755,8 +822,38 @@ async def extract_banking_transactions(
         file_content=file_content,
         file_mime_type=file_mime_type,
         user_upload_id=user_upload_id,
+        progress_callback=progress_callback,
+        chunk_report_callback=chunk_report_callback,
     )
 
+
+async def iter_banking_transactions(
+    file_path: str | Path | None = None,
+    file_content: bytes | BinaryIO | None = None,
+    file_mime_type: str | None = None,
+    user_upload_id: str | None = None,
+    progress_callback: ProgressCallback | None = None,
+    chunk_report_callback: ChunkReportCallback | None = None,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Convenience function to extract banking transactions from a file batch by batch.
+
+    Takes the same arguments as ``extract_banking_transactions``.
+
+    Yields:
+        Lists of transaction dictionaries, in statement order, as extraction chunks complete
+    """
+    extractor = FinancialTextExtractor()
+    async for batch in extractor.iter_transactions(
+        file_path=file_path,
+        file_content=file_content,
+        file_mime_type=file_mime_type,
+        user_upload_id=user_upload_id,
+        progress_callback=progress_callback,
+        chunk_report_callback=chunk_report_callback,
+    ):
+        yield batch
+
 if __name__ == "__main__":
     from pprint import pprint
     
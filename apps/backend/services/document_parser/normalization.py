@@ -0,0 +1,220 @@
+"""Column-wise normalisation of extracted transactions.
+
+Rows from the LLM, the known-layout parser and the spreadsheet parser are normalised
+to the statement_banking_transaction schema one batch (a chunk or a parsed page) at a
+time. The date format is inferred once per batch from a sample of its cells and whole
+columns are converted with pandas, instead of trying every format on every row;
+category labels are validated against a precomputed lookup table.
+"""
+
+from typing import Any, Dict, FrozenSet, List, Optional
+
+import pandas as pd
+
+try:
+    from backend.schemas.transaction_category import FinancialTransactionCategory
+except ImportError:
+    import sys
+    from pathlib import Path
+    apps_dir = Path(__file__).parent.parent.parent.parent  # Go up to apps/
+    if str(apps_dir) not in sys.path:
+        sys.path.insert(0, str(apps_dir))
+    from backend.schemas.transaction_category import FinancialTransactionCategory
+
+
+VALID_CATEGORIES: FrozenSet[str] = frozenset(cat.value for cat in FinancialTransactionCategory)
+
+# Category label (stripped, lowercase) -> stored category. Valid values map to
+# themselves; unknown labels fall back to 'other'.
+CATEGORY_LOOKUP: Dict[str, str] = {
+    **{category: category for category in VALID_CATEGORIES},
+    'food': 'food_and_dining_out',
+    'dining': 'food_and_dining_out',
+    'restaurant': 'food_and_dining_out',
+    'transport': 'transportation',
+    'travel': 'transportation',
+    'bills': 'utilities',
+    'shopping': 'other',
+    'retail': 'other',
+}
+
+# Candidate date formats. ISO first (what the extraction prompt asks for), then
+# day-first before month-first, as on Malaysian statements.
+DATE_FORMATS = [
+    '%Y-%m-%d',
+    '%d/%m/%Y',
+    '%d/%m/%y',
+    '%d-%m-%Y',
+    '%d-%m-%y',
+    '%d.%m.%Y',
+    '%Y/%m/%d',
+    '%d %b %Y',
+    '%d %B %Y',
+    '%d-%b-%Y',
+    '%d-%B-%Y',
+    '%d %b %y',
+    '%d-%b-%y',
+    '%b %d, %Y',
+    '%B %d, %Y',
+    '%m/%d/%Y',
+    '%m/%d/%y',
+]
+
+# Non-empty date cells sampled to infer a batch's date format
+DATE_SAMPLE_ROWS = 200
+
+# Output fields, in schema order
+TRANSACTION_FIELDS = [
+    'user_upload_id',
+    'transaction_date',
+    'transaction_year',
+    'transaction_month',
+    'transaction_day',
+    'description',
+    'merchant_name',
+    'amount',
+    'transaction_type',
+    'balance',
+    'reference_number',
+    'transaction_code',
+    'category',
+    'currency',
+    'is_subscription',
+]
+
+# Input fields read from extracted rows
+RAW_FIELDS = [
+    'transaction_date',
+    'description',
+    'merchant_name',
+    'amount',
+    'transaction_type',
+    'balance',
+    'reference_number',
+    'transaction_code',
+    'category',
+    'currency',
+    'is_subscription',
+]
+
+
+def _text(values: pd.Series) -> pd.Series:
+    """Stripped string form of a column, with missing cells as ''."""
+    return values.astype(object).where(values.notna(), '').astype(str).str.strip()
+
+
+def _optional_text(values: pd.Series) -> pd.Series:
+    """Stripped strings, with missing and blank cells as None."""
+    text = _text(values)
+    return text.astype(object).where(text != '', None)
+
+
+def infer_date_format(values: pd.Series) -> Optional[str]:
+    """Return the format in ``DATE_FORMATS`` that parses the most sampled cells.
+
+    Ties go to the earlier format, so ambiguous dates such as '01/02/2024' are read
+    day-first.
+
+    Args:
+        values: Date strings (blank cells are skipped)
+
+    Returns:
+        Optional[str]: The best format, or None when no format parses any sampled cell
+    """
+    sample = values[values != ''].head(DATE_SAMPLE_ROWS)
+    best_format, best_count = None, 0
+    for fmt in DATE_FORMATS:
+        count = int(pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum())
+        if count > best_count:
+            best_format, best_count = fmt, count
+            if count == len(sample):
+                break
+    return best_format
+
+
+def parse_date_column(values: pd.Series) -> pd.Series:
+    """Parse a column of date strings, inferring the format once for the column.
+
+    Cells the inferred format does not fit (e.g. a mixed-format batch) are retried
+    with the other formats, one vectorized pass each, and finally with pandas'
+    per-element (day-first) parser.
+
+    Returns:
+        pd.Series: datetime64 values, NaT where a cell is blank or unparseable
+    """
+    text = _text(values)
+    dates = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+    present = text != ''
+    if not present.any():
+        return dates
+
+    inferred = infer_date_format(text)
+    formats = [inferred] + [fmt for fmt in DATE_FORMATS if fmt != inferred] if inferred else DATE_FORMATS
+    for fmt in formats:
+        pending = present & dates.isna()
+        if not pending.any():
+            return dates
+        dates[pending] = pd.to_datetime(text[pending], format=fmt, errors='coerce')
+
+    pending = present & dates.isna()
+    if pending.any():
+        dates[pending] = pd.to_datetime(text[pending], format='mixed', dayfirst=True, errors='coerce')
+    return dates
+
+
+def normalize_transactions(
+    transactions: List[Dict[str, Any]],
+    user_upload_id: str | None = None,
+) -> List[Dict[str, Any]]:
+    """Normalise a batch of extracted transactions to the statement_banking_transaction schema.
+
+    Rows without a parseable date, a description or a positive amount are dropped.
+    Unknown transaction types default to 'debit', categories are mapped through
+    ``CATEGORY_LOOKUP``, and a missing currency defaults to 'MYR'.
+
+    Args:
+        transactions: Raw transaction dicts (LLM output or locally parsed rows)
+        user_upload_id: Upload the transactions belong to
+
+    Returns:
+        List[Dict[str, Any]]: Normalised transactions, in input order
+    """
+    if not transactions:
+        return []
+
+    frame = pd.DataFrame.from_records(transactions, columns=RAW_FIELDS)
+    dates = parse_date_column(frame['transaction_date'])
+    descriptions = _text(frame['description'])
+    amounts = pd.to_numeric(frame['amount'], errors='coerce').astype(float)
+
+    valid = dates.notna() & (descriptions != '') & (amounts > 0)
+    if not valid.any():
+        return []
+    frame, dates, descriptions, amounts = frame[valid], dates[valid], descriptions[valid], amounts[valid]
+
+    transaction_types = _text(frame['transaction_type']).str.lower()
+    balances = pd.to_numeric(frame['balance'], errors='coerce').astype(float).round(2)
+    category_labels = _text(frame['category']).str.lower()
+    categories = category_labels.map(CATEGORY_LOOKUP).fillna('other')
+    currencies = _text(frame['currency']).str.upper()
+
+    rows = pd.DataFrame({
+        'user_upload_id': user_upload_id or '',
+        'transaction_date': dates.dt.strftime('%Y-%m-%d'),
+        'transaction_year': dates.dt.year,
+        'transaction_month': dates.dt.month,
+        'transaction_day': dates.dt.day,
+        'description': descriptions,
+        'merchant_name': _optional_text(frame['merchant_name']),
+        'amount': amounts.round(2),
+        'transaction_type': transaction_types.where(transaction_types.isin(['debit', 'credit']), 'debit'),
+        'balance': balances.astype(object).where(balances.notna(), None),
+        'reference_number': _optional_text(frame['reference_number']),
+        'transaction_code': _optional_text(frame['transaction_code']),
+        'category': categories.astype(object).where(category_labels != '', None),
+        'currency': currencies.where(currencies != '', 'MYR'),
+        'is_subscription': frame['is_subscription'].astype(object).where(frame['is_subscription'].notna(), False).astype(bool),
+    })
+    # Zipping plain lists is several times faster than DataFrame.to_dict("records")
+    columns = [rows[field].tolist() for field in TRANSACTION_FIELDS]
+    return [dict(zip(TRANSACTION_FIELDS, values)) for values in zip(*columns)]
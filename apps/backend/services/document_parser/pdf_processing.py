@@ -0,0 +1,259 @@
+"""CPU-bound PDF work for statement extraction, run in a shared process pool.
+
+Parsing known layouts with pdfplumber, estimating page loads and splitting a statement
+into chunk PDFs with PyPDF2 are pure Python and hold the GIL for as long as they run,
+so doing them on the event loop (or in a thread) stalls every other request served by
+the process. ``prepare_pdf`` does all of it in one call that ``run_in_process_pool``
+sends to a worker process; only the parse result and the chunk bytes come back. The
+same pool runs ``spreadsheet_parser.parse_spreadsheet`` for CSV and XLSX exports.
+
+Worker processes are started with ``spawn`` (the API process runs threads, which do
+not survive ``fork`` safely) and receive a file path when the document is on disk, so
+large statements are not copied between processes.
+"""
+
+import asyncio
+import io
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple, TypedDict, TypeVar
+
+try:
+    from backend.config import settings
+    from backend.services.document_parser.statement_layouts import LayoutParseResult, parse_known_layout
+except ImportError:
+    import sys
+    from pathlib import Path
+    apps_dir = Path(__file__).parent.parent.parent.parent  # Go up to apps/
+    if str(apps_dir) not in sys.path:
+        sys.path.insert(0, str(apps_dir))
+    from backend.config import settings
+    from backend.services.document_parser.statement_layouts import LayoutParseResult, parse_known_layout
+
+T = TypeVar("T")
+
+# Per-request budgets for PDF chunks. Consecutive pages are packed into a chunk until
+# the estimated input tokens or transaction rows would exceed them; the row budget keeps
+# the JSON output well inside the model's output token limit.
+PDF_CHUNK_TOKEN_BUDGET = 12000
+PDF_CHUNK_ROW_BUDGET = 80
+PDF_CHUNK_MAX_PAGES = 10
+# Estimated tokens for the page image the API renders alongside each page's text
+PDF_PAGE_OVERHEAD_TOKENS = 800
+# Assumed load of a page without a text layer (e.g. a scan)
+PDF_SCANNED_PAGE_TOKENS = 1500
+PDF_SCANNED_PAGE_ROWS = 30
+# Estimated output tokens per extracted transaction (JSON object with 11 fields)
+ESTIMATED_OUTPUT_TOKENS_PER_ROW = 100
+
+# Lines starting with a day and month ('01/02', '01-02', '01 Feb'), used to count rows
+ROW_START_PATTERN = re.compile(r"^\s*\d{1,2}\s*[/\-. ]\s*(?:\d{1,2}|[A-Za-z]{3})\b", re.MULTILINE)
+
+
+class PdfChunkPlan(TypedDict):
+    """Pages sent to the LLM in one request and the request's estimated token cost."""
+    pages: List[int]
+    estimated_tokens: int
+
+
+class PreparedPdf(TypedDict):
+    """Output of ``prepare_pdf``.
+
+    Attributes:
+        layout_result: Locally parsed pages, or None for unknown layouts
+        chunk_plans: Chunks of the pages left for the LLM
+        chunks: PDF bytes of each planned chunk
+    """
+    layout_result: Optional[LayoutParseResult]
+    chunk_plans: List[PdfChunkPlan]
+    chunks: List[bytes]
+
+
+def _open_source(source: bytes | str) -> BinaryIO:
+    """Open PDF bytes or a file path as a binary stream."""
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+    return open(source, "rb")
+
+
+def estimate_page_load(page: Any) -> Tuple[int, int]:
+    """Estimate (input tokens, transaction rows) of a PDF page from its text layer."""
+    try:
+        text = page.extract_text() or ""
+    except Exception:
+        text = ""
+    if not text.strip():
+        return PDF_PAGE_OVERHEAD_TOKENS + PDF_SCANNED_PAGE_TOKENS, PDF_SCANNED_PAGE_ROWS
+    # ~4 characters per token for statement text
+    return PDF_PAGE_OVERHEAD_TOKENS + len(text) // 4, len(ROW_START_PATTERN.findall(text))
+
+
+def plan_pdf_chunks(pdf_reader: Any, pages: List[int]) -> List[PdfChunkPlan]:
+    """Group pages into chunks that fit the per-request token and row budgets.
+
+    Consecutive pages are packed greedily. Each chunk also carries the page after it
+    (when the budget allows) as overlap, so a transaction split across the page break
+    is seen whole by at least one chunk; the extractor's ``_reconcile_chunk_boundary``
+    removes the duplicates this creates. A single page over budget still gets its own
+    chunk.
+
+    Returns:
+        List[PdfChunkPlan]: Page indexes per chunk (including the trailing overlap page)
+            and the estimated input plus output tokens of its request
+    """
+    page_count = len(pdf_reader.pages)
+    estimates: Dict[int, Tuple[int, int]] = {}
+
+    def load(page_num: int) -> Tuple[int, int]:
+        if page_num not in estimates:
+            estimates[page_num] = estimate_page_load(pdf_reader.pages[page_num])
+        return estimates[page_num]
+
+    def with_overlap(core: List[int]) -> List[int]:
+        overlap = core[-1] + 1
+        return core + [overlap] if overlap < page_count else core
+
+    def fits(chunk: List[int]) -> bool:
+        tokens = sum(load(page_num)[0] for page_num in chunk)
+        rows = sum(load(page_num)[1] for page_num in chunk)
+        return (
+            tokens <= PDF_CHUNK_TOKEN_BUDGET
+            and rows <= PDF_CHUNK_ROW_BUDGET
+            and len(chunk) <= PDF_CHUNK_MAX_PAGES
+        )
+
+    chunks: List[PdfChunkPlan] = []
+    i = 0
+    while i < len(pages):
+        core = [pages[i]]
+        i += 1
+        while i < len(pages) and pages[i] == core[-1] + 1 and fits(with_overlap(core + [pages[i]])):
+            core.append(pages[i])
+            i += 1
+        chunk = with_overlap(core)
+        if not fits(chunk):
+            chunk = core
+        chunks.append({
+            "pages": chunk,
+            "estimated_tokens": sum(
+                load(page_num)[0] + load(page_num)[1] * ESTIMATED_OUTPUT_TOKENS_PER_ROW
+                for page_num in chunk
+            ),
+        })
+    return chunks
+
+
+def prepare_pdf(source: bytes | str) -> PreparedPdf:
+    """Parse known layouts locally and split the remaining pages into chunk PDFs.
+
+    Known bank layouts are parsed locally; only pages that failed validation (or every
+    page, for unknown layouts) are planned into chunks for the LLM.
+
+    Args:
+        source: PDF bytes or the path of the PDF on disk
+
+    Returns:
+        PreparedPdf: The local parse result, the chunk plans and each chunk's PDF bytes
+    """
+    with _open_source(source) as document:
+        layout_result = parse_known_layout(document)
+
+        chunk_plans: List[PdfChunkPlan] = []
+        chunks: List[bytes] = []
+        if layout_result is None or layout_result["fallback_pages"]:
+            import PyPDF2
+            document.seek(0)
+            pdf_reader = PyPDF2.PdfReader(document)
+            if layout_result is None:
+                llm_pages = list(range(len(pdf_reader.pages)))
+            else:
+                llm_pages = layout_result["fallback_pages"]
+            chunk_plans = plan_pdf_chunks(pdf_reader, llm_pages)
+
+            for plan in chunk_plans:
+                pdf_writer = PyPDF2.PdfWriter()
+                for page_num in plan["pages"]:
+                    pdf_writer.add_page(pdf_reader.pages[page_num])
+                chunk_buffer = io.BytesIO()
+                pdf_writer.write(chunk_buffer)
+                chunks.append(chunk_buffer.getvalue())
+                chunk_buffer.close()
+
+    return {"layout_result": layout_result, "chunk_plans": chunk_plans, "chunks": chunks}
+
+
+def extract_pdf_text(source: bytes | str) -> str:
+    """Extract the text and tables of every page of a PDF.
+
+    Uses pdfplumber (better for tables) and falls back to PyPDF2 when it is not
+    installed.
+
+    Args:
+        source: PDF bytes or the path of the PDF on disk
+
+    Returns:
+        str: Page texts and pipe-separated table rows, separated by blank lines
+    """
+    text_parts = []
+    try:
+        import pdfplumber
+        with _open_source(source) as pdf_file, pdfplumber.open(pdf_file) as pdf:
+            for page in pdf.pages:
+                # Extract text
+                text = page.extract_text()
+                if text:
+                    text_parts.append(text)
+
+                # Try to extract tables
+                for table in page.extract_tables():
+                    if table:
+                        # Convert table to text representation
+                        table_text = '\n'.join([' | '.join(str(cell) if cell else '' for cell in row) for row in table])
+                        text_parts.append(table_text)
+        return '\n\n'.join(text_parts)
+    except ImportError:
+        pass
+
+    # Fallback to PyPDF2 if pdfplumber not available
+    try:
+        import PyPDF2
+    except ImportError:
+        raise ImportError(
+            "PDF extraction requires either 'pdfplumber' or 'PyPDF2'. "
+            "Install with: pip install pdfplumber or pip install PyPDF2"
+        )
+    with _open_source(source) as pdf_file:
+        for page in PyPDF2.PdfReader(pdf_file).pages:
+            text = page.extract_text()
+            if text:
+                text_parts.append(text)
+    return '\n\n'.join(text_parts)
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the process pool for document parsing, starting it on first use."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=settings.EXTRACTION_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _process_pool
+
+
+async def run_in_process_pool(func: Callable[..., T], *args: Any) -> T:
+    """Run a module-level function in the process pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), func, *args)
+
+
+def shutdown_process_pool() -> None:
+    """Stop the PDF process pool's workers, if it was started."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
@@ -0,0 +1,386 @@
+"""Structured parsing of CSV and XLSX bank statement exports.
+
+Bank exports are tables: a few preamble lines (account number, period), a header row,
+then one transaction per row. The header row is found by mapping its labels to column
+roles (date, description, debit and credit or a signed amount, balance, ...), and the
+rows below it are parsed column by column with pandas, so an export of tens of
+thousands of rows is read in seconds without an LLM call. Documents whose header
+cannot be mapped, or whose amounts carry no direction, return None and go to the LLM
+like any other document.
+
+XLSX workbooks are streamed with openpyxl's ``read_only`` mode and only the mapped
+columns of each row are kept. Legacy ``.xls`` workbooks are not parsed here.
+"""
+
+import csv
+import io
+from datetime import date, datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple, TypedDict
+
+import pandas as pd
+
+try:
+    from backend.services.document_parser.normalization import parse_date_column
+    from backend.services.document_parser.statement_layouts import CATEGORY_KEYWORDS
+except ImportError:
+    import sys
+    from pathlib import Path
+    apps_dir = Path(__file__).parent.parent.parent.parent  # Go up to apps/
+    if str(apps_dir) not in sys.path:
+        sys.path.insert(0, str(apps_dir))
+    from backend.services.document_parser.normalization import parse_date_column
+    from backend.services.document_parser.statement_layouts import CATEGORY_KEYWORDS
+
+
+class SpreadsheetParseResult(TypedDict):
+    """Output of ``parse_spreadsheet``.
+
+    Attributes:
+        sheet: Worksheet the transactions were read from (None for CSV)
+        header_row: 0-based row index of the header
+        columns: Header label mapped to each column role
+        transactions: Raw transaction dicts, in file order
+    """
+    sheet: Optional[str]
+    header_row: int
+    columns: Dict[str, str]
+    transactions: List[Dict[str, Any]]
+
+
+# Header labels (normalised, see ``_normalize_label``) per column role, most specific
+# first. Roles are matched in this order, so 'debit amount' is a debit column rather
+# than a signed amount column.
+COLUMN_ROLES: Dict[str, List[str]] = {
+    "date": ["transaction date", "trans date", "txn date", "posting date", "post date", "date", "value date", "tarikh"],
+    "description": [
+        "transaction description", "description", "transaction details", "details",
+        "particulars", "narration", "narrative", "remarks", "keterangan", "butiran",
+    ],
+    "debit": ["debit amount", "debit", "withdrawal amount", "withdrawal", "withdrawals", "money out", "paid out", "dr"],
+    "credit": ["credit amount", "credit", "deposit amount", "deposit", "deposits", "money in", "paid in", "cr"],
+    "amount": ["transaction amount", "amount", "amaun"],
+    "balance": ["running balance", "balance", "baki"],
+    "reference": ["reference number", "reference no", "reference", "ref no", "ref", "cheque no"],
+    "type": ["dr/cr", "debit/credit", "transaction type", "type"],
+    "currency": ["currency", "ccy"],
+}
+
+# Rows searched for the header, from the top of the file or sheet
+HEADER_SCAN_ROWS = 30
+# Bytes of a CSV read to detect its encoding, delimiter and header
+CSV_SAMPLE_BYTES = 64 * 1024
+
+XLSX_MAGIC = b"PK\x03\x04"
+XLS_MAGIC = b"\xd0\xcf\x11\xe0"
+
+
+def _normalize_label(value: Any) -> str:
+    """Lowercase a header cell and drop units and punctuation ('Debit (RM)' -> 'debit')."""
+    text = str(value or "").lower()
+    text = "".join(ch if ch.isalnum() or ch == "/" else " " for ch in text.split("(")[0])
+    return " ".join(text.split())
+
+
+def map_columns(labels: List[Any]) -> Optional[Dict[str, int]]:
+    """Map header labels to column roles.
+
+    Exact label matches are tried before labels that merely contain an alias
+    ('transaction date (posted)'), and each column takes at most one role.
+
+    Returns:
+        Optional[Dict[str, int]]: Column index per role, or None when the labels lack a
+            date, a description or any amount column
+    """
+    normalized = [_normalize_label(label) for label in labels]
+    roles: Dict[str, int] = {}
+    for exact in (True, False):
+        for role, aliases in COLUMN_ROLES.items():
+            if role in roles:
+                continue
+            for alias in aliases:
+                index = next(
+                    (
+                        i for i, label in enumerate(normalized)
+                        if label and i not in roles.values()
+                        and (label == alias if exact else f" {alias} " in f" {label} ")
+                    ),
+                    None,
+                )
+                if index is not None:
+                    roles[role] = index
+                    break
+
+    if "date" not in roles or "description" not in roles:
+        return None
+    if not {"amount", "debit", "credit"} & roles.keys():
+        return None
+    return roles
+
+
+def _find_header(rows: Iterator[Sequence[Any]]) -> Optional[Tuple[int, Dict[str, int], Sequence[Any]]]:
+    """Find the header among the first ``HEADER_SCAN_ROWS`` rows.
+
+    ``rows`` is consumed up to and including the header, so iterating it further
+    yields the data rows.
+
+    Returns:
+        Optional[Tuple[int, Dict[str, int], Sequence[Any]]]: The header's row index,
+            column roles and labels, or None when no row maps as a header
+    """
+    for index, row in enumerate(rows):
+        if index >= HEADER_SCAN_ROWS:
+            break
+        roles = map_columns(list(row))
+        if roles is not None:
+            return index, roles, row
+    return None
+
+
+def _parse_amounts(values: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """Parse amount cells such as '1,234.56', '-12.00', '(12.00)', '12.00 DR' column-wise.
+
+    Returns:
+        Tuple[pd.Series, pd.Series]: Absolute amounts (NaN when unparseable) and signs
+            (-1 debit, +1 credit, 0 unsigned)
+    """
+    text = values.fillna("").astype(str).str.strip().str.replace(",", "", regex=False)
+    # Plain numbers ('1234.56', '-12.00') parse directly; only the rest need the markers
+    numbers = pd.to_numeric(text, errors="coerce")
+    amounts = numbers.abs()
+    signs = pd.Series(0, index=values.index).mask(numbers < 0, -1).mask(text.str.startswith("+"), 1)
+
+    marked = numbers.isna() & (text != "")
+    if marked.any():
+        marked_text = text[marked].str.upper()
+        negative = (
+            marked_text.str.endswith("-") | marked_text.str.endswith("DR")
+            | (marked_text.str.startswith("(") & marked_text.str.endswith(")"))
+        )
+        positive = ~negative & (marked_text.str.endswith("+") | marked_text.str.endswith("CR"))
+        amounts[marked] = pd.to_numeric(marked_text.str.replace(r"[^0-9.]", "", regex=True), errors="coerce")
+        signs[marked] = pd.Series(0, index=marked_text.index).mask(negative, -1).mask(positive, 1)
+    return amounts, signs
+
+
+def _categorize(descriptions: pd.Series) -> pd.Series:
+    """Apply the ``statement_layouts`` keyword rules to a column of descriptions.
+
+    Each distinct description is matched once, and each rule only against the
+    descriptions no earlier rule claimed.
+    """
+    unassigned = pd.Series(pd.unique(descriptions.to_numpy()))
+    category_by_description: Dict[str, str] = {}
+    for category, pattern in CATEGORY_KEYWORDS:
+        if unassigned.empty:
+            break
+        matched = unassigned.str.contains(pattern, case=False, regex=True)
+        category_by_description.update(dict.fromkeys(unassigned[matched], category))
+        unassigned = unassigned[~matched]
+    return descriptions.map(category_by_description).fillna("other")
+
+
+def _optional(values: pd.Series) -> pd.Series:
+    """Replace NaN and empty strings with None, for nullable output fields."""
+    values = values.astype(object)
+    return values.where(values.notna() & (values != ""), None)
+
+
+def parse_table(frame: pd.DataFrame, roles: Dict[str, int]) -> Optional[List[Dict[str, Any]]]:
+    """Turn the rows below a header into raw transaction dicts.
+
+    Args:
+        frame: One column per mapped column index (string cells), in file order
+        roles: Column index per role, from ``map_columns``
+
+    Returns:
+        Optional[List[Dict[str, Any]]]: Transactions of the rows with a date, a
+            description and a non-zero amount (opening balances and totals are
+            skipped), or None when the direction of the amounts cannot be told (a
+            single amount column with no type column and either no sign markers or
+            both positive and negative ones next to unsigned amounts)
+    """
+    def column(role: str) -> Optional[pd.Series]:
+        return frame[roles[role]] if role in roles else None
+
+    descriptions = column("description").fillna("").astype(str).str.strip().str.replace(r"\s+", " ", regex=True)
+    dates = parse_date_column(column("date"))
+
+    if "debit" in roles or "credit" in roles:
+        debits = _parse_amounts(column("debit"))[0].fillna(0) if "debit" in roles else 0.0
+        credits = _parse_amounts(column("credit"))[0].fillna(0) if "credit" in roles else 0.0
+        is_debit = pd.Series(debits > 0, index=frame.index)
+        amounts = pd.Series(debits, index=frame.index).where(is_debit, credits)
+    else:
+        amounts, signs = _parse_amounts(column("amount"))
+        if "type" in roles:
+            types = column("type").fillna("").astype(str).str.strip().str.lower()
+            is_debit = types.str.startswith("d") | ((signs < 0) & ~types.str.startswith("c"))
+        else:
+            # Without a type column the markers that appear give the convention: card
+            # exports mark only credits ('50.00CR'), so unsigned amounts are debits;
+            # account exports mark only debits ('-12.00'), so unsigned amounts are credits
+            has_negative = bool((signs < 0).any())
+            has_positive = bool((signs > 0).any())
+            has_unsigned = bool(((signs == 0) & (amounts > 0)).any())
+            if has_positive and not has_negative:
+                is_debit = signs <= 0
+            elif has_negative and (not has_positive or not has_unsigned):
+                is_debit = signs < 0
+            else:
+                # Unsigned amounts under both conventions, or no markers at all: leave
+                # the direction to the LLM
+                return None
+
+    valid = dates.notna() & (descriptions != "") & amounts.notna() & (amounts > 0)
+    if not valid.any():
+        return []
+
+    balances = None
+    if "balance" in roles:
+        balance_amounts, balance_signs = _parse_amounts(column("balance"))
+        balances = balance_amounts.where(balance_signs >= 0, -balance_amounts).round(2)
+
+    rows = pd.DataFrame({
+        "transaction_date": dates[valid].dt.strftime("%Y-%m-%d"),
+        "description": descriptions[valid],
+        "merchant_name": None,
+        "amount": amounts[valid].round(2),
+        "transaction_type": is_debit[valid].map({True: "debit", False: "credit"}),
+        "balance": _optional(balances[valid]) if balances is not None else None,
+        "reference_number": _optional(column("reference")[valid].astype(str).str.strip()) if "reference" in roles else None,
+        "transaction_code": None,
+        "category": _categorize(descriptions[valid]),
+        "currency": _optional(column("currency")[valid].astype(str).str.strip().str.upper()) if "currency" in roles else "MYR",
+        "is_subscription": False,
+    })
+    rows["currency"] = rows["currency"].fillna("MYR")
+    # Zipping plain lists is several times faster than DataFrame.to_dict("records")
+    names = list(rows.columns)
+    return [dict(zip(names, values)) for values in zip(*(rows[name].tolist() for name in names))]
+
+
+def _cell_text(value: Any) -> str:
+    """String form of an openpyxl cell value, with dates as ISO dates."""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def _parse_xlsx(document: BinaryIO) -> Optional[SpreadsheetParseResult]:
+    """Parse the first worksheet with a recognisable header, streaming its rows."""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(document, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            header = _find_header(rows)
+            if header is None:
+                continue
+
+            header_row, roles, labels = header
+            positions = sorted(set(roles.values()))
+            # Only the mapped columns of each remaining row are kept
+            cells: Dict[int, List[str]] = {position: [] for position in positions}
+            for row in rows:
+                for position in positions:
+                    cells[position].append(_cell_text(row[position]) if position < len(row) else "")
+
+            transactions = parse_table(pd.DataFrame(cells), roles)
+            if transactions is None:
+                return None
+            if transactions:
+                return {
+                    "sheet": sheet.title,
+                    "header_row": header_row,
+                    "columns": {role: str(labels[index]) for role, index in roles.items()},
+                    "transactions": transactions,
+                }
+    finally:
+        workbook.close()
+    return None
+
+
+def _parse_csv(document: BinaryIO) -> Optional[SpreadsheetParseResult]:
+    """Parse a delimited text export, detecting its encoding, delimiter and header."""
+    sample_bytes = document.read(CSV_SAMPLE_BYTES)
+    # latin-1 decodes any bytes, so it always ends the search
+    for encoding in ("utf-8-sig", "cp1252", "latin-1"):
+        try:
+            sample = sample_bytes.decode(encoding)
+            break
+        except UnicodeDecodeError:
+            continue
+    if len(sample_bytes) == CSV_SAMPLE_BYTES:
+        # Drop the line cut off by the sample boundary
+        sample = sample.rsplit("\n", 1)[0]
+
+    try:
+        delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+    except csv.Error:
+        delimiter = ","
+
+    header = _find_header(csv.reader(io.StringIO(sample), delimiter=delimiter))
+    if header is None:
+        return None
+    header_row, roles, labels = header
+
+    document.seek(0)
+    frame = pd.read_csv(
+        document,
+        sep=delimiter,
+        header=None,
+        skiprows=header_row + 1,
+        usecols=sorted(set(roles.values())),
+        dtype=str,
+        keep_default_na=False,
+        encoding=encoding,
+        skipinitialspace=True,
+        on_bad_lines="skip",
+    )
+    transactions = parse_table(frame, roles)
+    if not transactions:
+        return None
+    return {
+        "sheet": None,
+        "header_row": header_row,
+        "columns": {role: labels[index] for role, index in roles.items()},
+        "transactions": transactions,
+    }
+
+
+def parse_spreadsheet(source: bytes | str) -> Optional[SpreadsheetParseResult]:
+    """Parse a CSV or XLSX statement export locally.
+
+    The format is told from the file's first bytes, since browsers report CSV files
+    under several MIME types (including Excel's).
+
+    Args:
+        source: File bytes or the path of the file on disk
+
+    Returns:
+        Optional[SpreadsheetParseResult]: The parsed transactions, or None when the
+            file is a legacy .xls workbook, openpyxl is unavailable, no header could be
+            mapped or no row could be parsed
+    """
+    document = io.BytesIO(source) if isinstance(source, bytes) else open(source, "rb")
+    try:
+        magic = document.read(4)
+        document.seek(0)
+        if magic == XLS_MAGIC:
+            return None
+        if magic == XLSX_MAGIC:
+            try:
+                return _parse_xlsx(document)
+            except ImportError:
+                return None
+        return _parse_csv(document)
+    except Exception as e:
+        print(f"Error parsing spreadsheet statement: {str(e)}")
+        return None
+    finally:
+        document.close()
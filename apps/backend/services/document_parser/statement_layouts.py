@@ -0,0 +1,474 @@
+"""Deterministic parsing of machine-generated statements from known Malaysian banks.
+
+Statements from the banks in ``KNOWN_LAYOUTS`` print transactions as fixed-column
+text tables. Those rows are read locally with pdfplumber, using the x positions of the
+header labels as column boundaries, so the common case needs no LLM call. Pages with
+rows that fail validation (unparseable cells, broken running balance) are reported
+back so only those pages are sent to the LLM.
+"""
+
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, TypedDict
+
+
+class StatementLayout(TypedDict):
+    """Column layout of a known bank statement.
+
+    Attributes:
+        name: Layout identifier
+        identifiers: Regexes (case-insensitive), any of which identifies the bank on
+            the first page
+        columns: Lowercase header labels per column role. Roles are 'date',
+            'description', 'reference', 'balance' and either 'amount' (one signed
+            column) or 'debit' and 'credit'
+        date_formats: strptime formats of the date column
+        year_pattern: Regex with a ``year`` (and optional ``month``) group locating the
+            statement date, for date formats without a year
+    """
+    name: str
+    identifiers: List[str]
+    columns: Dict[str, List[str]]
+    date_formats: List[str]
+    year_pattern: Optional[str]
+
+
+class LayoutParseResult(TypedDict):
+    """Output of ``parse_known_layout``.
+
+    Attributes:
+        layout: Name of the detected layout
+        page_count: Number of pages in the document
+        pages: Raw transaction dicts per page index, for pages that parsed cleanly
+        fallback_pages: Page indexes that need LLM extraction
+    """
+    layout: str
+    page_count: int
+    pages: Dict[int, List[Dict[str, Any]]]
+    fallback_pages: List[int]
+
+
+KNOWN_LAYOUTS: List[StatementLayout] = [
+    {
+        "name": "maybank",
+        "identifiers": [r"malayan\s+banking\s+berhad", r"\bmaybank\b"],
+        "columns": {
+            "date": ["entry date", "date"],
+            "description": ["transaction description", "description"],
+            "amount": ["transaction amount", "amount"],
+            "balance": ["statement balance", "balance"],
+        },
+        "date_formats": ["%d/%m/%y", "%d/%m/%Y"],
+        "year_pattern": None,
+    },
+    {
+        "name": "cimb",
+        "identifiers": [r"cimb\s+(?:islamic\s+)?bank\s+berhad"],
+        "columns": {
+            "date": ["date"],
+            "description": ["description"],
+            "reference": ["cheque / ref no", "cheque/ref no", "ref no"],
+            "debit": ["withdrawal", "withdrawals"],
+            "credit": ["deposits", "deposit"],
+            "balance": ["balance"],
+        },
+        "date_formats": ["%d/%m/%Y", "%d/%m/%y"],
+        "year_pattern": None,
+    },
+    {
+        "name": "public_bank",
+        "identifiers": [r"public\s+(?:islamic\s+)?bank\s+berhad"],
+        "columns": {
+            "date": ["date"],
+            "description": ["transaction", "description"],
+            "debit": ["debit"],
+            "credit": ["credit"],
+            "balance": ["balance"],
+        },
+        "date_formats": ["%d/%m"],
+        "year_pattern": r"statement\s+date\s*:?\s*\d{1,2}\s*[/-]\s*(?P<month>\d{1,2})\s*[/-]\s*(?P<year>\d{4})",
+    },
+    {
+        "name": "rhb",
+        "identifiers": [r"rhb\s+(?:islamic\s+)?bank\s+berhad"],
+        "columns": {
+            "date": ["date"],
+            "description": ["description"],
+            "reference": ["cheque/serial no", "serial no"],
+            "debit": ["debit"],
+            "credit": ["credit"],
+            "balance": ["balance"],
+        },
+        "date_formats": ["%d-%m-%Y", "%d/%m/%Y", "%d %b %y", "%d %b %Y"],
+        "year_pattern": None,
+    },
+    {
+        "name": "hong_leong",
+        "identifiers": [r"hong\s+leong\s+(?:islamic\s+)?bank\s+berhad"],
+        "columns": {
+            "date": ["date"],
+            "description": ["transaction details", "description"],
+            "debit": ["withdrawal"],
+            "credit": ["deposit"],
+            "balance": ["balance"],
+        },
+        "date_formats": ["%d-%m-%Y", "%d/%m/%Y"],
+        "year_pattern": None,
+    },
+]
+
+# Column roles printed as right-aligned numbers
+NUMERIC_ROLES = {"amount", "debit", "credit", "balance"}
+
+# Keyword rules mirroring the category mapping in the extraction prompt; first match wins
+CATEGORY_KEYWORDS: List[Tuple[str, str]] = [
+    ("income", r"salary|gaji|payroll|dividend|hibah|profit paid|interest credit"),
+    ("cash_transfer", r"transfer|\btrf\b|duitnow|\bibg\b|\bifund\b|\bfpx\b|a/c"),
+    ("housing", r"rent|sewa|mortgage|housing loan|maintenance fee"),
+    ("transportation", r"petrol|petronas|shell|caltex|\bbhp\b|grab|gojek|touch ?n ?go|\btng\b|parking|toll|mrt|lrt|rapid"),
+    ("food_and_dining_out", r"restaurant|restoran|cafe|kopitiam|mamak|foodpanda|grabfood|mcdonald|kfc|starbucks|makan"),
+    ("entertainment", r"cinema|\bgsc\b|\btgv\b|netflix|spotify|steam|playstation|disney"),
+    ("healthcare", r"clinic|klinik|hospital|pharmacy|farmasi|dental|guardian|watsons"),
+    ("education", r"school|sekolah|tuition|university|universiti|college|kolej|\bspm\b|\bstpm\b|course"),
+    ("utilities", r"\btnb\b|tenaga|syabas|air selangor|indah water|unifi|maxis|celcom|digi|\bu mobile\b|astro|time ?dotcom"),
+    ("investments_and_savings", r"\basb\b|amanah saham|unit trust|\bkwsp\b|\bepf\b|tabung haji|invest|stashaway|wahed"),
+    ("technology_and_electronics", r"apple|samsung|google|microsoft|harvey norman|senheng|courts"),
+    ("groceries", r"tesco|lotus|giant|aeon|jaya grocer|mydin|econsave|village grocer|99 speedmart|family ?mart|7-eleven|pasar"),
+    ("sport_and_activity", r"\bgym\b|fitness|anytime fitness|celebrity fitness|decathlon|sport"),
+]
+
+OPENING_BALANCE_PATTERN = re.compile(
+    r"(?:opening|beginning|brought forward|balance b/?f|baki (?:awal|dibawa))", re.IGNORECASE
+)
+AMOUNT_PATTERN = re.compile(r"^\(?[\d,]*\d\.\d{2}\)?(?:[+-]|DR|CR)?$", re.IGNORECASE)
+SIGN_TOKENS = {"+", "-", "DR", "CR"}
+
+# Words whose tops are within this many points belong to the same printed line
+LINE_TOLERANCE = 3.0
+# Largest vertical gap (points) for a line to continue the previous row's description
+CONTINUATION_GAP = 14.0
+# Running balances may differ by rounding of at most this much
+BALANCE_TOLERANCE = Decimal("0.01")
+
+
+def detect_layout(first_page_text: str) -> Optional[StatementLayout]:
+    """Return the known layout whose identifiers match the first page, if any."""
+    for layout in KNOWN_LAYOUTS:
+        if any(re.search(pattern, first_page_text, re.IGNORECASE) for pattern in layout["identifiers"]):
+            return layout
+    return None
+
+
+def categorize_description(description: str) -> str:
+    """Map a transaction description to a category with the keyword rules."""
+    for category, pattern in CATEGORY_KEYWORDS:
+        if re.search(pattern, description, re.IGNORECASE):
+            return category
+    return "other"
+
+
+def _parse_amount(text: Optional[str]) -> Optional[Tuple[Decimal, Optional[int]]]:
+    """Parse '1,234.56', '1,234.56-', '(1,234.56)' or '1,234.56 DR'.
+
+    Returns:
+        Optional[Tuple[Decimal, Optional[int]]]: The absolute amount and its sign
+            (-1 debit, +1 credit, None unsigned), or None when the text is not an amount
+    """
+    if not text:
+        return None
+    compact = text.replace(" ", "").upper()
+    if not AMOUNT_PATTERN.match(compact):
+        return None
+
+    sign = None
+    if compact.endswith(("-", "DR")) or compact.startswith("("):
+        sign = -1
+    elif compact.endswith(("+", "CR")):
+        sign = 1
+    digits = re.sub(r"[^\d.]", "", compact)
+    try:
+        return Decimal(digits), sign
+    except InvalidOperation:
+        return None
+
+
+def _group_lines(words: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Group pdfplumber words into printed lines, left to right."""
+    lines: List[List[Dict[str, Any]]] = []
+    for word in sorted(words, key=lambda w: (w["top"], w["x0"])):
+        if lines and word["top"] - lines[-1][0]["top"] <= LINE_TOLERANCE:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    return [sorted(line, key=lambda w: w["x0"]) for line in lines]
+
+
+def _find_header(line: List[Dict[str, Any]], layout: StatementLayout) -> Optional[Dict[str, Tuple[float, float]]]:
+    """Locate each column's header label in a line.
+
+    Returns:
+        Optional[Dict[str, Tuple[float, float]]]: (x0, x1) span per role, or None when
+            the line is not the layout's header
+    """
+    texts = [w["text"].lower() for w in line]
+    used = set()
+    spans: Dict[str, Tuple[float, float]] = {}
+
+    # Longest labels first, so 'entry date' claims its words before 'date' does
+    labels = sorted(
+        ((role, label.split()) for role, aliases in layout["columns"].items() for label in aliases),
+        key=lambda item: len(item[1]),
+        reverse=True,
+    )
+    for role, tokens in labels:
+        if role in spans:
+            continue
+        for start in range(len(line) - len(tokens) + 1):
+            positions = range(start, start + len(tokens))
+            if any(p in used for p in positions):
+                continue
+            if texts[start:start + len(tokens)] == tokens:
+                used.update(positions)
+                spans[role] = (line[start]["x0"], line[start + len(tokens) - 1]["x1"])
+                break
+
+    has_amounts = "amount" in spans or ("debit" in spans and "credit" in spans)
+    if not ({"date", "description", "balance"} <= spans.keys() and has_amounts):
+        return None
+    return spans
+
+
+def _split_cells(line: List[Dict[str, Any]], spans: Dict[str, Tuple[float, float]]) -> Dict[str, str]:
+    """Assign a line's words to columns.
+
+    Text columns are left-aligned, so a text word belongs to the right-most text
+    column starting at or before it. Amounts are right-aligned, so an amount belongs to
+    the numeric column whose label ends closest to it.
+    """
+    text_columns = sorted(
+        ((x0, role) for role, (x0, _) in spans.items() if role not in NUMERIC_ROLES)
+    )
+    numeric_columns = [(x1, role) for role, (_, x1) in spans.items() if role in NUMERIC_ROLES]
+    cells: Dict[str, List[str]] = {}
+    previous_role = None
+
+    for word in line:
+        text = word["text"]
+        if text.upper() in SIGN_TOKENS and previous_role in NUMERIC_ROLES:
+            role = previous_role
+        elif AMOUNT_PATTERN.match(text.replace(" ", "")) and numeric_columns:
+            role = min(numeric_columns, key=lambda column: abs(column[0] - word["x1"]))[1]
+        else:
+            role = text_columns[0][1]
+            for x0, candidate in text_columns:
+                if x0 <= word["x0"] + LINE_TOLERANCE:
+                    role = candidate
+        cells.setdefault(role, []).append(text)
+        previous_role = role
+
+    return {role: " ".join(parts) for role, parts in cells.items()}
+
+
+class _LayoutParser:
+    """Stateful row reader for one document of a known layout."""
+
+    def __init__(self, layout: StatementLayout, first_page_text: str):
+        self.layout = layout
+        self.statement_year: Optional[int] = None
+        self.statement_month: Optional[int] = None
+        if layout["year_pattern"]:
+            match = re.search(layout["year_pattern"], first_page_text, re.IGNORECASE)
+            if match:
+                self.statement_year = int(match.group("year"))
+                month = match.groupdict().get("month")
+                self.statement_month = int(month) if month else None
+        self.spans: Optional[Dict[str, Tuple[float, float]]] = None
+        self.previous_balance: Optional[Decimal] = None
+
+    @property
+    def needs_year(self) -> bool:
+        return not any("%y" in fmt.lower() for fmt in self.layout["date_formats"])
+
+    def parse_date(self, text: Optional[str]) -> Optional[datetime]:
+        if not text:
+            return None
+        for fmt in self.layout["date_formats"]:
+            try:
+                if "%y" in fmt.lower():
+                    return datetime.strptime(text, fmt)
+                if self.statement_year is None:
+                    return None
+                parsed = datetime.strptime(f"{text} {self.statement_year}", f"{fmt} %Y")
+            except ValueError:
+                continue
+            # A December row on a January statement belongs to the previous year
+            if self.statement_month is not None and parsed.month > self.statement_month:
+                parsed = parsed.replace(year=parsed.year - 1)
+            return parsed
+        return None
+
+    def parse_page(self, words: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], bool]:
+        """Read one page's rows.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], bool]: Raw transaction dicts, and whether every
+                row on the page validated
+        """
+        rows: List[Dict[str, Any]] = []
+        valid = True
+        current: Optional[Dict[str, Any]] = None
+        last_top = 0.0
+
+        def finish() -> None:
+            nonlocal valid
+            if current is None:
+                return
+            transaction = self._validate(current)
+            if transaction is None:
+                valid = False
+            else:
+                rows.append(transaction)
+
+        for line in _group_lines(words):
+            header = _find_header(line, self.layout)
+            if header is not None:
+                finish()
+                current = None
+                self.spans = header
+                continue
+            if self.spans is None:
+                continue
+
+            cells = _split_cells(line, self.spans)
+            tx_date = self.parse_date(cells.get("date"))
+            top = line[0]["top"]
+            if tx_date is not None:
+                finish()
+                current = {**cells, "transaction_date": tx_date}
+            elif (
+                current is not None
+                and cells.keys() <= {"description", "reference"}
+                and top - last_top <= CONTINUATION_GAP
+            ):
+                # Wrapped description (or reference) line of the current row
+                for role, text in cells.items():
+                    current[role] = f"{current.get(role, '')} {text}".strip()
+            else:
+                finish()
+                current = None
+                balance = _parse_amount(cells.get("balance"))
+                if balance is not None and OPENING_BALANCE_PATTERN.search(cells.get("description", "")):
+                    self.previous_balance = balance[0] * (balance[1] or 1)
+            last_top = top
+
+        finish()
+        return rows, valid
+
+    def _validate(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Turn a row's cells into a raw transaction dict, or None if it fails validation."""
+        description = (row.get("description") or "").strip()
+        if not description:
+            return None
+
+        balance_parsed = _parse_amount(row.get("balance"))
+        balance = balance_parsed[0] * (balance_parsed[1] or 1) if balance_parsed else None
+
+        if "amount" in row:
+            parsed = _parse_amount(row["amount"])
+            if parsed is None:
+                return None
+            amount, sign = parsed
+            if sign is None and balance is not None and self.previous_balance is not None:
+                sign = 1 if balance >= self.previous_balance else -1
+            if sign is None:
+                return None
+            transaction_type = "credit" if sign > 0 else "debit"
+        else:
+            debit = _parse_amount(row.get("debit"))
+            credit = _parse_amount(row.get("credit"))
+            if (debit is None) == (credit is None):
+                return None
+            amount = (debit or credit)[0]
+            transaction_type = "debit" if debit is not None else "credit"
+
+        if amount <= 0:
+            return None
+
+        previous_balance = self.previous_balance
+        if balance is not None:
+            self.previous_balance = balance
+            if previous_balance is not None:
+                expected = previous_balance + amount if transaction_type == "credit" else previous_balance - amount
+                if abs(expected - balance) > BALANCE_TOLERANCE:
+                    return None
+
+        description = re.sub(r"\s+", " ", description)
+        return {
+            "transaction_date": row["transaction_date"].strftime("%Y-%m-%d"),
+            "description": description,
+            "merchant_name": None,
+            "amount": float(amount),
+            "transaction_type": transaction_type,
+            "balance": float(balance) if balance is not None else None,
+            "reference_number": (row.get("reference") or "").strip() or None,
+            "transaction_code": None,
+            "category": categorize_description(description),
+            "currency": "MYR",
+            "is_subscription": False,
+        }
+
+
+def parse_known_layout(document: BinaryIO) -> Optional[LayoutParseResult]:
+    """Parse a PDF statement locally when it matches a known layout.
+
+    Args:
+        document: Readable binary stream of the PDF, positioned anywhere; it is left open
+
+    Returns:
+        Optional[LayoutParseResult]: Parsed rows per page and the pages that still need
+            the LLM, or None when pdfplumber is unavailable, the layout is unknown or no
+            row could be parsed
+    """
+    try:
+        import pdfplumber
+    except ImportError:
+        return None
+
+    document.seek(0)
+    try:
+        with pdfplumber.open(document) as pdf:
+            if not pdf.pages:
+                return None
+            first_page_text = pdf.pages[0].extract_text() or ""
+            layout = detect_layout(first_page_text)
+            if layout is None:
+                return None
+
+            parser = _LayoutParser(layout, first_page_text)
+            if parser.needs_year and parser.statement_year is None:
+                return None
+
+            pages: Dict[int, List[Dict[str, Any]]] = {}
+            fallback_pages: List[int] = []
+            for index, page in enumerate(pdf.pages):
+                rows, valid = parser.parse_page(page.extract_words())
+                if valid:
+                    pages[index] = rows
+                else:
+                    fallback_pages.append(index)
+            page_count = len(pdf.pages)
+    except Exception as e:
+        print(f"Error parsing statement layout: {str(e)}")
+        return None
+    finally:
+        document.seek(0)
+
+    if not any(pages.values()):
+        return None
+    return {
+        "layout": layout["name"],
+        "page_count": page_count,
+        "pages": pages,
+        "fallback_pages": fallback_pages,
+    }
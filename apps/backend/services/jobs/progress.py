@@ -0,0 +1,150 @@
+"""Upload progress reporting for the statement-processing pipeline.
+
+Progress is persisted on the upload row (``processing_status`` and the
+``processing_progress`` counters), so any API process can serve it, and is also
+pushed to in-process subscribers so the SSE stream updates as soon as a worker in the
+same process reports. Subscribers fed by workers in other processes fall back to
+re-reading the row every ``UPLOAD_PROGRESS_POLL_SECONDS``.
+
+Reporting is done on the event loop, so the row updates run in worker threads
+(``asyncio.to_thread``), one at a time per upload; only ``publish`` is synchronous.
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+try:
+    from backend.services.db.postgres_connector import database_service
+except ImportError:
+    import sys
+    from pathlib import Path
+    apps_dir = Path(__file__).parent.parent.parent.parent  # Go up to apps/
+    if str(apps_dir) not in sys.path:
+        sys.path.insert(0, str(apps_dir))
+    from backend.services.db.postgres_connector import database_service
+
+
+class ProgressBroker:
+    """Fans progress events for an upload out to the asyncio queues subscribed to it.
+
+    ``publish`` is thread-safe, so reporters running in worker threads (e.g. analysis
+    run through ``asyncio.to_thread``) can publish too.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, file_id: str) -> asyncio.Queue:
+        """Subscribe the running event loop to an upload's events."""
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers[file_id].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, file_id: str, queue: asyncio.Queue) -> None:
+        """Remove a subscription created by ``subscribe``."""
+        with self._lock:
+            subscribers = self._subscribers.get(file_id, set())
+            subscribers.difference_update({sub for sub in subscribers if sub[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(file_id, None)
+
+    def publish(self, file_id: str, event: Dict[str, Any]) -> None:
+        """Deliver an event to every subscriber of the upload."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(file_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # Subscriber's loop is closed; it will be unsubscribed by its own cleanup
+                pass
+
+
+progress_broker = ProgressBroker()
+
+
+# Latest pending progress write per (event loop, upload); each write waits for the one before it
+_pending_writes: Dict[Tuple[asyncio.AbstractEventLoop, str], "asyncio.Task[None]"] = {}
+
+
+def _persist(file_id: str, write: Callable[..., None], *args: Any, **kwargs: Any) -> "asyncio.Task[None]":
+    """Run a blocking progress write in a worker thread, after the upload's earlier writes.
+
+    Writes for one upload are chained so counters never land out of order, and the
+    event loop never waits on the database round-trip.
+    """
+    loop = asyncio.get_running_loop()
+    key = (loop, file_id)
+    previous = _pending_writes.get(key)
+
+    async def run() -> None:
+        if previous is not None:
+            await asyncio.wait({previous})
+        await asyncio.to_thread(write, *args, **kwargs)
+
+    def release(task: "asyncio.Task[None]") -> None:
+        if _pending_writes.get(key) is task:
+            del _pending_writes[key]
+
+    task = loop.create_task(run())
+    _pending_writes[key] = task
+    task.add_done_callback(release)
+    return task
+
+
+def _log_write_error(task: "asyncio.Task[None]") -> None:
+    """Done callback for writes nobody awaits: log the error instead of dropping it."""
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Error persisting upload progress: {str(task.exception())}")
+
+
+async def report_stage(
+    file_id: str,
+    processing_status: str,
+    transaction_count: Optional[int] = None,
+    processing_error: Optional[str] = None,
+    **progress: Any,
+) -> None:
+    """Persist a processing state transition (plus optional counters) and notify subscribers.
+
+    The write runs in a worker thread after any pending progress writes for the upload;
+    database errors propagate to the caller.
+    """
+    await _persist(
+        file_id,
+        database_service.update_upload_processing,
+        file_id,
+        processing_status,
+        transaction_count=transaction_count,
+        processing_error=processing_error,
+        progress=progress or None,
+    )
+    event: Dict[str, Any] = {"processing_status": processing_status, "progress": progress}
+    if transaction_count is not None:
+        event["transaction_count"] = transaction_count
+    if processing_status == "failed":
+        event["processing_error"] = processing_error
+    progress_broker.publish(file_id, event)
+
+
+async def report_progress(file_id: str, **progress: Any) -> None:
+    """Persist progress counters for an upload and notify subscribers."""
+    await _persist(file_id, database_service.update_upload_progress, file_id, progress)
+    progress_broker.publish(file_id, {"progress": progress})
+
+
+def report_progress_nowait(file_id: str, **progress: Any) -> None:
+    """Notify subscribers of progress counters now and persist them in the background.
+
+    For synchronous callbacks invoked on the event loop (e.g. the extractor's per-chunk
+    ``progress_callback``). The write is ordered before the upload's next
+    ``report_stage``; errors are logged only.
+    """
+    _persist(file_id, database_service.update_upload_progress, file_id, progress).add_done_callback(
+        _log_write_error
+    )
+    progress_broker.publish(file_id, {"progress": progress})
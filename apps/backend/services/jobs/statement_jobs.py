@@ -0,0 +1,186 @@
+"""Statement-processing job handlers run by the queue worker."""
+
+import asyncio
+import tempfile
+from datetime import datetime as dt
+from decimal import Decimal
+from typing import BinaryIO
+
+from backend.models.banking_transaction import BankingTransaction
+from backend.models.processing_job import ProcessingJob
+from backend.services.ai_agent.transaction_analyzer import transaction_analyzer
+from backend.services.db.postgres_connector import assign_transaction_fingerprints, database_service
+from backend.services.document_parser.financial_text_extractor import iter_banking_transactions
+from backend.services.jobs.progress import report_progress, report_progress_nowait, report_stage
+from backend.services.object_store.minio_connector import get_minio_connector
+
+BANKING_STATEMENT_JOB = "banking_statement"
+
+
+def build_banking_transaction(tx_id: str, user_id: int, file_id: str, tx_data: dict) -> BankingTransaction:
+    """Build a ``BankingTransaction`` from a normalised transaction dictionary."""
+    return BankingTransaction(
+        id=tx_id,
+        user_id=user_id,
+        file_id=file_id,
+        transaction_date=dt.strptime(tx_data["transaction_date"], "%Y-%m-%d").date(),
+        transaction_year=tx_data["transaction_year"],
+        transaction_month=tx_data["transaction_month"],
+        transaction_day=tx_data["transaction_day"],
+        description=tx_data["description"],
+        merchant_name=tx_data.get("merchant_name"),
+        amount=Decimal(str(tx_data["amount"])),
+        is_subscription=tx_data.get("is_subscription", False),
+        transaction_type=tx_data["transaction_type"],
+        balance=Decimal(str(tx_data["balance"])) if tx_data.get("balance") else None,
+        reference_number=tx_data.get("reference_number"),
+        transaction_code=tx_data.get("transaction_code"),
+        category=tx_data.get("category"),
+        currency=tx_data.get("currency", "MYR"),
+    )
+
+
+async def process_banking_statement(
+    *,
+    user_id: int,
+    file_id: str,
+    file_content: bytes | BinaryIO,
+    file_mime_type: str,
+    file_name: str | None,
+) -> int:
+    """Extract, store and analyse the transactions of one banking statement.
+
+    Transactions are inserted batch by batch as extraction chunks complete, so the
+    first rows reach the dashboard while later chunks are still being extracted and
+    only one batch is held as ``BankingTransaction`` objects at a time.
+
+    Progress is persisted on the upload (extracting -> analyzing -> done) and pushed to
+    progress subscribers, along with chunk, row and insight counters and the final
+    per-chunk status report (``chunk_report``). Extraction
+    errors propagate so the queue can retry the job; analysis errors are logged only,
+    since the transactions are already stored. Safe to re-run: transaction IDs are
+    derived from the file ID, inserts skip existing rows, and rows a failed attempt
+    already stored are skipped by their fingerprint if the retry numbers them differently.
+
+    LLM output is reused across retries and re-uploads through the extraction chunk
+    cache (see ``chunk_cache``), so nothing beyond the current batch is kept here.
+
+    Args:
+        file_content: Statement bytes or a readable binary file handle
+
+    Returns:
+        int: Number of transactions extracted
+    """
+    await report_stage(file_id, "extracting")
+
+    def report_chunks(chunks_done: int, chunks_total: int) -> None:
+        report_progress_nowait(file_id, chunks_done=chunks_done, chunks_total=chunks_total)
+
+    def report_chunk_statuses(chunk_report: list) -> None:
+        report_progress_nowait(file_id, chunk_report=chunk_report)
+
+    transaction_count = 0
+    rows_inserted = 0
+    rows_deduplicated = 0
+    # Fingerprint occurrence numbers run across the whole statement, not per batch
+    fingerprint_occurrences: dict = {}
+    async for batch in iter_banking_transactions(
+        file_path=None,
+        file_content=file_content,
+        file_mime_type=file_mime_type,
+        user_upload_id=file_id,
+        progress_callback=report_chunks,
+        chunk_report_callback=report_chunk_statuses,
+    ):
+        banking_transactions = [
+            build_banking_transaction(f"{file_id}_{transaction_count + idx}", user_id, file_id, tx_data)
+            for idx, tx_data in enumerate(batch)
+        ]
+        transaction_count += len(banking_transactions)
+        assign_transaction_fingerprints(banking_transactions, fingerprint_occurrences)
+
+        ingest_result = await asyncio.to_thread(
+            database_service.ingest_banking_transactions, banking_transactions
+        )
+        rows_inserted += len(ingest_result["inserted_ids"])
+        rows_deduplicated += ingest_result["deduplicated"]
+        await report_progress(
+            file_id,
+            rows_extracted=transaction_count,
+            rows_inserted=rows_inserted,
+            rows_deduplicated=rows_deduplicated,
+        )
+
+    if transaction_count:
+        await report_stage(
+            file_id,
+            "analyzing",
+            transaction_count=transaction_count,
+            rows_inserted=rows_inserted,
+            rows_deduplicated=rows_deduplicated,
+            analysis_started=True,
+        )
+
+        try:
+            # Reads the statement's stored rows back rather than keeping every batch in memory
+            insights = await asyncio.to_thread(
+                transaction_analyzer.analyze,
+                user_id=user_id,
+                file_id=file_id,
+                mode="incremental",
+            )
+            await report_progress(file_id, insights_written=len(insights or []))
+        except Exception as analysis_error:
+            print(f"Error running AI analysis: {str(analysis_error)}")
+
+    await report_stage(file_id, "done", transaction_count=transaction_count)
+    return transaction_count
+
+
+async def run_banking_statement_job(job: ProcessingJob) -> None:
+    """Queue handler: spool the uploaded statement from object storage and process it.
+
+    The statement is streamed into a temporary file and handed to the extractor as a
+    file handle, so worker memory does not grow with the size of the statement. The
+    file is named so the PDF process pool can open it by path instead of receiving a
+    copy of its bytes.
+    """
+    payload = job.payload or {}
+    with tempfile.NamedTemporaryFile() as spool:
+        await asyncio.to_thread(
+            get_minio_connector().download_to_file,
+            user_id=job.user_id,
+            document_id=job.file_id,
+            file_obj=spool,
+        )
+        spool.seek(0)
+        await process_banking_statement(
+            user_id=job.user_id,
+            file_id=job.file_id,
+            file_content=spool,
+            file_mime_type=payload.get("file_mime_type", "application/pdf"),
+            file_name=payload.get("file_name"),
+        )
+
+
+def enqueue_banking_statement(
+    *,
+    user_id: int,
+    file_id: str,
+    file_mime_type: str,
+    file_name: str | None,
+    max_attempts: int,
+) -> ProcessingJob:
+    """Queue a banking statement for background processing."""
+    return database_service.enqueue_processing_job(
+        ProcessingJob(
+            job_type=BANKING_STATEMENT_JOB,
+            user_id=user_id,
+            file_id=file_id,
+            payload={
+                "file_mime_type": file_mime_type,
+                "file_name": file_name,
+            },
+            max_attempts=max_attempts,
+        )
+    )
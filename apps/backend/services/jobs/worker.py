@@ -0,0 +1,214 @@
+"""Bounded worker pool for the Postgres-backed processing job queue.
+
+Each worker process runs ``JOB_WORKER_CONCURRENCY`` slots. A slot claims one job at a
+time with ``FOR UPDATE SKIP LOCKED``, so any number of API processes and standalone
+workers can share the queue without double-processing. Failed jobs are retried with
+exponential backoff up to ``JOB_MAX_ATTEMPTS``. While a job runs, its slot refreshes
+the job's lock every ``JOB_HEARTBEAT_INTERVAL_SECONDS``; jobs orphaned by a crash or
+deploy stop heartbeating and are requeued after ``JOB_STALE_AFTER_SECONDS``. A slot
+that finds its lease lost stops the job, and its outcome is not recorded.
+
+The API process starts a pool on startup when ``JOB_WORKER_IN_PROCESS`` is true.
+To run workers separately (and set ``JOB_WORKER_IN_PROCESS=false`` on the API):
+
+    python -m backend.services.jobs.worker
+"""
+
+import asyncio
+import os
+import signal
+import socket
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+
+try:
+    from backend.config import settings
+    from backend.models.processing_job import ProcessingJob
+    from backend.services.db.postgres_connector import database_service
+    from backend.services.document_parser.pdf_processing import shutdown_process_pool
+    from backend.services.jobs.statement_jobs import BANKING_STATEMENT_JOB, run_banking_statement_job
+    from backend.services.jobs.progress import report_stage
+except ImportError:
+    import sys
+    from pathlib import Path
+    apps_dir = Path(__file__).parent.parent.parent.parent  # Go up to apps/
+    if str(apps_dir) not in sys.path:
+        sys.path.insert(0, str(apps_dir))
+    from backend.config import settings
+    from backend.models.processing_job import ProcessingJob
+    from backend.services.db.postgres_connector import database_service
+    from backend.services.document_parser.pdf_processing import shutdown_process_pool
+    from backend.services.jobs.statement_jobs import BANKING_STATEMENT_JOB, run_banking_statement_job
+    from backend.services.jobs.progress import report_stage
+
+
+JOB_HANDLERS: Dict[str, Callable[[ProcessingJob], Awaitable[None]]] = {
+    BANKING_STATEMENT_JOB: run_banking_statement_job,
+}
+
+
+class JobWorker:
+    """Pool of asyncio slots that claim and run queued jobs."""
+
+    def __init__(
+        self,
+        concurrency: int = settings.JOB_WORKER_CONCURRENCY,
+        poll_interval: float = settings.JOB_WORKER_POLL_INTERVAL_SECONDS,
+    ):
+        """Initialize the worker pool.
+
+        Args:
+            concurrency: Number of jobs run at once
+            poll_interval: Seconds to wait before polling again when the queue is empty
+        """
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._stopping = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start the worker slots and the stale-job reaper on the running event loop."""
+        if self._tasks:
+            return
+        self._stopping.clear()
+        self._tasks = [asyncio.create_task(self._run_slot()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._reap_stale_jobs()))
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Stop claiming new jobs and wait (up to ``timeout``) for running ones to finish.
+
+        Jobs still running after the timeout are cancelled; they are requeued by the
+        stale-job reaper of whichever worker runs next. The PDF process pool the jobs
+        used is shut down afterwards.
+        """
+        self._stopping.set()
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        await asyncio.to_thread(shutdown_process_pool)
+
+    async def _sleep(self, seconds: float) -> None:
+        """Sleep, waking early when the pool is stopping."""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run_slot(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = await asyncio.to_thread(database_service.claim_processing_job, self.worker_id)
+            except Exception as e:
+                print(f"Error claiming processing job: {str(e)}")
+                job = None
+
+            if job is None:
+                await self._sleep(self.poll_interval)
+                continue
+
+            await self._run_job(job)
+
+    async def _hold_lease(self, job: ProcessingJob, work: asyncio.Task) -> None:
+        """Refresh the job's lock while ``work`` runs; cancel ``work`` if the lease is lost.
+
+        Returns only when the lease was lost (the task is cancelled once ``work`` ends).
+        """
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL_SECONDS)
+            try:
+                held = await asyncio.to_thread(
+                    database_service.heartbeat_processing_job, job.id, self.worker_id
+                )
+            except Exception as e:
+                print(f"Error refreshing lock of job {job.id}: {str(e)}")
+                continue
+            if not held:
+                print(f"Job {job.id} ({job.job_type}) lost its lease; stopping it")
+                work.cancel()
+                return
+
+    async def _run_job(self, job: ProcessingJob) -> None:
+        handler = JOB_HANDLERS.get(job.job_type)
+        lease: Optional[asyncio.Task] = None
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for job type '{job.job_type}'")
+            work = asyncio.create_task(handler(job))
+            lease = asyncio.create_task(self._hold_lease(job, work))
+            try:
+                await work
+            finally:
+                lease.cancel()
+            completed = await asyncio.to_thread(
+                database_service.complete_processing_job, job.id, self.worker_id
+            )
+            if not completed:
+                print(f"Job {job.id} ({job.job_type}) finished after losing its lease; outcome not recorded")
+        except asyncio.CancelledError:
+            if lease is not None and lease.done() and not lease.cancelled():
+                # The job was requeued as stale and may be running elsewhere
+                return
+            raise
+        except Exception as e:
+            retry_delay = settings.JOB_RETRY_BASE_DELAY_SECONDS * 2 ** max(0, job.attempts - 1)
+            print(f"Job {job.id} ({job.job_type}) attempt {job.attempts} failed: {str(e)}")
+            try:
+                requeued = await asyncio.to_thread(
+                    database_service.fail_processing_job, job.id, self.worker_id, str(e), retry_delay
+                )
+                if requeued is None:
+                    print(f"Job {job.id} ({job.job_type}) lost its lease; failure not recorded")
+                    return
+                await self._record_upload_status(job, requeued, str(e))
+            except Exception as status_error:
+                print(f"Error recording failure for job {job.id}: {str(status_error)}")
+
+    async def _reap_stale_jobs(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                recovered = await asyncio.to_thread(
+                    database_service.requeue_stale_processing_jobs, settings.JOB_STALE_AFTER_SECONDS
+                )
+                for job in recovered:
+                    await self._record_upload_status(job, job.status == "queued", job.last_error)
+            except Exception as e:
+                print(f"Error requeueing stale processing jobs: {str(e)}")
+            await self._sleep(max(self.poll_interval, settings.JOB_STALE_AFTER_SECONDS / 4))
+
+    @staticmethod
+    async def _record_upload_status(job: ProcessingJob, requeued: bool, error: Optional[str]) -> None:
+        """Mirror the job outcome onto the upload's processing state."""
+        if not job.file_id:
+            return
+        if requeued:
+            await report_stage(job.file_id, "queued")
+        else:
+            await report_stage(job.file_id, "failed", processing_error=error)
+
+
+# Pool used by the API process when JOB_WORKER_IN_PROCESS is enabled
+job_worker = JobWorker()
+
+
+async def main() -> None:
+    """Run a standalone worker pool until SIGINT/SIGTERM."""
+    worker = JobWorker()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker.start()
+    print(f"Job worker {worker.worker_id} started with concurrency {worker.concurrency}")
+    await stop.wait()
+    print("Stopping job worker...")
+    await worker.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
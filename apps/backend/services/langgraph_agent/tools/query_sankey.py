@@ -14,7 +14,7 @@ from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 
 from backend.services.db.postgres_connector import database_service
-from backend.utils.sankey import to_sankey
+from backend.utils.sankey import SANKEY_COLUMNS, to_sankey
 
 
 class QuerySankeyInput(BaseModel):
@@ -79,6 +79,14 @@ class QuerySankeyInput(BaseModel):
         default=None,
         description="Filter by description (partial match, case-insensitive)"
     )
+    search: Optional[str] = Field(
+        default=None,
+        description="Fuzzy search across merchant name and description (tolerates typos, e.g. 'netflx')"
+    )
+    order_by_relevance: bool = Field(
+        default=False,
+        description="When searching, return the best-matching transactions first instead of the most recent"
+    )
     limit: Optional[int] = Field(
         default=None,
         ge=1,
@@ -102,6 +110,8 @@ async def query_transactions_sankey(
     transaction_month: Optional[int] = None,
     currency: Optional[str] = None,
     description: Optional[str] = None,
+    search: Optional[str] = None,
+    order_by_relevance: bool = False,
     limit: Optional[int] = None,
 ) -> str:
     """Query transactions and format them for sankey diagram visualization.
@@ -126,6 +136,8 @@ async def query_transactions_sankey(
         transaction_month: Filter by transaction month (1-12)
         currency: Filter by currency code
         description: Filter by description (partial match)
+        search: Fuzzy search across merchant name and description
+        order_by_relevance: Rank by search relevance instead of transaction date
         limit: Maximum number of results to return
         
     Returns:
@@ -144,6 +156,27 @@ async def query_transactions_sankey(
         min_amount_decimal = Decimal(str(min_amount)) if min_amount is not None else None
         max_amount_decimal = Decimal(str(max_amount)) if max_amount is not None else None
         
+        # Whole-month questions are answered from the monthly rollup
+        rollup_compatible = limit is None and not any(
+            value is not None
+            for value in (
+                file_id, start_date, end_date, merchant_name, min_amount, max_amount,
+                is_subscription, currency, description, search,
+            )
+        )
+        if rollup_compatible:
+            rollup_rows = await asyncio.to_thread(
+                database_service.get_sankey_rollup_rows,
+                user_id=user_id,
+                transaction_year=transaction_year,
+                transaction_month=transaction_month,
+                transaction_type=transaction_type,
+                category=category,
+            )
+            if rollup_rows is not None:
+                sankey_data = await asyncio.to_thread(to_sankey, rollup_rows)
+                return json.dumps(sankey_data, indent=2, default=str)
+
         # Query transactions from database (sync call wrapped in thread)
         transactions = await asyncio.to_thread(
             database_service.filter_banking_transactions,
@@ -161,13 +194,15 @@ async def query_transactions_sankey(
             transaction_month=transaction_month,
             currency=currency,
             description=description,
+            search=search,
             limit=limit,
             offset=0,
-            order_by="transaction_date",
+            order_by="relevance" if search and order_by_relevance else "transaction_date",
             order_desc=True,
+            columns=SANKEY_COLUMNS,
         )
 
-        # Convert SQLModel objects to dictionaries for sankey diagram
+        # Convert projected rows to dictionaries for sankey diagram
         transactions_dict = [
             {
                 'amount': float(tx.amount) if tx.amount else 0.0,
@@ -2,14 +2,14 @@
 
 This tool allows the agent to query subscription and membership transactions
 and get an aggregated view by merchant name, showing total spending and
-average monthly amounts.
+average monthly amounts. The grouping is done in Postgres by
+``DatabaseService.aggregate_subscriptions``.
 """
 
 import asyncio
 from typing import Optional
 import json
 
-import pandas as pd
 from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 
@@ -55,74 +55,43 @@ async def query_subscriptions_aggregated(
     
     This function queries subscription transactions (debit transactions marked as subscriptions)
     and returns an aggregated view showing:
-    - merchant_name: Name of the merchant/service
+    - merchant_key / display_name: Merchant grouping key and display name
     - category: Transaction category
-    - amount: Total amount spent across all months
+    - total_amount: Total amount spent across all months
     - no_months_subscribed: Number of unique months with transactions
     - average_monthly_amount: Average amount per month
+    - confidence_avg / transaction_count: Classification confidence and row count
     
     Args:
         user_id: Filter by user ID (default: 1)
         transaction_year: Filter by transaction year (e.g., 2024)
-        limit: Maximum number of results to return
-        offset: Number of results to skip (for pagination)
+        limit: Maximum number of subscriptions (groups) to return
+        offset: Number of subscriptions (groups) to skip (for pagination)
         
     Returns:
         JSON string containing aggregated subscription data
     """
     try:
-        # Query transactions from database (sync call wrapped in thread)
-        transactions = await asyncio.to_thread(
-            database_service.filter_banking_transactions,
+        # Aggregate in the database (sync call wrapped in thread)
+        result = await asyncio.to_thread(
+            database_service.aggregate_subscriptions,
             user_id=user_id,
             file_id=file_id,
-            is_subscription=True,
-            transaction_type='debit',  # Only debit transactions are subscriptions
             transaction_year=transaction_year,
             limit=limit,
             offset=offset,
-            order_by="transaction_date",
-            order_desc=True,
         )
 
-        # Convert to dictionaries for pandas DataFrame
-        transactions_dict = [
-            {
-                'merchant_name': tx.merchant_name,
-                'category': tx.category,
-                'amount': float(tx.amount) if tx.amount else 0.0,
-                'transaction_month': tx.transaction_month,
-            }
-            for tx in transactions
-        ]
-        
-        if not transactions_dict:
+        if not result:
             return json.dumps({
                 "message": "No subscription transactions found",
                 "subscriptions": []
             })
-        
-        # Create DataFrame and aggregate (pandas operations are CPU-bound, run in thread)
-        def aggregate_transactions():
-            transactions_df = pd.DataFrame(transactions_dict)
-            aggregated_df = transactions_df.groupby(['merchant_name', 'category']).agg({
-                'amount': 'sum',
-                'transaction_month': 'nunique',
-            }).reset_index()
 
-            aggregated_df['average_monthly_amount'] = aggregated_df['amount'] / aggregated_df['transaction_month']
-            aggregated_df.rename(columns={'transaction_month': 'no_months_subscribed'}, inplace=True)
-            return aggregated_df
-        
-        aggregated_df = await asyncio.to_thread(aggregate_transactions)
-
-        # Convert to dictionary and format for JSON
-        result = aggregated_df.to_dict(orient='records')
-        
         return json.dumps({
             "subscriptions": result,
             "total_subscriptions": len(result),
-            "total_amount": float(aggregated_df['amount'].sum()),
+            "total_amount": float(sum(row['total_amount'] for row in result)),
         }, indent=2, default=str)
     except Exception as e:
         return json.dumps({
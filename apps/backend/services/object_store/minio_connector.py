@@ -9,7 +9,7 @@ import io
 import os
 import uuid
 from functools import lru_cache
-from typing import Optional, BinaryIO, Dict, List
+from typing import Optional, BinaryIO, Dict, Iterator, List
 from datetime import datetime, timedelta
 from io import BytesIO
 
@@ -31,6 +31,14 @@ except ImportError:
     from backend.config import settings
 
 
+# Part size for multipart uploads (the S3 minimum). put_object reads and sends one part
+# at a time, so uploading from a file handle never buffers more than this.
+MULTIPART_PART_SIZE = 5 * 1024 * 1024
+
+# Chunk size used when streaming objects out of MinIO
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
 class MinIOConnector:
     """MinIO connector for file storage operations."""
 
@@ -95,6 +103,9 @@ class MinIOConnector:
     ) -> Dict[str, str]:
         """
         Upload a file to MinIO.
+
+        The file is streamed from ``file_data`` in ``MULTIPART_PART_SIZE`` parts, so pass
+        a file handle (e.g. a spooled temporary file) rather than loading it into memory.
         
         Args:
             user_id: User ID
@@ -131,6 +142,7 @@ class MinIOConnector:
                 file_data,
                 length=file_size,
                 content_type=content_type,
+                part_size=MULTIPART_PART_SIZE,
                 metadata={
                     "user_id": str(user_id),
                     "document_id": document_id,
@@ -185,6 +197,77 @@ class MinIOConnector:
                 raise FileNotFoundError(f"File not found: {object_path}")
             raise Exception(f"Failed to download file from MinIO: {e}")
 
+    def download_to_file(
+        self,
+        user_id: int,
+        document_id: str,
+        file_obj: BinaryIO,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    ) -> int:
+        """
+        Stream a file from MinIO into a writable file object.
+        
+        Args:
+            user_id: User ID
+            document_id: Document/file ID from database
+            file_obj: Writable binary file object (e.g. a temporary file)
+            chunk_size: Bytes read from MinIO per chunk
+            
+        Returns:
+            Number of bytes written
+            
+        Raises:
+            S3Error: If download fails
+            FileNotFoundError: If file doesn't exist
+        """
+        written = 0
+        for chunk in self.stream_file(user_id, document_id, chunk_size=chunk_size):
+            file_obj.write(chunk)
+            written += len(chunk)
+        return written
+
+    def stream_file(
+        self,
+        user_id: int,
+        document_id: str,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """
+        Stream a file from MinIO in chunks without buffering the whole object.
+        
+        Args:
+            user_id: User ID
+            document_id: Document/file ID from database
+            chunk_size: Bytes read from MinIO per chunk
+            
+        Returns:
+            Iterator over consecutive chunks of the file. The object is opened
+            eagerly, so a missing file raises here rather than mid-stream.
+            
+        Raises:
+            S3Error: If download fails
+            FileNotFoundError: If file doesn't exist
+        """
+        self._ensure_bucket_exists()
+        object_path = self._get_object_path(user_id, document_id)
+        
+        try:
+            response = self.client.get_object(self.bucket_name, object_path)
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                raise FileNotFoundError(f"File not found: {object_path}")
+            raise Exception(f"Failed to download file from MinIO: {e}")
+        return self._iter_response(response, chunk_size)
+
+    @staticmethod
+    def _iter_response(response, chunk_size: int) -> Iterator[bytes]:
+        """Yield a MinIO response body in chunks, releasing the connection afterwards."""
+        try:
+            yield from response.stream(chunk_size)
+        finally:
+            response.close()
+            response.release_conn()
+
     def get_file_info(
         self,
         user_id: int,
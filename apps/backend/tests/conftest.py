@@ -0,0 +1,68 @@
+"""Shared fixtures for the backend tests.
+
+The database tests run against the Postgres configured through the usual
+settings/.env and are skipped when it is not reachable.
+"""
+
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete
+from sqlmodel import Session
+
+apps_dir = Path(__file__).parent.parent.parent  # Go up to apps/
+if str(apps_dir) not in sys.path:
+    sys.path.insert(0, str(apps_dir))
+
+
+@pytest.fixture(scope="session")
+def database_service():
+    """The shared DatabaseService, or skip when no database is configured."""
+    from sqlalchemy.exc import SQLAlchemyError
+
+    try:
+        from backend.services.db.postgres_connector import database_service
+    except (SQLAlchemyError, ValueError) as e:
+        pytest.skip(f"PostgreSQL is not available: {e}")
+    return database_service
+
+
+@pytest.fixture
+def user_upload(database_service):
+    """A throwaway user with one queued banking statement upload, removed afterwards."""
+    from backend.models.banking_transaction import BankingTransaction
+    from backend.models.monthly_rollup import MonthlyRollup
+    from backend.models.user import User
+    from backend.models.user_upload import UserUpload
+
+    with Session(database_service.engine) as session:
+        user = User(email=f"test_{uuid.uuid4().hex[:8]}@example.com")
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        user_id = user.id
+
+    upload = database_service.create_user_upload(
+        UserUpload(
+            file_id=str(uuid.uuid4()),
+            user_id=user_id,
+            file_name="statement.pdf",
+            file_type="pdf",
+            file_size=0,
+            file_url="test",
+            file_mime_type="application/pdf",
+            file_extension="pdf",
+            statement_type="banking_transaction",
+            expense_month=1,
+            expense_year=2024,
+            processing_status="queued",
+        )
+    )
+    yield upload
+
+    with database_service.engine.begin() as connection:
+        for table in (BankingTransaction.__table__, MonthlyRollup.__table__, UserUpload.__table__):
+            connection.execute(delete(table).where(table.c.user_id == user_id))
+        connection.execute(delete(User.__table__).where(User.__table__.c.id == user_id))
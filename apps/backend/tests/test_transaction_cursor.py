@@ -0,0 +1,76 @@
+"""Tests for keyset (cursor) pagination of banking transactions."""
+
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+import pytest
+
+
+def make_transaction(user_id: int, file_id: str, index: int):
+    from backend.models.banking_transaction import BankingTransaction
+
+    return BankingTransaction(
+        id=f"{file_id}_{index}",
+        user_id=user_id,
+        file_id=file_id,
+        transaction_date=date(2024, 1, 1 + index),
+        transaction_year=2024,
+        transaction_month=1,
+        transaction_day=1 + index,
+        description=f"PURCHASE {index}",
+        amount=Decimal(f"{10 + index}.50"),
+        transaction_type="credit" if index % 2 else "debit",
+        created_at=datetime(2024, 2, 1, 12, index, tzinfo=UTC),
+    )
+
+
+@pytest.fixture
+def cursor_fields(database_service):
+    from backend.services.db.postgres_connector import CURSOR_ORDER_FIELDS
+
+    return sorted(CURSOR_ORDER_FIELDS)
+
+
+def test_cursor_round_trips_every_order_field(cursor_fields):
+    from backend.services.db.postgres_connector import _decode_transaction_cursor, encode_transaction_cursor
+
+    transaction = make_transaction(1, "file", 3)
+    for order_by in cursor_fields:
+        value, transaction_id = _decode_transaction_cursor(
+            encode_transaction_cursor(transaction, order_by), order_by
+        )
+        expected = getattr(transaction, order_by)
+        assert value == expected and type(value) is type(expected), order_by
+        assert transaction_id == transaction.id
+
+
+def test_cursor_rejects_mismatched_or_malformed_cursors(cursor_fields):
+    from backend.services.db.postgres_connector import _decode_transaction_cursor, encode_transaction_cursor
+
+    cursor = encode_transaction_cursor(make_transaction(1, "file", 0), "amount")
+    with pytest.raises(ValueError):
+        _decode_transaction_cursor(cursor, "description")
+    with pytest.raises(ValueError):
+        _decode_transaction_cursor("not-a-cursor", "amount")
+
+
+def test_second_page_for_every_order_field(database_service, user_upload, cursor_fields):
+    from backend.services.db.postgres_connector import encode_transaction_cursor
+
+    database_service.ingest_banking_transactions(
+        [make_transaction(user_upload.user_id, user_upload.file_id, index) for index in range(5)]
+    )
+    for order_by in cursor_fields:
+        everything = database_service.filter_banking_transactions(
+            user_id=user_upload.user_id, order_by=order_by
+        )
+        first_page = database_service.filter_banking_transactions(
+            user_id=user_upload.user_id, order_by=order_by, limit=2
+        )
+        second_page = database_service.filter_banking_transactions(
+            user_id=user_upload.user_id,
+            order_by=order_by,
+            limit=2,
+            cursor=encode_transaction_cursor(first_page[-1], order_by),
+        )
+        assert [tx.id for tx in first_page + second_page] == [tx.id for tx in everything[:4]], order_by
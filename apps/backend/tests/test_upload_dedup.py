@@ -0,0 +1,53 @@
+"""Tests for resolving re-uploads of the same file to the existing upload."""
+
+import uuid
+
+
+def make_upload(user_id: int, statement_type: str = "banking_transaction", content_hash: str = "a" * 64):
+    from backend.models.user_upload import UserUpload
+
+    return UserUpload(
+        file_id=str(uuid.uuid4()),
+        user_id=user_id,
+        file_name="statement.pdf",
+        file_type="pdf",
+        file_size=0,
+        file_url="test",
+        file_mime_type="application/pdf",
+        file_extension="pdf",
+        statement_type=statement_type,
+        expense_month=1,
+        expense_year=2024,
+        processing_status="queued",
+        content_hash=content_hash,
+    )
+
+
+def test_duplicate_upload_returns_the_existing_row(database_service, user_upload):
+    first, created = database_service.create_user_upload_unless_duplicate(make_upload(user_upload.user_id))
+    assert created
+
+    second, created = database_service.create_user_upload_unless_duplicate(make_upload(user_upload.user_id))
+    assert not created
+    assert second.file_id == first.file_id
+
+
+def test_same_file_as_another_statement_type_is_a_new_upload(database_service, user_upload):
+    banking, _ = database_service.create_user_upload_unless_duplicate(make_upload(user_upload.user_id))
+    receipt, created = database_service.create_user_upload_unless_duplicate(
+        make_upload(user_upload.user_id, statement_type="receipt")
+    )
+    assert created
+    assert receipt.file_id != banking.file_id
+    assert database_service.find_user_upload_by_hash(
+        user_upload.user_id, "receipt", "a" * 64
+    ).file_id == receipt.file_id
+
+
+def test_failed_upload_can_be_uploaded_again(database_service, user_upload):
+    failed, _ = database_service.create_user_upload_unless_duplicate(make_upload(user_upload.user_id))
+    database_service.update_upload_processing(failed.file_id, "failed", processing_error="boom")
+
+    retry, created = database_service.create_user_upload_unless_duplicate(make_upload(user_upload.user_id))
+    assert created
+    assert retry.file_id != failed.file_id
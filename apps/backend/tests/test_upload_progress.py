@@ -0,0 +1,33 @@
+"""Tests for persisting upload processing progress."""
+
+
+def test_progress_merges_into_an_object(database_service, user_upload):
+    file_id = user_upload.file_id
+
+    database_service.update_upload_processing(file_id, "extracting", progress={"chunks_total": 3})
+    database_service.update_upload_progress(file_id, {"chunks_done": 1})
+    database_service.update_upload_progress(file_id, {"chunks_done": 2})
+
+    progress = database_service.get_upload_progress(user_upload.user_id, file_id)["progress"]
+    assert progress == {"chunks_total": 3, "chunks_done": 2}
+
+
+def test_stage_counters_merge_into_an_object(database_service, user_upload):
+    file_id = user_upload.file_id
+
+    database_service.update_upload_processing(file_id, "extracting")
+    database_service.update_upload_processing(file_id, "analyzing", transaction_count=4, progress={"rows_inserted": 4})
+    database_service.update_upload_progress(file_id, {"insights_written": 2})
+
+    progress = database_service.get_upload_progress(user_upload.user_id, file_id)["progress"]
+    assert progress == {"rows_inserted": 4, "insights_written": 2}
+
+
+def test_progress_merges_before_extraction_starts(database_service, user_upload):
+    file_id = user_upload.file_id
+
+    database_service.update_upload_processing(file_id, "analyzing", transaction_count=4, progress={"rows_inserted": 4})
+    database_service.update_upload_progress(file_id, {"insights_written": 2})
+
+    progress = database_service.get_upload_progress(user_upload.user_id, file_id)["progress"]
+    assert progress == {"rows_inserted": 4, "insights_written": 2}
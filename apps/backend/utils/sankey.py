@@ -7,6 +7,14 @@ from typing import Dict, Any
 
 import pandas as pd
 
+# Columns to_sankey reads; pass as ``columns=`` to filter_banking_transactions
+SANKEY_COLUMNS = ["amount", "transaction_type", "merchant_name", "category"]
+
+# Group keys for missing merchants and categories, the same as the monthly rollup's, so
+# raw transactions and rollup rows give the same diagram
+UNKNOWN_MERCHANT = "Unknown"
+UNCATEGORISED = "other"
+
 
 def to_sankey(transactions: list[dict[str, Any]]) -> Dict[str, Any] :
     df = pd.DataFrame(transactions)
@@ -17,6 +25,9 @@ def to_sankey(transactions: list[dict[str, Any]]) -> Dict[str, Any] :
 
     # Normalize amount
     df['amount'] = df['amount'].astype(float)
+    # groupby drops missing keys; group them like the monthly rollup does
+    df['merchant_name'] = df['merchant_name'].fillna(UNKNOWN_MERCHANT)
+    df['category'] = df['category'].fillna(UNCATEGORISED)
 
     # Identify income sources (credits)
     income = df[df['transaction_type'] == 'credit']
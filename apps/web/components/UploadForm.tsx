@@ -52,14 +52,23 @@ export function UploadForm({ apiUrl, onSuccess }: UploadFormProps) {
   const fileInputRef = React.useRef<HTMLInputElement>(null);
 
   const MAX_FILE_SIZE_BYTES = 10 * 1024 * 1024; // 10MB
+  // PDF statements plus CSV/XLSX bank exports (browsers report CSV under several types)
+  const ALLOWED_FILE_TYPES = [
+    "application/pdf",
+    "text/csv",
+    "application/csv",
+    "text/comma-separated-values",
+    "application/vnd.ms-excel",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+  ];
 
   const validateFiles = (selectedFiles: File[]): string | null => {
     if (!selectedFiles.length) return "Please select at least 1 file.";
     if (selectedFiles.length > 3)
       return "Please upload up to 3 PDFs (for 1–3 consecutive months).";
     for (const f of selectedFiles) {
-      if (f.type !== "application/pdf") {
-        return "Only PDF files are allowed.";
+      if (!ALLOWED_FILE_TYPES.includes(f.type)) {
+        return "Only PDF, CSV and Excel (.xlsx) files are allowed.";
       }
       if (f.size > MAX_FILE_SIZE_BYTES) {
         return `File size must be less than 10MB: ${f.name}`;
@@ -447,7 +456,7 @@ export function UploadForm({ apiUrl, onSuccess }: UploadFormProps) {
           <input
             ref={fileInputRef}
             type="file"
-            accept="application/pdf"
+            accept="application/pdf,.csv,text/csv,.xlsx,application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             className="hidden"
             onChange={handleInputChange}
             disabled={uploading}
@@ -464,7 +473,7 @@ export function UploadForm({ apiUrl, onSuccess }: UploadFormProps) {
                 and drop
               </p>
               <p className="text-xs text-muted-foreground">
-                PDF (max 10MB each). Upload 2-3 files for consecutive months.
+                PDF, CSV or XLSX (max 10MB each). Upload 2-3 files for consecutive months.
               </p>
             </div>
           </div>
@@ -11,6 +11,7 @@ import React, {
 import { useApi } from "@/hooks/use-api";
 import type {
   Scope,
+  UploadProgress,
   UserFile,
   UserFilesResponse,
   formatDateToISO,
@@ -27,6 +28,9 @@ interface ScopeContextValue {
   filesError: string | null;
   refreshFiles: () => Promise<void>;
 
+  // Live progress of files that are still processing, keyed by file_id
+  fileProgress: Record<string, UploadProgress>;
+
   // Computed values
   hasFiles: boolean;
   latestFile: UserFile | null;
@@ -39,12 +43,15 @@ interface ScopeContextValue {
 const ScopeContext = createContext<ScopeContextValue | undefined>(undefined);
 
 export function ScopeProvider({ children }: { children: React.ReactNode }) {
-  const { get, isSignedIn, isLoaded } = useApi();
+  const { get, stream, isSignedIn, isLoaded } = useApi();
 
   // Files state
   const [files, setFiles] = useState<UserFile[]>([]);
   const [filesLoading, setFilesLoading] = useState(true);
   const [filesError, setFilesError] = useState<string | null>(null);
+  const [fileProgress, setFileProgress] = useState<
+    Record<string, UploadProgress>
+  >({});
 
   // Scope state
   const [scope, setScope] = useState<Scope | null>(null);
@@ -86,8 +93,11 @@ export function ScopeProvider({ children }: { children: React.ReactNode }) {
     return files[0];
   }, [files]);
 
-  const hasProcessingFiles = useMemo(
-    () => files.some((file) => file.status === "processing"),
+  const processingFileIds = useMemo(
+    () =>
+      files
+        .filter((file) => file.status === "processing")
+        .map((file) => file.file_id),
     [files],
   );
 
@@ -98,16 +108,39 @@ export function ScopeProvider({ children }: { children: React.ReactNode }) {
     }
   }, [isLoaded, isSignedIn, fetchFiles]);
 
-  // Poll for file status while processing is ongoing
+  // Follow the progress stream of each processing file instead of polling;
+  // the file list is refreshed once a stream ends (file done or failed)
   useEffect(() => {
-    if (!isLoaded || !isSignedIn || !hasProcessingFiles) return;
-
-    const intervalId = setInterval(() => {
-      fetchFiles();
-    }, 5000);
+    if (!isLoaded || !isSignedIn || processingFileIds.length === 0) return;
+
+    const controller = new AbortController();
+    let retryId: ReturnType<typeof setTimeout> | undefined;
+
+    for (const fileId of processingFileIds) {
+      stream<UploadProgress>(
+        `/api/v1/file-uploads/${fileId}/progress`,
+        (_event, data) => {
+          setFileProgress((prev) => ({ ...prev, [fileId]: data }));
+        },
+        controller.signal,
+      )
+        .then(() => {
+          if (!controller.signal.aborted) fetchFiles();
+        })
+        .catch((err) => {
+          if (controller.signal.aborted) return;
+          console.error("Progress stream failed:", err);
+          // Fall back to a delayed refresh, which re-opens the streams
+          clearTimeout(retryId);
+          retryId = setTimeout(() => fetchFiles(), 5000);
+        });
+    }
 
-    return () => clearInterval(intervalId);
-  }, [isLoaded, isSignedIn, hasProcessingFiles, fetchFiles]);
+    return () => {
+      controller.abort();
+      clearTimeout(retryId);
+    };
+  }, [isLoaded, isSignedIn, processingFileIds, stream, fetchFiles]);
 
   // Set default scope when files load
   useEffect(() => {
@@ -150,6 +183,7 @@ export function ScopeProvider({ children }: { children: React.ReactNode }) {
     filesLoading,
     filesError,
     refreshFiles,
+    fileProgress,
     hasFiles,
     latestFile,
     getScopeParams,
@@ -10,6 +10,7 @@ import {
   authPostFormData,
   authPatch,
   authDelete,
+  authStreamEvents,
   getApiUrl,
 } from '@/lib/api';
 
@@ -89,12 +90,28 @@ export function useApi() {
     [apiUrl, getToken]
   );
   
+  /**
+   * Consume an authenticated Server-Sent Events stream until it closes or is aborted.
+   */
+  const stream = useCallback(
+    async <T>(
+      endpoint: string,
+      onEvent: (event: string, data: T) => void,
+      signal?: AbortSignal
+    ): Promise<void> => {
+      const url = `${apiUrl}${endpoint}`;
+      return authStreamEvents<T>(url, getToken, onEvent, signal);
+    },
+    [apiUrl, getToken]
+  );
+  
   return {
     get,
     post,
     postFormData,
     patch,
     del,
+    stream,
     isLoaded,
     isSignedIn,
     apiUrl,
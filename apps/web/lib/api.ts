@@ -154,3 +154,62 @@ export async function authDelete<T>(
   
   return response.json();
 }
+
+/**
+ * Helper to consume an authenticated Server-Sent Events stream.
+ * Uses fetch rather than EventSource so the Authorization header can be sent.
+ * Resolves when the server closes the stream or the signal is aborted.
+ */
+export async function authStreamEvents<T>(
+  url: string,
+  getToken: () => Promise<string | null>,
+  onEvent: (event: string, data: T) => void,
+  signal?: AbortSignal
+): Promise<void> {
+  const authFetch = createAuthenticatedFetch(getToken);
+  const response = await authFetch(url, {
+    headers: {
+      Accept: 'text/event-stream',
+    },
+    signal,
+  });
+  
+  if (!response.ok || !response.body) {
+    const errorText = await response.text().catch(() => 'Unknown error');
+    throw new Error(errorText || `Request failed with status ${response.status}`);
+  }
+  
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  
+  try {
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      
+      // Events are separated by a blank line
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+        
+        let eventName = 'message';
+        const dataLines: string[] = [];
+        for (const line of rawEvent.split('\n')) {
+          if (line.startsWith('event:')) eventName = line.slice(6).trim();
+          else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+        }
+        // Comment-only events (keepalives) carry no data
+        if (dataLines.length > 0) {
+          onEvent(eventName, JSON.parse(dataLines.join('\n')) as T);
+        }
+      }
+    }
+  } catch (err) {
+    if (signal?.aborted) return;
+    throw err;
+  }
+}
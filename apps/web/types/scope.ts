@@ -35,6 +35,34 @@ export interface UserFile {
   period_end_date?: string | null;
 }
 
+// Final outcome of one LLM extraction chunk of an upload
+export interface ChunkStatus {
+  chunk: number;
+  pages: number[];
+  status: "pending" | "succeeded" | "failed";
+  attempts: number;
+  error: string | null;
+}
+
+// Live processing progress streamed from /file-uploads/{file_id}/progress
+export interface UploadProgress {
+  file_id: string;
+  status: FileStatus;
+  processing_status: "queued" | "extracting" | "analyzing" | "done" | "failed";
+  transaction_count: number;
+  processing_error: string | null;
+  progress: {
+    chunks_done?: number;
+    chunks_total?: number;
+    rows_extracted?: number;
+    rows_inserted?: number;
+    rows_deduplicated?: number;
+    analysis_started?: boolean;
+    insights_written?: number;
+    chunk_report?: ChunkStatus[];
+  };
+}
+
 export interface UserFilesResponse {
   uploads: UserFile[];
   count: number;
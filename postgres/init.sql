@@ -1,6 +1,9 @@
 -- Database schema for the application
 -- Generated from SQLModel classes
 
+-- Trigram matching for merchant/description search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 CREATE TABLE IF NOT EXISTS app_users (
     id SERIAL PRIMARY KEY,
     clerk_id TEXT UNIQUE,
@@ -38,6 +41,13 @@ CREATE TABLE IF NOT EXISTS user_upload (
     statement_type TEXT NOT NULL CHECK(statement_type IN ('banking_transaction', 'receipt', 'invoice', 'other')),
     expense_month INTEGER NOT NULL,
     expense_year INTEGER NOT NULL,
+    processing_status TEXT NOT NULL DEFAULT 'done' CHECK(processing_status IN ('queued', 'extracting', 'analyzing', 'done', 'failed')),
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    processing_error TEXT,
+    processing_started_at TIMESTAMP,
+    processing_completed_at TIMESTAMP,
+    content_hash TEXT, -- SHA-256 of the file bytes
+    processing_progress JSONB, -- counters for the current run (chunks, rows, insights) and per-chunk report
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES app_users(id) ON DELETE CASCADE
 );
@@ -67,11 +77,59 @@ CREATE TABLE IF NOT EXISTS statement_banking_transaction (
     subscription_name TEXT,
     subscription_reason_codes JSONB,
     subscription_updated_at TIMESTAMP,
+    fingerprint TEXT, -- hash of date, type, amount, normalised description, reference, balance
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES app_users(id) ON DELETE CASCADE,
     FOREIGN KEY (file_id) REFERENCES user_upload(file_id) ON DELETE CASCADE
 );
 
+-- Monthly rollup of banking transactions (maintained by the backend on every write)
+CREATE TABLE IF NOT EXISTS monthly_rollup (
+    user_id INTEGER NOT NULL REFERENCES app_users(id) ON DELETE CASCADE,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL CHECK(month >= 1 AND month <= 12),
+    transaction_type TEXT NOT NULL CHECK(transaction_type IN ('debit', 'credit')),
+    category TEXT NOT NULL, -- 'other' when the transaction has no category
+    merchant_key TEXT NOT NULL, -- merchant_name, 'Unknown' when missing
+    total_amount DECIMAL(15, 2) NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    subscription_amount DECIMAL(15, 2) NOT NULL DEFAULT 0,
+    subscription_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, year, month, transaction_type, category, merchant_key)
+);
+
+-- Durable statement-processing job queue (claimed with FOR UPDATE SKIP LOCKED)
+CREATE TABLE IF NOT EXISTS processing_job (
+    id TEXT PRIMARY KEY,
+    job_type TEXT NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES app_users(id) ON DELETE CASCADE,
+    file_id TEXT REFERENCES user_upload(file_id) ON DELETE CASCADE,
+    payload JSONB,
+    status TEXT NOT NULL DEFAULT 'queued' CHECK(status IN ('queued', 'running', 'succeeded', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_by TEXT,
+    locked_at TIMESTAMP,
+    last_error TEXT,
+    finished_at TIMESTAMP,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- LLM output per request payload (PDF chunk or document), evicted least recently used first
+CREATE TABLE IF NOT EXISTS extraction_chunk_cache (
+    chunk_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    transactions JSONB NOT NULL,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_used_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (chunk_hash, model, prompt_version)
+);
+
 -- User financial goals table
 CREATE TABLE IF NOT EXISTS user_goal (
     id TEXT PRIMARY KEY,
@@ -107,6 +165,7 @@ CREATE TABLE IF NOT EXISTS financial_insight (
 CREATE INDEX IF NOT EXISTS idx_insight_user_id ON financial_insight(user_id);
 CREATE INDEX IF NOT EXISTS idx_insight_user_type ON financial_insight(user_id, insight_type);
 CREATE INDEX IF NOT EXISTS idx_insight_file_id ON financial_insight(file_id);
+CREATE INDEX IF NOT EXISTS idx_insight_user_source ON financial_insight(user_id, (metadata->>'source'));
 
 -- Earn extra micro-plans table
 CREATE TABLE IF NOT EXISTS earn_extra_plan (
@@ -133,10 +192,20 @@ CREATE INDEX IF NOT EXISTS idx_earn_extra_user_id ON earn_extra_plan(user_id);
 CREATE INDEX IF NOT EXISTS idx_earn_extra_user_status ON earn_extra_plan(user_id, status);
 CREATE INDEX IF NOT EXISTS idx_earn_extra_user_file ON earn_extra_plan(user_id, file_id);
 
+-- Job queue indexes: runnable jobs in claim order, stale running jobs, per-user stats
+CREATE INDEX IF NOT EXISTS idx_processing_job_queued ON processing_job(run_after) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_processing_job_running ON processing_job(locked_at) WHERE status = 'running';
+CREATE INDEX IF NOT EXISTS idx_processing_job_user_status ON processing_job(user_id, status);
+
+-- Extraction chunk cache eviction (least recently used first)
+CREATE INDEX IF NOT EXISTS idx_extraction_chunk_cache_last_used ON extraction_chunk_cache(last_used_at);
+
 -- Create indexes for frequently queried columns
 CREATE INDEX IF NOT EXISTS idx_user_email ON app_users(email);
 CREATE UNIQUE INDEX IF NOT EXISTS idx_app_users_clerk_id ON app_users(clerk_id);
 CREATE INDEX IF NOT EXISTS idx_session_user_id ON session(user_id);
+-- One live upload per user, statement type and file; failed uploads can be uploaded again
+CREATE UNIQUE INDEX IF NOT EXISTS idx_user_upload_user_type_content_hash ON user_upload(user_id, statement_type, content_hash) WHERE processing_status <> 'failed';
 CREATE INDEX IF NOT EXISTS idx_banking_transaction_user_id ON statement_banking_transaction(user_id);
 CREATE INDEX IF NOT EXISTS idx_banking_transaction_file_id ON statement_banking_transaction(file_id);
 CREATE INDEX IF NOT EXISTS idx_banking_transaction_date ON statement_banking_transaction(transaction_date);
@@ -145,6 +214,14 @@ CREATE INDEX IF NOT EXISTS idx_banking_transaction_type ON statement_banking_tra
 
 -- Subscription classification indexes
 CREATE INDEX IF NOT EXISTS idx_banking_transaction_user_date ON statement_banking_transaction(user_id, transaction_date);
+-- Keyset pagination seeks on (transaction_date, id) within a user
+CREATE INDEX IF NOT EXISTS idx_banking_transaction_user_date_id ON statement_banking_transaction(user_id, transaction_date DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_banking_transaction_user_subscription ON statement_banking_transaction(user_id, is_subscription);
 CREATE INDEX IF NOT EXISTS idx_banking_transaction_user_merchant_key ON statement_banking_transaction(user_id, subscription_merchant_key);
-CREATE INDEX IF NOT EXISTS idx_banking_transaction_user_date_subscription ON statement_banking_transaction(user_id, transaction_date, is_subscription);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_banking_transaction_user_date_subscription ON statement_banking_transaction(user_id, transaction_date, is_subscription);
+-- Same real transaction from overlapping statements is stored once per user (NULL fingerprints never conflict)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_banking_transaction_user_fingerprint ON statement_banking_transaction(user_id, fingerprint);
+
+-- Merchant/description search: trigram GIN indexes serve both ILIKE '%term%' and word-similarity (%>) lookups
+CREATE INDEX IF NOT EXISTS idx_banking_transaction_description_trgm ON statement_banking_transaction USING GIN (description gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_banking_transaction_merchant_name_trgm ON statement_banking_transaction USING GIN (merchant_name gin_trgm_ops);